@@ -0,0 +1,112 @@
+import sys
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional, Set, Tuple
+
+
+class CacheBackend(ABC):
+    """Хранилище кэша ответов.
+
+    Реализация по умолчанию живёт в памяти процесса. Общий для нескольких
+    воркеров бэкенд (Redis, memcached) реализует этот же интерфейс и
+    передаётся в ``ResponseCache``.
+    """
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[Any]:
+        ...
+
+    @abstractmethod
+    async def set(self, key: str, value: Any, ttl: float, tags: Iterable[str]) -> None:
+        ...
+
+    @abstractmethod
+    async def invalidate_tags(self, tags: Iterable[str]) -> None:
+        ...
+
+    @abstractmethod
+    async def clear(self) -> None:
+        ...
+
+
+def value_size(value: Any) -> int:
+    """Объём значения в байтах: ``nbytes`` готового ответа или оценка ``sys.getsizeof``."""
+    size = getattr(value, "nbytes", None)
+    return size if size is not None else sys.getsizeof(value)
+
+
+class InMemoryCacheBackend(CacheBackend):
+    """LRU с TTL на записях и индексом тегов для инвалидации.
+
+    Размер ограничен суммарным объёмом значений ``max_bytes`` и числом
+    записей ``max_entries``; значения больше ``max_entry_bytes`` не
+    кэшируются, чтобы одна большая страница не вытесняла весь кэш.
+    """
+
+    def __init__(
+            self,
+            max_entries: int = 10000,
+            max_bytes: int = 64 * 1024 * 1024,
+            max_entry_bytes: Optional[int] = None
+    ):
+        self._max_entries = max_entries
+        self._max_bytes = max_bytes
+        self._max_entry_bytes = max_bytes if max_entry_bytes is None else min(max_entry_bytes, max_bytes)
+        self._entries: "OrderedDict[str, Tuple[float, Any, Tuple[str, ...], int]]" = OrderedDict()
+        self._tags: Dict[str, Set[str]] = {}
+        self._bytes = 0
+
+    async def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value, _, _ = entry
+        if expires_at <= time.monotonic():
+            self._remove(key)
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: Any, ttl: float, tags: Iterable[str]) -> None:
+        if key in self._entries:
+            self._remove(key)
+        size = value_size(value)
+        if size > self._max_entry_bytes:
+            return
+        tags = tuple(tags)
+        self._entries[key] = (time.monotonic() + ttl, value, tags, size)
+        self._bytes += size
+        for tag in tags:
+            self._tags.setdefault(tag, set()).add(key)
+        while len(self._entries) > self._max_entries or self._bytes > self._max_bytes:
+            self._remove(next(iter(self._entries)))
+
+    async def invalidate_tags(self, tags: Iterable[str]) -> None:
+        for tag in tags:
+            for key in self._tags.pop(tag, set()):
+                self._remove(key)
+
+    async def clear(self) -> None:
+        self._entries.clear()
+        self._tags.clear()
+        self._bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def nbytes(self) -> int:
+        return self._bytes
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        self._bytes -= entry[3]
+        for tag in entry[2]:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
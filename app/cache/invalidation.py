@@ -0,0 +1,98 @@
+import asyncio
+from typing import Optional
+
+import asyncpg
+from loguru import logger
+from sqlalchemy.engine import make_url
+
+from app.cache.response_cache import ResponseCache, response_cache
+from app.config import settings
+from app.dao.activity_tree import activity_tree_cache
+from app.models.activities import Activity
+
+# канал, в который триггеры миграции response_cache_notify пишут имя изменённой таблицы
+CHANNEL = "response_cache"
+
+
+class CacheInvalidationListener:
+    """Сброс кэша ответов и дерева деятельности по NOTIFY из базы.
+
+    Триггеры шлют уведомление при коммите любой транзакции, изменившей
+    таблицы справочника, - из другого воркера, скрипта импорта или psql.
+    Каждый воркер держит одно отдельное соединение с LISTEN. Пока оно
+    потеряно, уведомления пропадают, поэтому после переподключения кэш
+    сбрасывается целиком; до этого записи живут не дольше TTL.
+    """
+
+    def __init__(
+            self,
+            cache: ResponseCache,
+            dsn: str,
+            repeat_after: Optional[float] = None,
+            heartbeat_interval: float = 30.0,
+            reconnect_delay: float = 5.0
+    ):
+        self.cache = cache
+        self.dsn = dsn
+        self.repeat_after = repeat_after
+        self.heartbeat_interval = heartbeat_interval
+        self.reconnect_delay = reconnect_delay
+        self._task: Optional[asyncio.Task] = None
+        self.listening = asyncio.Event()
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self._listen()
+            except asyncio.CancelledError:
+                raise
+            except (OSError, asyncio.TimeoutError, asyncpg.PostgresError, asyncpg.InterfaceError) as e:
+                logger.warning("Соединение LISTEN {} потеряно: {}", CHANNEL, e)
+            finally:
+                self.listening.clear()
+            await asyncio.sleep(self.reconnect_delay)
+
+    async def _listen(self) -> None:
+        connection = await asyncpg.connect(self.dsn, timeout=self.heartbeat_interval)
+        try:
+            await connection.add_listener(CHANNEL, self._notified)
+            # изменения, сделанные без подписки, могли быть пропущены
+            await self.cache.clear()
+            activity_tree_cache.invalidate()
+            self.listening.set()
+            logger.debug("Подписка на сброс кэша ответов: канал {}", CHANNEL)
+            while True:
+                await asyncio.sleep(self.heartbeat_interval)
+                await connection.execute("SELECT 1", timeout=self.heartbeat_interval)
+        finally:
+            connection.terminate()
+
+    def _notified(self, connection, pid: int, channel: str, table: str) -> None:
+        self._invalidate(table)
+        if self.repeat_after:
+            asyncio.get_running_loop().call_later(self.repeat_after, self._invalidate, table)
+
+    def _invalidate(self, table: str) -> None:
+        self.cache.invalidate_tables([table])
+        if table == Activity.__tablename__:
+            activity_tree_cache.invalidate()
+
+
+cache_invalidation_listener = CacheInvalidationListener(
+    response_cache,
+    dsn=make_url(settings.DB_URL).set(drivername="postgresql").render_as_string(hide_password=False),
+    repeat_after=settings.RESPONSE_CACHE_REPLICA_LAG if settings.replica_urls else None
+)
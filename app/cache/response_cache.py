@@ -0,0 +1,270 @@
+import asyncio
+import functools
+import inspect
+import json
+from dataclasses import dataclass
+from enum import Enum
+from itertools import chain
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Set, Tuple
+
+from loguru import logger
+from pydantic import BaseModel
+from sqlalchemy import event
+from sqlalchemy.orm import ORMExecuteState, Session, object_mapper
+from starlette.responses import Response, StreamingResponse
+
+from app.cache.backends import CacheBackend, InMemoryCacheBackend
+from app.config import settings
+
+CHANGED_TABLES_KEY = "response_cache_changed_tables"
+
+_KEY_TYPES = (str, int, float, bool, type(None), Enum, BaseModel)
+
+_SUB_RESPONSE_PARAM = "_cache_response"
+_CONTENT_HEADERS = (b"content-length", b"content-type")
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    """Неизменяемый снимок готового Response: один объект Response нельзя отдавать дважды."""
+    body: bytes
+    status_code: int
+    media_type: Optional[str]
+    headers: Tuple[Tuple[bytes, bytes], ...] = ()
+
+    @classmethod
+    def freeze(cls, value: Any) -> Any:
+        if isinstance(value, Response) and not isinstance(value, StreamingResponse):
+            return cls(
+                body=value.body,
+                status_code=value.status_code,
+                media_type=value.media_type,
+                headers=tuple(
+                    (name, header) for name, header in value.raw_headers if name not in _CONTENT_HEADERS
+                )
+            )
+        return value
+
+    @property
+    def nbytes(self) -> int:
+        return len(self.body) + sum(len(name) + len(header) for name, header in self.headers)
+
+    def thaw(self, sub_response: Optional[Response]) -> Response:
+        """Новый Response с заголовками, выставленными зависимостями текущего запроса (ETag и т.п.)."""
+        response = Response(content=self.body, status_code=self.status_code, media_type=self.media_type)
+        response.raw_headers.extend(self.headers)
+        if sub_response is not None:
+            response.raw_headers.extend(sub_response.raw_headers)
+        return response
+
+
+class _LeaderCancelled(Exception):
+    """Запрос, вычислявший ответ для ожидающих, был отменён."""
+
+
+class ResponseCache:
+    """Кэш результатов GET-эндпоинтов.
+
+    Ключ строится из имени эндпоинта и его параметров (path, query и
+    pydantic-зависимостей). Каждая запись помечается тегами - именами
+    таблиц, из которых собран ответ; после коммита сессии, изменившей
+    одну из таблиц, записи с этим тегом удаляются. Изменения из других
+    процессов приходят через NOTIFY (``app.cache.invalidation``).
+
+    Сброс также увеличивает поколение тегов: ответ, который начали считать
+    до сброса, отдаётся своему запросу, но в кэш не записывается - иначе он
+    пережил бы изменение на весь TTL.
+    """
+
+    def __init__(self, backend: CacheBackend, ttl: float, enabled: bool = True):
+        self.backend = backend
+        self.ttl = ttl
+        self.enabled = enabled
+        self._inflight: Dict[str, Tuple[asyncio.Future, tuple]] = {}
+        self._tasks: Set[asyncio.Task] = set()
+        self._generations: Dict[str, int] = {}
+        self._epoch = 0
+
+    def cached(self, tags: Iterable[str], ttl: Optional[float] = None) -> Callable:
+        tags = tuple(tags)
+
+        def decorator(endpoint: Callable) -> Callable:
+            prefix = f"{endpoint.__module__}.{endpoint.__qualname__}"
+            signature = inspect.signature(endpoint)
+            # Заголовки, выставленные зависимостями, FastAPI не переносит в
+            # возвращённый Response - забираем их из служебного параметра
+            response_param = next(
+                (name for name, param in signature.parameters.items() if param.annotation is Response),
+                None
+            )
+            injected = response_param is None
+            if injected:
+                response_param = _SUB_RESPONSE_PARAM
+
+            def finish(value: Any, sub_response: Optional[Response]) -> Any:
+                if isinstance(value, CachedResponse):
+                    return value.thaw(sub_response)
+                return value
+
+            @functools.wraps(endpoint)
+            async def wrapper(**kwargs: Any) -> Any:
+                sub_response = kwargs.pop(response_param) if injected else kwargs.get(response_param)
+                if not self.enabled:
+                    return finish(CachedResponse.freeze(await endpoint(**kwargs)), sub_response)
+
+                key = self.make_key(prefix, kwargs)
+                while True:
+                    value = await self.backend.get(key)
+                    if value is not None:
+                        return finish(value, sub_response)
+
+                    inflight = self._inflight.get(key)
+                    # ответ, который считается с данных до сброса, не ждём
+                    if inflight is None or inflight[1] != self.generation(tags):
+                        break
+                    try:
+                        return finish(await asyncio.shield(inflight[0]), sub_response)
+                    except _LeaderCancelled:
+                        # клиент первого запроса отключился: ожидающие не падают
+                        # вместе с ним, один из них вычисляет ответ заново
+                        continue
+
+                generation = self.generation(tags)
+                future = asyncio.get_running_loop().create_future()
+                self._inflight[key] = (future, generation)
+                try:
+                    value = CachedResponse.freeze(await endpoint(**kwargs))
+                except asyncio.CancelledError:
+                    future.set_exception(_LeaderCancelled())
+                    future.exception()
+                    raise
+                except Exception as e:
+                    future.set_exception(e)
+                    future.exception()
+                    raise
+                finally:
+                    if self._inflight.get(key, (None,))[0] is future:
+                        del self._inflight[key]
+
+                if self.generation(tags) == generation:
+                    await self.backend.set(key, value, ttl if ttl is not None else self.ttl, tags)
+                future.set_result(value)
+                return finish(value, sub_response)
+
+            if injected:
+                wrapper.__signature__ = signature.replace(parameters=[
+                    *signature.parameters.values(),
+                    inspect.Parameter(response_param, inspect.Parameter.KEYWORD_ONLY, annotation=Response)
+                ])
+            return wrapper
+
+        return decorator
+
+    @staticmethod
+    def make_key(prefix: str, params: dict) -> str:
+        parts = {
+            name: _key_value(value)
+            for name, value in params.items()
+            if isinstance(value, _KEY_TYPES)
+        }
+        return f"{prefix}:{json.dumps(parts, sort_keys=True, default=str, ensure_ascii=False)}"
+
+    async def get_or_load(
+            self,
+            key: str,
+            tags: Iterable[str],
+            load: Callable[[], Awaitable[Any]],
+            ttl: Optional[float] = None
+    ) -> Any:
+        """Значение из кэша или результат ``load()`` с теми же тегами и правилами сброса, что у ответов."""
+        tags = tuple(tags)
+        if not self.enabled:
+            return await load()
+        value = await self.backend.get(key)
+        if value is None:
+            generation = self.generation(tags)
+            value = await load()
+            if self.generation(tags) == generation:
+                await self.backend.set(key, value, ttl if ttl is not None else self.ttl, tags)
+        return value
+
+    def generation(self, tags: Iterable[str]) -> tuple:
+        return (self._epoch, *(self._generations.get(tag, 0) for tag in tags))
+
+    def invalidate_tables(self, tables: Iterable[str]) -> None:
+        tables = set(tables)
+        if not tables:
+            return
+        for table in tables:
+            self._generations[table] = self._generations.get(table, 0) + 1
+        logger.info("Сброс кэша ответов по таблицам: {}", sorted(tables))
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        task = loop.create_task(self.backend.invalidate_tags(tables))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def clear(self) -> None:
+        self._epoch += 1
+        await self.backend.clear()
+
+
+def _key_value(value: Any) -> Any:
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    if isinstance(value, Enum):
+        return value.value
+    return value
+
+
+response_cache = ResponseCache(
+    backend=InMemoryCacheBackend(
+        max_entries=settings.RESPONSE_CACHE_MAX_ENTRIES,
+        max_bytes=settings.RESPONSE_CACHE_MAX_BYTES,
+        max_entry_bytes=settings.RESPONSE_CACHE_MAX_ENTRY_BYTES
+    ),
+    ttl=settings.RESPONSE_CACHE_TTL,
+    enabled=settings.RESPONSE_CACHE_ENABLED
+)
+
+
+def _changed_tables(session: Session) -> Set[str]:
+    return session.info.setdefault(CHANGED_TABLES_KEY, set())
+
+
+def mark_tables_changed(session, *tables: str) -> None:
+    """Отмечает таблицы, изменённые в обход ORM (например, через COPY)."""
+    _changed_tables(session).update(tables)
+
+
+@event.listens_for(Session, "after_flush")
+def _track_flushed_tables(session: Session, flush_context) -> None:
+    tables = _changed_tables(session)
+    for instance in chain(session.new, session.dirty, session.deleted):
+        mapper = object_mapper(instance)
+        tables.update(table.name for table in mapper.tables)
+        tables.update(
+            relationship.secondary.name
+            for relationship in mapper.relationships
+            if relationship.secondary is not None
+        )
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _track_executed_tables(orm_execute_state: ORMExecuteState) -> None:
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        table = getattr(orm_execute_state.statement, "table", None)
+        if table is not None:
+            _changed_tables(orm_execute_state.session).add(table.name)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session: Session) -> None:
+    response_cache.invalidate_tables(session.info.pop(CHANGED_TABLES_KEY, ()))
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_rolled_back_tables(session: Session) -> None:
+    session.info.pop(CHANGED_TABLES_KEY, None)
@@ -1,4 +1,5 @@
 import os
+from typing import List, Literal
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -14,7 +15,74 @@ class Settings(BaseSettings):
     def DB_URL(self) -> str:
         return f"postgresql+asyncpg://{self.DB_USER}:{self.DB_PASS}@{self.DB_HOST}:{self.DB_PORT}/{self.DB_NAME}"
 
-    API_KEY: str
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 10.0
+    # pre-ping - лишний запрос на каждую выдачу соединения из пула; устаревшие
+    # соединения закрываются по DB_POOL_RECYCLE, а упавшая реплика исключается из чтения
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = False
+    DB_STATEMENT_CACHE_SIZE: int = 500
+    DB_JIT: bool = False
+    DB_APPLICATION_NAME: str = "organizations-api"
+    # запросы дольше порога пишутся в лог; для SELECT план EXPLAIN строится в фоне на отдельном соединении
+    # запросы дольше порога пишутся в лог вместе с планом EXPLAIN (только SELECT)
+    DB_SLOW_QUERY_MS: float = 500.0
+    DB_EXPLAIN_SLOW_QUERIES: bool = True
+
+    # DSN реплик для чтения через запятую; пусто - всё читается с основного сервера
+    DB_REPLICA_URLS: str = ""
+    DB_REPLICA_STRATEGY: Literal["round_robin", "least_connections"] = "round_robin"
+    DB_REPLICA_CHECK_INTERVAL: float = 5.0
+
+    @property
+    def replica_urls(self) -> List[str]:
+        return [url.strip() for url in self.DB_REPLICA_URLS.split(",") if url.strip()]
+
+    # открытый ключ и/или sha256-хэши ключей (hex) через запятую
+    API_KEY: str = ""
+    API_KEY_HASHES: str = ""
+
+    @property
+    def api_key_hashes(self) -> List[str]:
+        return [key_hash.strip() for key_hash in self.API_KEY_HASHES.split(",") if key_hash.strip()]
+
+    # корзина токенов на пару (API ключ, IP) в каждом воркере
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_PER_SECOND: float = 50.0
+    RATE_LIMIT_BURST: int = 100
+    RATE_LIMIT_MAX_CLIENTS: int = 10000
+
+    # метрики Prometheus: воркер N слушает METRICS_PORT + N; токен - для Authorization: Bearer
+    METRICS_ENABLED: bool = True
+    METRICS_HOST: str = "127.0.0.1"
+    METRICS_PORT: int = 9100
+    METRICS_TOKEN: str = ""
+
+    LOG_LEVEL: str = "INFO"
+    LOG_JSON: bool = False
+    # доля частых предупреждений (неверный ключ, 404), попадающих в лог
+    LOG_SAMPLE_RATE: float = 0.1
+
+    ACTIVITY_TREE_CACHE_TTL: float = 300.0
+
+    # комбинированный поиск: площадь территории справочника для оценки доли
+    # организаций в радиусе/области и порог доли, при которой фильтр
+    # выполняется первым (отдельным MATERIALIZED CTE)
+    SEARCH_AREA_KM2: float = 2500.0
+    SEARCH_DRIVING_SELECTIVITY: float = 0.05
+
+    RESPONSE_CACHE_ENABLED: bool = True
+    RESPONSE_CACHE_TTL: float = 60.0
+    RESPONSE_CACHE_MAX_ENTRIES: int = 10000
+    # объём кэша в каждом воркере и предел для одного ответа
+    RESPONSE_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    RESPONSE_CACHE_MAX_ENTRY_BYTES: int = 1024 * 1024
+    # сброс по NOTIFY из триггеров базы (изменения из других воркеров и скриптов)
+    RESPONSE_CACHE_LISTEN: bool = True
+    # при чтении с реплик сброс повторяется через это время, чтобы не
+    # закэшировать ответ реплики, ещё не получившей изменение
+    RESPONSE_CACHE_REPLICA_LAG: float = 1.0
 
     model_config = SettingsConfigDict(env_file=f"{BASE_DIR}/.env", extra='ignore')
 
@@ -1,8 +1,10 @@
 from typing import Optional, List
-from sqlalchemy import func
+from sqlalchemy import Integer, any_, func, literal
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload, joinedload
-from app.dao.base import BaseDAO
+from sqlalchemy.orm.attributes import set_committed_value
+from app.dao.activity_tree import activity_tree_cache
+from app.dao.base import BaseDAO, NO_RELATIONSHIPS
 from sqlalchemy.future import select
 from app.models.activities import Activity
 from app.models.secondary import organization_activity
@@ -13,34 +15,37 @@ class ActivityDAO(BaseDAO[Activity]):
 
     def __init__(self, session: AsyncSession):
         super().__init__(session)
-        self.default_options = [
-            selectinload(Activity.children)
-            .selectinload(Activity.children)
-            .selectinload(Activity.children),
-            joinedload(Activity.parent)
-        ]
+        self.default_options = [*NO_RELATIONSHIPS]
 
     async def get_tree(self) -> List[Activity]:
         query = (
             select(self.model)
             .options(*self.default_options)
-            .filter(self.model.parent_id.is_(None))
             .order_by(self.model.name)
         )
         result = await self._session.execute(query)
-        return result.scalars().all()
+        activities = self._link_tree(result.scalars().all())
+        return [activity for activity in activities if activity.parent_id is None]
 
     async def get_with_descendants(
             self,
             activity_id: int
     ) -> Optional[Activity]:
+        tree = await activity_tree_cache.get(self._session)
+        subtree_ids = tree.subtree_ids(activity_id)
         query = (
             select(self.model)
             .options(*self.default_options)
-            .filter(self.model.id == activity_id)
+            .filter(self.model.id == any_(literal(subtree_ids, ARRAY(Integer))))
+            .order_by(self.model.name)
         )
         result = await self._session.execute(query)
-        return result.scalar_one_or_none()
+        activities = self._link_tree(result.scalars().all())
+        return next((activity for activity in activities if activity.id == activity_id), None)
+
+    async def get_subtree_ids(self, activity_id: int) -> List[int]:
+        tree = await activity_tree_cache.get(self._session)
+        return tree.subtree_ids(activity_id)
 
     async def get_by_level(
             self,
@@ -80,8 +85,24 @@ class ActivityDAO(BaseDAO[Activity]):
         activity = Activity(
             name=name,
             parent_id=parent_id,
-            level=level
+            level=level,
+            children=[]
         )
         self._session.add(activity)
         await self._session.flush()
+        activity_tree_cache.invalidate_on_commit(self._session)
         return activity
+
+    @staticmethod
+    def _link_tree(activities: List[Activity]) -> List[Activity]:
+        """Заполняет parent/children у загруженных записей без дополнительных запросов."""
+        by_id = {activity.id: activity for activity in activities}
+        children = {activity.id: [] for activity in activities}
+        for activity in activities:
+            if activity.parent_id in children:
+                children[activity.parent_id].append(activity)
+        for activity in activities:
+            set_committed_value(activity, 'children', children[activity.id])
+            if activity.parent_id is None or activity.parent_id in by_id:
+                set_committed_value(activity, 'parent', by_id.get(activity.parent_id))
+        return activities
@@ -0,0 +1,104 @@
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from loguru import logger
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.cache.response_cache import CHANGED_TABLES_KEY
+from app.config import settings
+from app.models.activities import Activity
+
+INVALIDATE_ON_COMMIT_KEY = "invalidate_activity_tree"
+
+
+@dataclass
+class ActivityTree:
+    """Снимок каталога деятельности: id -> родитель, дети, предки и потомки."""
+    parents: Dict[int, Optional[int]] = field(default_factory=dict)
+    children: Dict[int, List[int]] = field(default_factory=dict)
+    ancestors: Dict[int, List[int]] = field(default_factory=dict)
+    descendants: Dict[int, List[int]] = field(default_factory=dict)
+
+    @classmethod
+    def build(cls, rows) -> "ActivityTree":
+        tree = cls()
+        for activity_id, parent_id in rows:
+            tree.parents[activity_id] = parent_id
+            tree.children.setdefault(activity_id, [])
+        for activity_id, parent_id in tree.parents.items():
+            if parent_id is not None:
+                tree.children.setdefault(parent_id, []).append(activity_id)
+
+        for activity_id in tree.parents:
+            path = []
+            parent_id = tree.parents[activity_id]
+            while parent_id is not None and parent_id not in path:
+                path.append(parent_id)
+                parent_id = tree.parents.get(parent_id)
+            tree.ancestors[activity_id] = path
+
+        for activity_id in tree.parents:
+            subtree, stack = [], [activity_id]
+            while stack:
+                current = stack.pop()
+                subtree.append(current)
+                stack.extend(tree.children.get(current, []))
+            tree.descendants[activity_id] = subtree
+        return tree
+
+    def subtree_ids(self, activity_id: int) -> List[int]:
+        """Сам вид деятельности и все его подкатегории."""
+        return self.descendants.get(activity_id, [activity_id])
+
+
+class ActivityTreeCache:
+    """Кэш дерева деятельности в памяти процесса.
+
+    Загружается одним запросом ``SELECT id, parent_id FROM activities`` и
+    сбрасывается после коммита любой сессии, изменившей activities, и по
+    NOTIFY об изменениях из других процессов (``app.cache.invalidation``);
+    ``ttl`` ограничивает срок жизни, пока подписка на NOTIFY потеряна.
+    """
+
+    def __init__(self, ttl: float):
+        self._ttl = ttl
+        self._tree: Optional[ActivityTree] = None
+        self._loaded_at = 0.0
+        self._lock = asyncio.Lock()
+
+    async def get(self, session: AsyncSession) -> ActivityTree:
+        tree = self._tree
+        if tree is not None and time.monotonic() - self._loaded_at < self._ttl:
+            return tree
+
+        async with self._lock:
+            if self._tree is not None and time.monotonic() - self._loaded_at < self._ttl:
+                return self._tree
+            result = await session.execute(select(Activity.id, Activity.parent_id))
+            self._tree = ActivityTree.build(result.all())
+            self._loaded_at = time.monotonic()
+            logger.info("Дерево деятельности загружено в кэш: {} записей", len(self._tree.parents))
+            return self._tree
+
+    def invalidate(self) -> None:
+        self._tree = None
+
+    def invalidate_on_commit(self, session: AsyncSession) -> None:
+        self.invalidate()
+        session.info[INVALIDATE_ON_COMMIT_KEY] = True
+
+
+activity_tree_cache = ActivityTreeCache(ttl=settings.ACTIVITY_TREE_CACHE_TTL)
+
+
+# insert=True: обработчик должен отработать раньше сброса кэша ответов,
+# который забирает из сессии список изменённых таблиц
+@event.listens_for(Session, "after_commit", insert=True)
+def _invalidate_activity_tree(session: Session) -> None:
+    changed = session.info.get(CHANGED_TABLES_KEY, ())
+    if session.info.pop(INVALIDATE_ON_COMMIT_KEY, False) or Activity.__tablename__ in changed:
+        activity_tree_cache.invalidate()
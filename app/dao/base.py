@@ -1,14 +1,35 @@
-from typing import List, TypeVar, Generic, Type
+from typing import Any, List, Mapping, Optional, Sequence, TypeVar, Generic, Type
 from pydantic import BaseModel
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.future import select
-from sqlalchemy import update as sqlalchemy_update, delete as sqlalchemy_delete, func
+from sqlalchemy import (
+    Integer,
+    Select,
+    any_,
+    column,
+    exists,
+    values,
+    update as sqlalchemy_update,
+    delete as sqlalchemy_delete,
+    func,
+    literal,
+)
+from sqlalchemy.dialects.postgresql import ARRAY
 from loguru import logger
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import raiseload
+from sqlalchemy.orm.interfaces import ORMOption
+from app.dao.loader import Loader, attach_loaders
+from app.database.instrumentation import track_dao_methods
+from app.dao.bulk import BulkResult, BulkTimer, as_dicts, params_batch_size
+from app.dao.pagination import KeysetQuery, Page, SortKey, encode_cursor
 from app.database.db import Base
 
 T = TypeVar("T", bound=Base)
 
+NO_RELATIONSHIPS = (raiseload('*'),)
+
 
 class BaseDAO(Generic[T]):
     model: Type[T] = None
@@ -18,76 +39,167 @@ class BaseDAO(Generic[T]):
         if self.model is None:
             raise ValueError("Модель должна быть указана в дочернем классе")
 
-    async def find_one_or_none_by_id(self, data_id: int):
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # запросы внутри методов DAO попадают в метрики с именем метода
+        track_dao_methods(cls)
+
+    @property
+    def loader(self) -> Loader[int, T]:
+        """Загрузчик записей по id с группировкой запросов в рамках сессии."""
+        return attach_loaders(self._session).get(self.model, self._load_by_ids)
+
+    async def _load_by_ids(self, ids: List[int]) -> dict[int, T]:
+        return {record.id: record for record in await self.find_many_by_ids(ids)}
+
+    @staticmethod
+    def _load_options(load: Optional[Sequence[ORMOption]]) -> Sequence[ORMOption]:
+        """Стратегия загрузки связей для запроса: по умолчанию связи не загружаются."""
+        return NO_RELATIONSHIPS if load is None else load
+
+    async def exists(self, data_id: int) -> bool:
         try:
-            query = select(self.model).filter_by(id=data_id)
+            query = select(exists().where(self.model.id == data_id))
+            return bool(await self._session.scalar(query))
+        except SQLAlchemyError as e:
+            logger.error("Ошибка при проверке существования записи с ID {}: {}", data_id, e)
+            raise
+
+    async def find_one_or_none_by_id(self, data_id: int, load: Optional[Sequence[ORMOption]] = None):
+        try:
+            query = select(self.model).options(*self._load_options(load)).filter_by(id=data_id)
             result = await self._session.execute(query)
             record = result.scalar_one_or_none()
-            log_message = f"Запись {self.model.__name__} с ID {data_id} {'найдена' if record else 'не найдена'}."
-            logger.info(log_message)
+            logger.debug(
+                "Запись {} с ID {} {}.", self.model.__name__, data_id, "найдена" if record else "не найдена"
+            )
             return record
         except SQLAlchemyError as e:
-            logger.error(f"Ошибка при поиске записи с ID {data_id}: {e}")
+            logger.error("Ошибка при поиске записи с ID {}: {}", data_id, e)
             raise
 
-    async def find_one_or_none(self, filters: BaseModel):
+    async def find_many_by_ids(
+            self,
+            ids: Sequence[int],
+            load: Optional[Sequence[ORMOption]] = None
+    ) -> List[T]:
+        """Записи по списку id одним запросом ``WHERE id = ANY(:ids)``; порядок не гарантируется."""
+        if not ids:
+            return []
+        try:
+            query = (
+                select(self.model)
+                .options(*self._load_options(load))
+                .where(self.model.id == any_(literal(list(ids), ARRAY(Integer))))
+            )
+            result = await self._session.execute(query)
+            records = result.scalars().all()
+            logger.debug("Найдено {} записей {} из {} запрошенных.", len(records), self.model.__name__, len(ids))
+            return list(records)
+        except SQLAlchemyError as e:
+            logger.error("Ошибка при поиске записей по списку ID: {}", e)
+            raise
+
+    async def find_one_or_none(self, filters: BaseModel, load: Optional[Sequence[ORMOption]] = None):
         filter_dict = filters.model_dump(exclude_unset=True)
-        logger.info(f"Поиск одной записи {self.model.__name__} по фильтрам: {filter_dict}")
+        logger.debug("Поиск одной записи {} по фильтрам: {}", self.model.__name__, filter_dict)
         try:
-            query = select(self.model).filter_by(**filter_dict)
+            query = select(self.model).options(*self._load_options(load)).filter_by(**filter_dict)
             result = await self._session.execute(query)
             record = result.scalar_one_or_none()
-            log_message = f"Запись {'найдена' if record else 'не найдена'} по фильтрам: {filter_dict}"
-            logger.info(log_message)
+            logger.debug("Запись {} по фильтрам: {}", "найдена" if record else "не найдена", filter_dict)
             return record
         except SQLAlchemyError as e:
-            logger.error(f"Ошибка при поиске записи по фильтрам {filter_dict}: {e}")
+            logger.error("Ошибка при поиске записи по фильтрам {}: {}", filter_dict, e)
             raise
 
-    async def find_all(self, filters: BaseModel | None = None):
+    async def find_all(self, filters: BaseModel | None = None, load: Optional[Sequence[ORMOption]] = None):
         filter_dict = filters.model_dump(exclude_unset=True) if filters else {}
-        logger.info(f"Поиск всех записей {self.model.__name__} по фильтрам: {filter_dict}")
+        logger.debug("Поиск всех записей {} по фильтрам: {}", self.model.__name__, filter_dict)
         try:
-            query = select(self.model).filter_by(**filter_dict)
+            query = select(self.model).options(*self._load_options(load)).filter_by(**filter_dict)
             result = await self._session.execute(query)
             records = result.scalars().all()
-            logger.info(f"Найдено {len(records)} записей.")
+            logger.debug("Найдено {} записей.", len(records))
             return records
         except SQLAlchemyError as e:
-            logger.error(f"Ошибка при поиске всех записей по фильтрам {filter_dict}: {e}")
+            logger.error("Ошибка при поиске всех записей по фильтрам {}: {}", filter_dict, e)
             raise
 
+    async def find_page(
+            self,
+            filters: BaseModel | None = None,
+            limit: int = 50,
+            after: Optional[str] = None,
+            load: Optional[Sequence[ORMOption]] = None
+    ) -> Page[T]:
+        filter_dict = filters.model_dump(exclude_unset=True) if filters else {}
+        logger.debug("Постраничный поиск записей {} по фильтрам: {}, limit={}", self.model.__name__, filter_dict, limit)
+        try:
+            query = select(self.model).options(*self._load_options(load)).filter_by(**filter_dict)
+            page = await self.paginate(query, [SortKey(self.model.id)], limit, after)
+            logger.debug("Найдено {} записей на странице.", len(page.items))
+            return page
+        except SQLAlchemyError as e:
+            logger.error("Ошибка при постраничном поиске записей по фильтрам {}: {}", filter_dict, e)
+            raise
+
+    async def paginate(
+            self,
+            query: Select | KeysetQuery,
+            sort: Sequence[SortKey] = (),
+            limit: int = 50,
+            after: Optional[str] = None,
+            params: Optional[Mapping[str, Any]] = None
+    ) -> Page:
+        """Keyset-пагинация: ``WHERE (ключи) > (курсор) ORDER BY ключи LIMIT limit + 1``.
+
+        Ключи сортировки добавляются в SELECT, поэтому первой колонкой запроса должно
+        быть возвращаемое значение (сущность или документ). Стоимость страницы не
+        зависит от её глубины. Для горячих запросов передаётся заранее собранный
+        ``KeysetQuery`` (тогда ``sort`` не нужен) и его параметры в ``params``.
+        """
+        if not isinstance(query, KeysetQuery):
+            query = KeysetQuery(query, sort)
+        statement, page_params = query.statement(limit, after)
+
+        result = await self._session.execute(statement, {**(params or {}), **page_params})
+        rows = result.all()
+        next_cursor = encode_cursor(rows[limit - 1][1:]) if len(rows) > limit else None
+        return Page(items=[row[0] for row in rows[:limit]], next_cursor=next_cursor)
+
     async def add(self, values: BaseModel):
         values_dict = values.model_dump(exclude_unset=True)
-        logger.info(f"Добавление записи {self.model.__name__} с параметрами: {values_dict}")
+        logger.info("Добавление записи {} с параметрами: {}", self.model.__name__, values_dict)
         try:
             new_instance = self.model(**values_dict)
             self._session.add(new_instance)
-            logger.info(f"Запись {self.model.__name__} успешно добавлена.")
+            logger.info("Запись {} успешно добавлена.", self.model.__name__)
             await self._session.flush()
             return new_instance
         except SQLAlchemyError as e:
-            logger.error(f"Ошибка при добавлении записи: {e}")
+            logger.error("Ошибка при добавлении записи: {}", e)
             raise
 
     async def add_many(self, instances: List[BaseModel]):
         values_list = [item.model_dump(exclude_unset=True) for item in instances]
-        logger.info(f"Добавление нескольких записей {self.model.__name__}. Количество: {len(values_list)}")
+        logger.info("Добавление нескольких записей {}. Количество: {}", self.model.__name__, len(values_list))
         try:
             new_instances = [self.model(**values) for values in values_list]
             self._session.add_all(new_instances)
-            logger.info(f"Успешно добавлено {len(new_instances)} записей.")
+            logger.info("Успешно добавлено {} записей.", len(new_instances))
             await self._session.flush()
             return new_instances
         except SQLAlchemyError as e:
-            logger.error(f"Ошибка при добавлении нескольких записей: {e}")
+            logger.error("Ошибка при добавлении нескольких записей: {}", e)
             raise
 
     async def update(self, filters: BaseModel, values: BaseModel):
         filter_dict = filters.model_dump(exclude_unset=True)
         values_dict = values.model_dump(exclude_unset=True)
         logger.info(
-            f"Обновление записей {self.model.__name__} по фильтру: {filter_dict} с параметрами: {values_dict}")
+            "Обновление записей {} по фильтру: {} с параметрами: {}", self.model.__name__, filter_dict, values_dict
+        )
         try:
             query = (
                 sqlalchemy_update(self.model)
@@ -96,63 +208,141 @@ class BaseDAO(Generic[T]):
                 .execution_options(synchronize_session="fetch")
             )
             result = await self._session.execute(query)
-            logger.info(f"Обновлено {result.rowcount} записей.")
+            logger.info("Обновлено {} записей.", result.rowcount)
             await self._session.flush()
             return result.rowcount
         except SQLAlchemyError as e:
-            logger.error(f"Ошибка при обновлении записей: {e}")
+            logger.error("Ошибка при обновлении записей: {}", e)
             raise
 
     async def delete(self, filters: BaseModel):
         filter_dict = filters.model_dump(exclude_unset=True)
-        logger.info(f"Удаление записей {self.model.__name__} по фильтру: {filter_dict}")
+        logger.info("Удаление записей {} по фильтру: {}", self.model.__name__, filter_dict)
         if not filter_dict:
             logger.error("Нужен хотя бы один фильтр для удаления.")
             raise ValueError("Нужен хотя бы один фильтр для удаления.")
         try:
             query = sqlalchemy_delete(self.model).filter_by(**filter_dict)
             result = await self._session.execute(query)
-            logger.info(f"Удалено {result.rowcount} записей.")
+            logger.info("Удалено {} записей.", result.rowcount)
             await self._session.flush()
             return result.rowcount
         except SQLAlchemyError as e:
-            logger.error(f"Ошибка при удалении записей: {e}")
+            logger.error("Ошибка при удалении записей: {}", e)
             raise
 
     async def count(self, filters: BaseModel | None = None):
         filter_dict = filters.model_dump(exclude_unset=True) if filters else {}
-        logger.info(f"Подсчет количества записей {self.model.__name__} по фильтру: {filter_dict}")
+        logger.debug("Подсчет количества записей {} по фильтру: {}", self.model.__name__, filter_dict)
         try:
             query = select(func.count(self.model.id)).filter_by(**filter_dict)
             result = await self._session.execute(query)
             count = result.scalar()
-            logger.info(f"Найдено {count} записей.")
+            logger.debug("Найдено {} записей.", count)
             return count
         except SQLAlchemyError as e:
-            logger.error(f"Ошибка при подсчете записей: {e}")
+            logger.error("Ошибка при подсчете записей: {}", e)
             raise
 
-    async def bulk_update(self, records: List[BaseModel]):
-        logger.info(f"Массовое обновление записей {self.model.__name__}")
+    async def bulk_update(
+            self,
+            records: Sequence[BaseModel | Mapping[str, Any]],
+            batch_size: int = 1000
+    ) -> BulkResult:
+        """Массовое обновление по id одним ``UPDATE ... FROM (VALUES ...)`` на пачку.
+
+        Записи группируются по набору обновляемых полей; записи без id пропускаются.
+        """
+        logger.info("Массовое обновление записей {}", self.model.__name__)
         try:
-            updated_count = 0
-            for record in records:
-                record_dict = record.model_dump(exclude_unset=True)
-                if 'id' not in record_dict:
+            timer = BulkTimer()
+            groups: dict[tuple, list] = {}
+            for record in as_dicts(records):
+                if 'id' not in record:
                     continue
+                fields = tuple(sorted(k for k in record if k != 'id'))
+                if fields:
+                    groups.setdefault(fields, []).append(record)
 
-                update_data = {k: v for k, v in record_dict.items() if k != 'id'}
-                stmt = (
-                    sqlalchemy_update(self.model)
-                    .filter_by(id=record_dict['id'])
-                    .values(**update_data)
-                )
-                result = await self._session.execute(stmt)
-                updated_count += result.rowcount
+            for fields, group in groups.items():
+                keys = ('id', *fields)
+                size = params_batch_size(batch_size, len(keys))
+                for start in range(0, len(group), size):
+                    batch = group[start:start + size]
+                    data = values(
+                        *[column(key, self.model.__table__.c[key].type) for key in keys],
+                        name='data'
+                    ).data([tuple(record[key] for key in keys) for record in batch])
+                    update_values = {key: data.c[key] for key in fields}
+                    if 'updated_at' in self.model.__table__.c and 'updated_at' not in fields:
+                        update_values['updated_at'] = func.now()
+                    stmt = (
+                        sqlalchemy_update(self.model)
+                        .where(self.model.id == data.c.id)
+                        .values(update_values)
+                        .execution_options(synchronize_session=False)
+                    )
+                    result = await self._session.execute(stmt)
+                    timer.batch(result.rowcount)
 
-            logger.info(f"Обновлено {updated_count} записей")
             await self._session.flush()
-            return updated_count
+            result = timer.stop()
+            result.log("Массовое обновление", self.model.__tablename__)
+            return result
         except SQLAlchemyError as e:
-            logger.error(f"Ошибка при массовом обновлении: {e}")
-            raise
\ No newline at end of file
+            logger.error("Ошибка при массовом обновлении: {}", e)
+            raise
+
+    async def bulk_upsert(
+            self,
+            records: Sequence[BaseModel | Mapping[str, Any]],
+            conflict_keys: Sequence[str] = ('id',),
+            update_columns: Optional[Sequence[str]] = None,
+            batch_size: int = 1000
+    ) -> BulkResult:
+        """``INSERT ... ON CONFLICT (conflict_keys) DO UPDATE`` пачками через executemany.
+
+        Записи группируются по набору переданных полей, у каждой группы свой
+        запрос. При конфликте обновляются переданные поля записи, кроме ключей
+        (только перечисленные в ``update_columns``, если он задан); поля, которых
+        в записи нет, не затираются. Пустой набор обновляемых полей означает
+        ``DO NOTHING``.
+        """
+        values_list = as_dicts(records)
+        logger.info("Массовая вставка/обновление записей {}. Количество: {}", self.model.__name__, len(values_list))
+        if not values_list:
+            return BulkResult()
+        try:
+            timer = BulkTimer()
+            groups: dict[tuple, list] = {}
+            for record in values_list:
+                groups.setdefault(tuple(sorted(record)), []).append(record)
+
+            for fields, group in groups.items():
+                stmt = self._upsert_statement(
+                    conflict_keys,
+                    [key for key in (fields if update_columns is None else update_columns)
+                     if key in fields and key not in conflict_keys]
+                )
+                for start in range(0, len(group), batch_size):
+                    batch = group[start:start + batch_size]
+                    await self._session.execute(stmt, batch)
+                    timer.batch(len(batch))
+
+            result = timer.stop()
+            result.log("Массовая вставка/обновление", self.model.__tablename__)
+            return result
+        except SQLAlchemyError as e:
+            logger.error("Ошибка при массовой вставке/обновлении: {}", e)
+            raise
+
+    def _upsert_statement(self, conflict_keys: Sequence[str], update_columns: Sequence[str]):
+        stmt = pg_insert(self.model)
+        if not update_columns:
+            return stmt.on_conflict_do_nothing(index_elements=list(conflict_keys))
+        set_ = {key: stmt.excluded[key] for key in update_columns}
+        if 'updated_at' in self.model.__table__.c and 'updated_at' not in set_:
+            set_['updated_at'] = func.now()
+        return stmt.on_conflict_do_update(index_elements=list(conflict_keys), set_=set_)
+
+track_dao_methods(BaseDAO)
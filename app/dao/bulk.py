@@ -0,0 +1,97 @@
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Mapping, Sequence
+
+from loguru import logger
+from pydantic import BaseModel
+from sqlalchemy import Table
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.cache.response_cache import mark_tables_changed
+
+# asyncpg ограничивает число параметров одного запроса 32767
+MAX_QUERY_PARAMS = 32767
+
+
+@dataclass
+class BulkResult:
+    rows: int = 0
+    batches: int = 0
+    seconds: float = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0.0
+
+    def add(self, other: "BulkResult") -> "BulkResult":
+        return BulkResult(
+            rows=self.rows + other.rows,
+            batches=self.batches + other.batches,
+            seconds=self.seconds + other.seconds
+        )
+
+    def log(self, operation: str, table: str) -> None:
+        logger.info(
+            "{} {}: {} записей, {} пачек за {:.2f}с ({:.0f} записей/с)",
+            operation, table, self.rows, self.batches, self.seconds, self.rows_per_second
+        )
+
+
+class BulkTimer:
+    def __init__(self):
+        self.result = BulkResult()
+        self._started = time.perf_counter()
+
+    def batch(self, rows: int) -> None:
+        self.result.rows += rows
+        self.result.batches += 1
+
+    def stop(self) -> BulkResult:
+        self.result.seconds = time.perf_counter() - self._started
+        return self.result
+
+
+def as_dicts(records: Iterable[BaseModel | Mapping[str, Any]]) -> List[Dict[str, Any]]:
+    return [
+        record.model_dump(exclude_unset=True) if isinstance(record, BaseModel) else dict(record)
+        for record in records
+    ]
+
+
+def params_batch_size(batch_size: int, columns: int) -> int:
+    """Размер пачки, при котором многострочный запрос укладывается в лимит параметров."""
+    return max(1, min(batch_size, MAX_QUERY_PARAMS // max(columns, 1)))
+
+
+async def copy_records(
+        session: AsyncSession,
+        table: Table,
+        columns: Sequence[str],
+        records: Sequence[Sequence[Any]],
+        batch_size: int = 10000
+) -> BulkResult:
+    """Загрузка строк через COPY (asyncpg ``copy_records_to_table``) в транзакции сессии.
+
+    Записи передаются кортежами в порядке ``columns``; колонки, не указанные в
+    ``columns``, получают значения по умолчанию. Типы значений должны
+    совпадать с типами колонок - COPY идёт в бинарном формате без приведения.
+    """
+    timer = BulkTimer()
+    connection = await session.connection()
+    raw_connection = await connection.get_raw_connection()
+    driver_connection = raw_connection.driver_connection
+
+    for start in range(0, len(records), batch_size):
+        batch = records[start:start + batch_size]
+        await driver_connection.copy_records_to_table(
+            table.name,
+            records=batch,
+            columns=list(columns),
+            schema_name=table.schema
+        )
+        timer.batch(len(batch))
+
+    mark_tables_changed(session, table.name)
+    result = timer.stop()
+    result.log("COPY", table.name)
+    return result
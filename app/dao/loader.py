@@ -0,0 +1,122 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Generic, Hashable, List, Optional, Sequence, TypeVar
+
+from loguru import logger
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+LOADERS_KEY = "dao_loaders"
+
+BatchLoadFn = Callable[[List[K]], Awaitable[Dict[K, V]]]
+
+
+class Loader(Generic[K, V]):
+    """Группировка и кэширование поиска по ключу в пределах одной сессии (запроса).
+
+    Все вызовы ``load`` за один проход цикла событий собираются в один вызов
+    ``batch_load_fn``, то есть в один запрос ``WHERE id = ANY(...)``. Повторный
+    ``load`` того же ключа возвращает уже загруженный результат без запроса.
+    Отсутствующие ключи возвращают ``None``.
+    """
+
+    def __init__(self, batch_load_fn: BatchLoadFn, name: str = ""):
+        self._batch_load_fn = batch_load_fn
+        self._name = name
+        self._results: Dict[K, asyncio.Future] = {}
+        self._queue: List[K] = []
+        self._dispatch_scheduled = False
+        # сессия не допускает параллельных запросов - пачки выполняются по очереди
+        self._lock = asyncio.Lock()
+        self._tasks: set[asyncio.Task] = set()
+
+    async def load(self, key: K) -> Optional[V]:
+        future = self._results.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            self._results[key] = future
+            self._queue.append(key)
+            if not self._dispatch_scheduled:
+                self._dispatch_scheduled = True
+                loop.call_soon(self._dispatch)
+        return await asyncio.shield(future)
+
+    async def load_many(self, keys: Sequence[K]) -> List[Optional[V]]:
+        return list(await asyncio.gather(*(self.load(key) for key in keys)))
+
+    def prime(self, key: K, value: Optional[V]) -> None:
+        """Кладёт уже известное значение, чтобы не загружать его повторно."""
+        if key not in self._results:
+            future = asyncio.get_running_loop().create_future()
+            future.set_result(value)
+            self._results[key] = future
+
+    def clear(self, key: Optional[K] = None) -> None:
+        if key is None:
+            self._results = {k: f for k, f in self._results.items() if not f.done()}
+        elif key in self._results and self._results[key].done():
+            del self._results[key]
+
+    def _dispatch(self) -> None:
+        keys, self._queue = self._queue, []
+        self._dispatch_scheduled = False
+        if keys:
+            task = asyncio.get_running_loop().create_task(self._run_batch(keys))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run_batch(self, keys: List[K]) -> None:
+        try:
+            async with self._lock:
+                logger.debug("Загрузчик {}: пачка из {} ключей", self._name, len(keys))
+                results = await self._batch_load_fn(keys)
+        except BaseException as e:
+            for key in keys:
+                future = self._results.pop(key, None)
+                if future is not None and not future.done():
+                    future.set_exception(e)
+                    future.exception()
+            if not isinstance(e, Exception):
+                raise
+            return
+
+        for key in keys:
+            future = self._results.get(key)
+            if future is not None and not future.done():
+                future.set_result(results.get(key))
+
+
+class LoaderRegistry:
+    """Загрузчики одной сессии; живёт в ``session.info`` и умирает вместе с ней."""
+
+    def __init__(self):
+        self._loaders: Dict[Hashable, Loader] = {}
+
+    def get(self, key: Hashable, batch_load_fn: BatchLoadFn) -> Loader:
+        loader = self._loaders.get(key)
+        if loader is None:
+            loader = self._loaders[key] = Loader(batch_load_fn, name=getattr(key, "__name__", str(key)))
+        return loader
+
+    def clear(self) -> None:
+        for loader in self._loaders.values():
+            loader.clear()
+
+
+def attach_loaders(session: Any) -> LoaderRegistry:
+    """Создаёт реестр загрузчиков для сессии (обычную или AsyncSession)."""
+    registry = session.info.get(LOADERS_KEY)
+    if registry is None:
+        registry = session.info[LOADERS_KEY] = LoaderRegistry()
+    return registry
+
+
+@event.listens_for(Session, "after_rollback")
+def _clear_loaders_after_rollback(session: Session) -> None:
+    # после отката загруженные объекты просрочены, кэш загрузчиков недействителен
+    registry = session.info.get(LOADERS_KEY)
+    if registry is not None:
+        registry.clear()
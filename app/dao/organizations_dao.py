@@ -1,17 +1,48 @@
-from typing import Optional, List
+import re
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload, joinedload
+from app.config import settings
 from app.dao.activities_dao import ActivityDAO
 from app.dao.base import BaseDAO
+from app.dao.bulk import BulkResult, BulkTimer, copy_records
+from app.dao.pagination import KeysetQuery, Page, SortKey
+from app.dao.search_planner import (
+    BUILDING_SELECTIVITY,
+    SearchFilter,
+    activity_selectivity,
+    bbox_selectivity,
+    name_selectivity,
+    plan_search,
+    radius_selectivity,
+)
 from sqlalchemy.future import select
 from loguru import logger
 from geoalchemy2 import functions as geo_func, Geography
-from app.models.activities import Activity
-from app.models.buildings import Building
+from app.models.buildings import Building  # noqa: F401 - связь Organization.building
+from app.models.organization_read import OrganizationRead
 from app.models.phones import Phone
-from app.schemas.organizations import OrganizationCreate
+from app.models.secondary import organization_activity
+from app.schemas.geo import BoundingBox
+from app.schemas.organizations import (
+    NameSearchMode,
+    OrganizationCluster,
+    OrganizationCreate,
+    OrganizationSearchFilters,
+    OrganizationSearchSort,
+)
 from app.models.organizations import Organization
-from sqlalchemy import cast
+from sqlalchemy import Float, Integer, Select, Text, any_, bindparam, cast, func, insert, literal, literal_column
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB, aggregate_order_by, array
+from sqlalchemy.sql.elements import BindParameter
+
+
+def jsonb_object(**fields):
+    """``jsonb_build_object('key', value, ...)`` с ключами, встроенными в текст запроса."""
+    args = []
+    for key, value in fields.items():
+        args.extend([literal_column(f"'{key}'"), value])
+    return func.jsonb_build_object(*args, type_=JSONB)
 
 
 class OrganizationDAO(BaseDAO[Organization]):
@@ -19,125 +50,390 @@ class OrganizationDAO(BaseDAO[Organization]):
 
     def __init__(self, session: AsyncSession):
         super().__init__(session)
-        self.default_options = [
-            selectinload(Organization.phones),
-            selectinload(Organization.activities),
-            joinedload(Organization.building)
-        ]
         self.activity_dao = ActivityDAO(session)
+        self.name_sort = ORGANIZATION_NAME_SORT
 
     async def get_by_id_with_relations(self, org_id: int) -> Optional[Organization]:
-        logger.info(f"Получение организации с ID {org_id} со всеми связями")
-        query = (
-            select(self.model)
-            .options(*self.default_options)
-            .filter(self.model.id == org_id)
-        )
-        result = await self._session.execute(query)
+        logger.debug("Получение организации с ID {} со всеми связями", org_id)
+        result = await self._session.execute(ORGANIZATION_WITH_RELATIONS, {"org_id": org_id})
         return result.scalar_one_or_none()
 
+    async def get_detail(self, org_id: int) -> Optional[Dict[str, Any]]:
+        """Документ OrganizationDetail из модели чтения."""
+        logger.debug("Получение документа организации с ID {}", org_id)
+        result = await self._session.execute(ORGANIZATION_DETAIL, {"org_id": org_id})
+        return result.scalar_one_or_none()
+
+    async def get_details(self, org_ids: Sequence[int]) -> List[Dict[str, Any]]:
+        logger.debug("Получение документов {} организаций", len(org_ids))
+        result = await self._session.execute(ORGANIZATION_DETAILS, {"org_ids": list(org_ids)})
+        return result.scalars().all()
+
     async def get_by_building(
             self,
-            building_id: int
-    ) -> List[Organization]:
-        logger.info(f"Получение организаций в здании {building_id}")
-        query = (
-            select(self.model)
-            .options(*self.default_options)
-            .filter(self.model.building_id == building_id)
+            building_id: int,
+            limit: int = 50,
+            after: Optional[str] = None
+    ) -> Page[Dict[str, Any]]:
+        logger.debug("Получение организаций в здании {}", building_id)
+        return await self.paginate(
+            ORGANIZATIONS_BY_BUILDING, limit=limit, after=after, params={"building_id": building_id}
         )
-        result = await self._session.execute(query)
-        return result.scalars().all()
 
     async def get_by_activity_direct(
             self,
-            activity_id: int
-    ) -> List[Organization]:
-        logger.info(f"Получение организаций по деятельности {activity_id}")
-        query = (
-            select(self.model)
-            .options(*self.default_options)
-            .join(Organization.activities)
-            .filter(Activity.id == activity_id)
+            activity_id: int,
+            limit: int = 50,
+            after: Optional[str] = None
+    ) -> Page[Dict[str, Any]]:
+        logger.debug("Получение организаций по деятельности {}", activity_id)
+        return await self.paginate(
+            ORGANIZATIONS_BY_ACTIVITY, limit=limit, after=after, params={"activity_id": activity_id}
         )
-        result = await self._session.execute(query)
-        return result.scalars().all()
 
     async def get_by_activity_with_children(
             self,
-            activity_id: int
-    ) -> List[Organization]:
-        logger.info(f"Получение организаций по деятельности {activity_id} с подкатегориями")
+            activity_id: int,
+            limit: int = 50,
+            after: Optional[str] = None
+    ) -> Page[Dict[str, Any]]:
+        logger.debug("Получение организаций по деятельности {} с подкатегориями", activity_id)
 
-        cte = (
-            select(Activity.id)
-            .where(Activity.id == activity_id)
-            .cte(name="activity_tree", recursive=True)
+        activity_ids = await self.activity_dao.get_subtree_ids(activity_id)
+        return await self.paginate(
+            ORGANIZATIONS_BY_ACTIVITIES, limit=limit, after=after, params={"activity_ids": activity_ids}
         )
 
-        cte = cte.union_all(
-            select(Activity.id)
-            .where(Activity.parent_id == cte.c.id)
-        )
+    async def stream_export(
+            self,
+            building_id: Optional[int] = None,
+            activity_id: Optional[int] = None,
+            bbox: Optional[BoundingBox] = None,
+            yield_per: int = 1000
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Построчная выгрузка организаций (документы OrganizationList) в порядке id.
 
-        query = (
-            select(self.model)
-            .options(*self.default_options)
-            .distinct()
-            .join(Organization.activities)
-            .join(cte, Activity.id == cte.c.id)
+        Строки читаются через серверный курсор пачками по ``yield_per``, так что
+        память не зависит от размера выгрузки. Вид деятельности учитывается
+        вместе со всеми подкатегориями.
+        """
+        logger.info(
+            "Выгрузка организаций: здание {}, деятельность {}, область {}",
+            building_id, activity_id, bbox.model_dump() if bbox else None
         )
+        query = self._lean_select().order_by(OrganizationRead.id)
+        if building_id is not None:
+            query = query.where(OrganizationRead.building_id == building_id)
+        if activity_id is not None:
+            activity_ids = await self.activity_dao.get_subtree_ids(activity_id)
+            query = query.where(self._has_any_activity(activity_ids))
+        if bbox is not None:
+            query = query.where(geo_func.ST_Intersects(OrganizationRead.geometry, self._envelope(bbox)))
 
-        result = await self._session.execute(query)
-        return result.scalars().all()
+        result = await self._session.stream_scalars(query, execution_options={'yield_per': yield_per})
+        async for document in result:
+            yield document
 
     async def search_by_name(
             self,
-            query: str
-    ) -> List[Organization]:
-        logger.info(f"Поиск организаций по названию: {query}")
-        search_query = (
-            select(self.model)
-            .options(*self.default_options)
-            .filter(self.model.name.ilike(f"%{query}%"))
-        )
-        result = await self._session.execute(search_query)
-        return result.scalars().all()
+            query: str,
+            mode: NameSearchMode = NameSearchMode.substring,
+            limit: int = 50,
+            after: Optional[str] = None
+    ) -> Page[Dict[str, Any]]:
+        logger.debug("Поиск организаций по названию: {} (режим {})", query, mode.value)
+        condition, relevance = self._name_search(query, mode)
+        if condition is None:
+            return Page()
+
+        search_query = self._lean_select().filter(condition)
+        sort = [SortKey(relevance, descending=True), SortKey(OrganizationRead.id)]
+        return await self.paginate(search_query, sort, limit, after)
+
+    @staticmethod
+    def _name_search(query: str, mode: NameSearchMode, columns=None):
+        """Условие поиска и выражение релевантности для режима ``mode``.
+
+        prefix - полнотекстовый поиск по префиксам слов (GIN по search_vector),
+        substring - ILIKE по подстроке, fuzzy - нечёткое совпадение по словам
+        (оба через GIN-индекс pg_trgm). ``columns`` - колонки источника
+        (по умолчанию таблица organization_read).
+        """
+        columns = ORGANIZATION_READ_COLUMNS if columns is None else columns
+        if mode is NameSearchMode.prefix:
+            words = re.findall(r"\w+", query)
+            if not words:
+                return None, None
+            ts_query = func.to_tsquery("simple", " & ".join(f"{word}:*" for word in words))
+            return (
+                columns.search_vector.op("@@")(ts_query),
+                func.ts_rank(columns.search_vector, ts_query, type_=Float)
+            )
+
+        if mode is NameSearchMode.fuzzy:
+            return (
+                columns.name.op("%>")(query),
+                func.word_similarity(query, columns.name, type_=Float)
+            )
+
+        return (
+            columns.name.icontains(query, autoescape=True),
+            func.similarity(columns.name, query, type_=Float)
+        )
+
+    async def search(
+            self,
+            filters: OrganizationSearchFilters,
+            limit: int = 50,
+            after: Optional[str] = None
+    ) -> Page[Dict[str, Any]]:
+        """Комбинированный поиск: все заданные фильтры, сортировка и курсор в одном запросе.
+
+        Фильтры упорядочиваются по оценке избирательности (search_planner).
+        Самый избирательный выполняется первым в ``MATERIALIZED`` CTE по своему
+        индексу, остальные фильтры, сортировка и keyset-пагинация применяются
+        уже к отобранным строкам, так что из базы приходит только страница.
+        """
+        search_filters = []
+        relevance = None
+        if filters.query is not None:
+            condition, _ = self._name_search(filters.query, filters.mode)
+            if condition is None:
+                return Page()
+            search_filters.append(SearchFilter(
+                "name",
+                name_selectivity(filters.query, filters.mode),
+                lambda c: self._name_search(filters.query, filters.mode, c)[0]
+            ))
+            relevance = lambda c: self._name_search(filters.query, filters.mode, c)[1]
+
+        if filters.building_id is not None:
+            search_filters.append(SearchFilter(
+                "building", BUILDING_SELECTIVITY, lambda c: c.building_id == filters.building_id
+            ))
+
+        if filters.activity_id is not None:
+            if filters.include_subactivities:
+                activity_ids = await self.activity_dao.get_subtree_ids(filters.activity_id)
+            else:
+                activity_ids = [filters.activity_id]
+            search_filters.append(SearchFilter(
+                "activity",
+                activity_selectivity(len(activity_ids)),
+                lambda c: c.activity_ids.overlap(literal(activity_ids, ARRAY(Integer)))
+            ))
+
+        point = None
+        if filters.latitude is not None and filters.longitude is not None:
+            point = self._geography_point(filters.latitude, filters.longitude)
+        if filters.radius is not None:
+            search_filters.append(SearchFilter(
+                "radius",
+                radius_selectivity(filters.radius, settings.SEARCH_AREA_KM2),
+                lambda c: geo_func.ST_DWithin(c.geog, point, filters.radius)
+            ))
+        if filters.bbox is not None:
+            envelope = self._envelope(filters.bbox)
+            search_filters.append(SearchFilter(
+                "bbox",
+                bbox_selectivity(filters.bbox, settings.SEARCH_AREA_KM2),
+                lambda c: geo_func.ST_Intersects(c.geometry, envelope)
+            ))
+
+        plan = plan_search(search_filters, settings.SEARCH_DRIVING_SELECTIVITY)
+        logger.debug("Комбинированный поиск организаций, план: {}, сортировка {}", plan, filters.sort.value)
+
+        source = OrganizationRead.__table__
+        if plan.driving is not None:
+            source = (
+                select(*[source.c[name] for name in SEARCH_CANDIDATE_COLUMNS])
+                .where(plan.driving.build(source.c))
+                .cte("candidates")
+                .prefix_with("MATERIALIZED")
+            )
+        columns = source.c
+
+        distance = geo_func.ST_Distance(columns.geog, point, type_=Float) if point is not None else None
+        document = columns.document
+        if distance is not None:
+            document = document.op("||", return_type=JSONB)(jsonb_object(distance=distance))
+        query = (
+            select(document)
+            .select_from(source)
+            .where(*[search_filter.build(columns) for search_filter in plan.residual])
+        )
+
+        if filters.sort is OrganizationSearchSort.distance:
+            sort = [SortKey(distance), SortKey(columns.id)]
+        elif filters.sort is OrganizationSearchSort.relevance:
+            sort = [SortKey(relevance(columns), descending=True), SortKey(columns.id)]
+        else:
+            sort = [SortKey(columns.name), SortKey(columns.id)]
+        return await self.paginate(query, sort, limit, after)
 
     async def get_nearby_radius(
             self,
             latitude: float,
             longitude: float,
-            radius: float
-    ) -> List[Organization]:
-        logger.info(f"Поиск организаций в радиусе {radius}м от ({latitude}, {longitude})")
+            radius: float,
+            limit: int = 50,
+            after: Optional[str] = None
+    ) -> Page[Dict[str, Any]]:
+        logger.debug("Поиск организаций в радиусе {}м от ({}, {})", radius, latitude, longitude)
+        return await self.paginate(
+            ORGANIZATIONS_IN_RADIUS,
+            limit=limit,
+            after=after,
+            params={"latitude": latitude, "longitude": longitude, "radius": radius}
+        )
 
-        point = geo_func.ST_SetSRID(
-            geo_func.ST_MakePoint(longitude, latitude),
-            4326
+    async def get_nearest(
+            self,
+            latitude: float,
+            longitude: float,
+            k: int = 10
+    ) -> List[Dict[str, Any]]:
+        logger.debug("Поиск {} ближайших организаций к ({}, {})", k, latitude, longitude)
+
+        point = self._geography_point(latitude, longitude)
+
+        query = (
+            self._lean_select(distance=geo_func.ST_Distance(OrganizationRead.geog, point, type_=Float))
+            .order_by(OrganizationRead.geog.op("<->")(point), OrganizationRead.id)
+            .limit(k)
         )
+        result = await self._session.execute(query)
+        return result.scalars().all()
 
+    async def get_in_bbox(
+            self,
+            bbox: BoundingBox,
+            limit: int = 50,
+            after: Optional[str] = None
+    ) -> Page[Dict[str, Any]]:
+        logger.opt(lazy=True).debug("Поиск организаций в области {}", bbox.model_dump)
         query = (
-            select(self.model)
-            .options(*self.default_options)
-            .join(self.model.building)
-            .where(
-                geo_func.ST_DWithin(
-                    cast(Building.geometry, Geography),
-                    cast(point, Geography),
-                    radius
-                )
+            self._lean_select()
+            .where(geo_func.ST_Intersects(OrganizationRead.geometry, self._envelope(bbox)))
+        )
+        return await self.paginate(query, self.name_sort, limit, after)
+
+    async def get_clusters_in_bbox(
+            self,
+            bbox: BoundingBox,
+            grid_size: int = 16
+    ) -> List[OrganizationCluster]:
+        """Количество организаций по ячейкам сетки ``grid_size`` x ``grid_size`` внутри области.
+
+        Размер ответа ограничен числом ячеек, а не числом организаций.
+        """
+        logger.opt(lazy=True).debug(
+            "Кластеризация организаций в области {}, сетка {size}x{size}", bbox.model_dump, size=lambda: grid_size
+        )
+        cell_width = (bbox.max_longitude - bbox.min_longitude) / grid_size
+        cell_height = (bbox.max_latitude - bbox.min_latitude) / grid_size
+
+        cell_x = func.least(
+            cast(func.floor((OrganizationRead.longitude - bbox.min_longitude) / cell_width), Integer),
+            grid_size - 1
+        ).label("cell_x")
+        cell_y = func.least(
+            cast(func.floor((OrganizationRead.latitude - bbox.min_latitude) / cell_height), Integer),
+            grid_size - 1
+        ).label("cell_y")
+
+        query = (
+            select(
+                cell_x,
+                cell_y,
+                func.count(OrganizationRead.id).label("count"),
+                func.avg(OrganizationRead.latitude).label("latitude"),
+                func.avg(OrganizationRead.longitude).label("longitude")
             )
+            .where(geo_func.ST_Intersects(OrganizationRead.geometry, self._envelope(bbox)))
+            .group_by(cell_x, cell_y)
         )
+        result = await self._session.execute(query)
+        return [
+            OrganizationCluster(
+                latitude=row.latitude,
+                longitude=row.longitude,
+                count=row.count,
+                min_latitude=bbox.min_latitude + row.cell_y * cell_height,
+                min_longitude=bbox.min_longitude + row.cell_x * cell_width,
+                max_latitude=bbox.min_latitude + (row.cell_y + 1) * cell_height,
+                max_longitude=bbox.min_longitude + (row.cell_x + 1) * cell_width
+            )
+            for row in result.all()
+        ]
+
+    @staticmethod
+    def _lean_select(**extra) -> Select:
+        """SELECT одной колонки с готовым JSON-документом в форме OrganizationList.
+
+        Документ берётся из модели чтения organization_read, которую триггеры
+        поддерживают в актуальном состоянии, так что запрос читает одну таблицу.
+        Дополнительные поля (например, distance) передаются в ``extra`` и
+        добавляются к документу.
+        """
+        document = OrganizationRead.document
+        if extra:
+            document = document.op("||", return_type=JSONB)(jsonb_object(**extra))
+        return select(document).select_from(OrganizationRead)
+
+    async def get_organization_version(self, org_id: int) -> Tuple:
+        return await self._version_signal(OrganizationRead.id == org_id)
+
+    async def get_building_version(self, building_id: int) -> Tuple:
+        return await self._version_signal(OrganizationRead.building_id == building_id)
 
+    async def _version_signal(self, condition) -> Tuple:
+        """Дешёвый признак версии набора организаций для ETag.
+
+        Количество строк модели чтения и хэш пар (id, время пересчёта) всех
+        строк: строка пересчитывается при любом изменении организации, её
+        здания, телефонов или видов деятельности, удаление меняет количество.
+        Время пересчёта - момент выполнения, а не коммита, поэтому одного
+        максимума мало: транзакция, закоммиченная позже, может принести более
+        раннее время. Ответ при этом не собирается.
+        """
+        rows = func.string_agg(
+            cast(OrganizationRead.id, Text) + literal(":") + cast(OrganizationRead.refreshed_at, Text),
+            aggregate_order_by(literal(","), OrganizationRead.id)
+        )
+        query = select(func.count(), func.md5(rows)).where(condition)
         result = await self._session.execute(query)
-        return result.scalars().all()
+        return tuple(result.one())
+
+    @staticmethod
+    def _has_any_activity(activity_ids: List[int] | BindParameter):
+        # && по GIN-индексу activity_ids
+        if not isinstance(activity_ids, BindParameter):
+            activity_ids = literal(activity_ids, ARRAY(Integer))
+        return OrganizationRead.activity_ids.overlap(activity_ids)
+
+    @staticmethod
+    def _envelope(bbox: BoundingBox):
+        return geo_func.ST_MakeEnvelope(
+            bbox.min_longitude,
+            bbox.min_latitude,
+            bbox.max_longitude,
+            bbox.max_latitude,
+            4326
+        )
+
+    @staticmethod
+    def _geography_point(latitude: float | BindParameter, longitude: float | BindParameter):
+        return cast(
+            geo_func.ST_SetSRID(geo_func.ST_MakePoint(longitude, latitude), 4326),
+            Geography('POINT', srid=4326)
+        )
 
     async def create_organization(
             self,
             org_data: OrganizationCreate
     ) -> Organization:
-        logger.info(f"Создание организации: {org_data.name}")
+        logger.info("Создание организации: {}", org_data.name)
 
         organization = Organization(
             name=org_data.name,
@@ -146,17 +442,135 @@ class OrganizationDAO(BaseDAO[Organization]):
         )
 
         if org_data.activity_ids:
-            activities = []
-            for activity_id in org_data.activity_ids:
-                activity = await self.activity_dao.find_one_or_none_by_id(activity_id)
-                if activity:
-                    activities.append(activity)
+            activities = await self.activity_dao.loader.load_many(list(dict.fromkeys(org_data.activity_ids)))
+            activities = [activity for activity in activities if activity]
             if activities:
                 organization.activities = activities
 
         self._session.add(organization)
         await self._session.commit()
-        logger.info(f"Создана организация ID={organization.id}, телефонов: {len(organization.phones)}")
-        for phone in organization.phones:
-            logger.info(f"Телефон: {phone.number}, org_id={phone.organization_id}")
+        logger.info(
+            "Создана организация ID={}, телефонов: {}, видов деятельности: {}",
+            organization.id, len(org_data.phones), len(org_data.activity_ids)
+        )
         return await self.get_by_id_with_relations(organization.id)
+
+    async def bulk_create_organizations(
+            self,
+            orgs_data: Sequence[OrganizationCreate],
+            batch_size: int = 1000
+    ) -> BulkResult:
+        """Массовое создание организаций вместе с телефонами и видами деятельности.
+
+        Организации вставляются многострочным INSERT ... RETURNING id, телефоны и
+        связи с видами деятельности - через COPY. Триггеры модели чтения на время
+        загрузки откладывают пересчёт, и organization_read обновляется одним
+        вызовом на пачку вместо трёх. Коммит остаётся за вызывающим.
+        """
+        logger.info("Массовое создание организаций. Количество: {}", len(orgs_data))
+        timer = BulkTimer()
+        stmt = insert(Organization).returning(Organization.id, sort_by_parameter_order=True)
+        await self._session.execute(DEFER_READ_REFRESH, {"value": "on"})
+
+        for start in range(0, len(orgs_data), batch_size):
+            batch = orgs_data[start:start + batch_size]
+            ids = (await self._session.scalars(
+                stmt,
+                [{'name': org.name, 'building_id': org.building_id} for org in batch]
+            )).all()
+
+            phones = [(number, org_id) for org, org_id in zip(batch, ids) for number in org.phones]
+            links = [
+                (org_id, activity_id)
+                for org, org_id in zip(batch, ids)
+                for activity_id in dict.fromkeys(org.activity_ids)
+            ]
+            if phones:
+                await copy_records(self._session, Phone.__table__, ('number', 'organization_id'), phones)
+            if links:
+                await copy_records(
+                    self._session, organization_activity, ('organization_id', 'activity_id'), links
+                )
+            await self._session.execute(REFRESH_ORGANIZATION_READ, {"org_ids": list(ids)})
+            timer.batch(len(ids))
+
+        await self._session.execute(DEFER_READ_REFRESH, {"value": "off"})
+        result = timer.stop()
+        result.log("Массовое создание", Organization.__tablename__)
+        return result
+
+
+# таблицы, из которых собираются ответы об организациях (теги кэша ответов)
+ORGANIZATION_TABLES = ("organizations", "buildings", "phones", "activities", "organization_activity")
+
+# Горячие запросы собираются один раз при импорте: значения передаются
+# параметрами, так что на вызов не тратится сборка выражения, построение
+# ключа кэша компиляции и новый prepare в asyncpg.
+ORGANIZATION_NAME_SORT = [SortKey(OrganizationRead.name), SortKey(OrganizationRead.id)]
+ORGANIZATION_READ_COLUMNS = OrganizationRead.__table__.c
+
+# колонки organization_read, которые нужны фильтрам, сортировке и ответу
+# комбинированного поиска после выполнения первого фильтра
+SEARCH_CANDIDATE_COLUMNS = ("id", "name", "search_vector", "building_id", "activity_ids", "geometry", "geog", "document")
+
+# флаг для триггеров organization_read (миграция a8e3f1d92b64) до конца транзакции
+DEFER_READ_REFRESH = select(
+    func.set_config("organization_read.defer_refresh", bindparam("value"), literal(True))
+)
+REFRESH_ORGANIZATION_READ = select(
+    func.organization_read_refresh(bindparam("org_ids", type_=ARRAY(Integer)))
+)
+
+# POST /organizations возвращает созданную организацию из ORM-объектов
+ORGANIZATION_WITH_RELATIONS = (
+    select(Organization)
+    .options(
+        selectinload(Organization.phones),
+        selectinload(Organization.activities),
+        joinedload(Organization.building)
+    )
+    .where(Organization.id == bindparam("org_id", type_=Integer))
+)
+
+_DETAIL_SELECT = OrganizationDAO._lean_select(
+    created_at=OrganizationRead.created_at,
+    updated_at=OrganizationRead.updated_at
+)
+ORGANIZATION_DETAIL = _DETAIL_SELECT.where(OrganizationRead.id == bindparam("org_id", type_=Integer))
+ORGANIZATION_DETAILS = _DETAIL_SELECT.where(
+    OrganizationRead.id == any_(bindparam("org_ids", type_=ARRAY(Integer)))
+)
+
+ORGANIZATIONS_BY_BUILDING = KeysetQuery(
+    OrganizationDAO._lean_select()
+    .where(OrganizationRead.building_id == bindparam("building_id", type_=Integer)),
+    ORGANIZATION_NAME_SORT
+)
+
+ORGANIZATIONS_BY_ACTIVITY = KeysetQuery(
+    OrganizationDAO._lean_select()
+    .where(OrganizationRead.activity_ids.contains(array([bindparam("activity_id", type_=Integer)]))),
+    ORGANIZATION_NAME_SORT
+)
+
+ORGANIZATIONS_BY_ACTIVITIES = KeysetQuery(
+    OrganizationDAO._lean_select()
+    .where(OrganizationDAO._has_any_activity(bindparam("activity_ids", type_=ARRAY(Integer)))),
+    ORGANIZATION_NAME_SORT
+)
+
+
+def _organizations_in_radius() -> KeysetQuery:
+    point = OrganizationDAO._geography_point(
+        bindparam("latitude", type_=Float),
+        bindparam("longitude", type_=Float)
+    )
+    distance = geo_func.ST_Distance(OrganizationRead.geog, point, type_=Float)
+    return KeysetQuery(
+        OrganizationDAO._lean_select(distance=distance)
+        .where(geo_func.ST_DWithin(OrganizationRead.geog, point, bindparam("radius", type_=Float))),
+        [SortKey(distance), SortKey(OrganizationRead.id)]
+    )
+
+
+ORGANIZATIONS_IN_RADIUS = _organizations_in_radius()
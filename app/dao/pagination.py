@@ -0,0 +1,102 @@
+import base64
+import json
+from dataclasses import dataclass, field
+from typing import Any, Dict, Generic, List, NamedTuple, Optional, Sequence, Tuple, TypeVar
+
+from sqlalchemy import Integer, Select, and_, bindparam, or_, tuple_
+from sqlalchemy.sql.elements import ColumnElement
+
+T = TypeVar("T")
+
+
+class InvalidCursorError(ValueError):
+    """Курсор не удалось разобрать или он не подходит к сортировке запроса."""
+
+
+class SortKey(NamedTuple):
+    column: ColumnElement
+    descending: bool = False
+
+
+@dataclass
+class Page(Generic[T]):
+    items: List[T] = field(default_factory=list)
+    next_cursor: Optional[str] = None
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    raw = json.dumps(list(values), separators=(",", ":"), ensure_ascii=False)
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: Sequence[SortKey]) -> List[Any]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise InvalidCursorError("Некорректный курсор") from e
+
+    if not isinstance(values, list) or len(values) != len(sort):
+        raise InvalidCursorError("Курсор не соответствует сортировке")
+
+    checked = []
+    for key, value in zip(sort, values):
+        try:
+            expected = key.column.type.python_type
+        except NotImplementedError:
+            expected = object
+        if expected is float and isinstance(value, int) and not isinstance(value, bool):
+            value = float(value)
+        if isinstance(value, bool) or not isinstance(value, expected):
+            raise InvalidCursorError("Курсор не соответствует сортировке")
+        checked.append(value)
+    return checked
+
+
+def keyset_condition(sort: Sequence[SortKey], values: Sequence[Any]) -> ColumnElement:
+    """Условие «строго после курсора» для сортировки по ``sort``."""
+    if not any(key.descending for key in sort):
+        return tuple_(*[key.column for key in sort]) > tuple_(*values)
+
+    clauses = []
+    for i, (key, value) in enumerate(zip(sort, values)):
+        step = key.column < value if key.descending else key.column > value
+        equal = [prev.column == prev_value for prev, prev_value in zip(sort[:i], values[:i])]
+        clauses.append(and_(*equal, step))
+    return or_(*clauses)
+
+
+class KeysetQuery:
+    """Запрос с keyset-пагинацией, собранный один раз.
+
+    Ключи сортировки добавляются в SELECT как ``_sort_{i}``, значения курсора и
+    limit передаются параметрами, поэтому для любой страницы выполняется один из
+    двух готовых statement'ов (первая и последующие страницы) без пересборки и
+    повторной компиляции. Первой колонкой запроса должно быть возвращаемое
+    значение (сущность или документ).
+    """
+
+    def __init__(self, query: Select, sort: Sequence[SortKey]):
+        self.sort = list(sort)
+        labels = [key.column.label(f"_sort_{i}") for i, key in enumerate(self.sort)]
+        order = [
+            label.desc() if key.descending else label
+            for key, label in zip(self.sort, labels)
+        ]
+        cursor = [
+            bindparam(f"_after_{i}", type_=key.column.type)
+            for i, key in enumerate(self.sort)
+        ]
+        base = query.add_columns(*labels)
+        limit = bindparam("_page_limit", type_=Integer)
+        self.first_page = base.order_by(*order).limit(limit)
+        self.next_page = base.where(keyset_condition(self.sort, cursor)).order_by(*order).limit(limit)
+
+    def statement(self, limit: int, after: Optional[str] = None) -> Tuple[Select, Dict[str, Any]]:
+        """Statement и параметры страницы; запрашивается ``limit + 1`` строк."""
+        params: Dict[str, Any] = {"_page_limit": limit + 1}
+        if not after:
+            return self.first_page, params
+        values = decode_cursor(after, self.sort)
+        params.update({f"_after_{i}": value for i, value in enumerate(values)})
+        return self.next_page, params
@@ -0,0 +1,76 @@
+import math
+from dataclasses import dataclass
+from typing import Any, Callable, List, Optional, Sequence
+
+from sqlalchemy.sql.elements import ColumnElement
+
+from app.schemas.geo import BoundingBox
+from app.schemas.organizations import NameSearchMode
+
+# Грубые оценки доли организаций, проходящих фильтр. Точность не нужна:
+# планировщику важен только порядок фильтров и то, достаточно ли мала доля
+# самого избирательного из них, чтобы выполнить его первым.
+BUILDING_SELECTIVITY = 0.001
+ACTIVITY_SELECTIVITY = 0.01
+# каждый символ строки поиска примерно вдвое сужает выборку
+NAME_CHAR_SELECTIVITY = 0.5
+NAME_MIN_SELECTIVITY = 0.001
+FUZZY_NAME_FACTOR = 4.0
+KM_PER_DEGREE = 111.32
+
+
+@dataclass
+class SearchFilter:
+    """Фильтр поиска: условие строится по колонкам источника (таблица или CTE)."""
+    name: str
+    selectivity: float
+    build: Callable[[Any], ColumnElement]
+
+
+@dataclass
+class SearchPlan:
+    """``driving`` выполняется первым отдельным подзапросом, ``residual`` - по его строкам."""
+    driving: Optional[SearchFilter]
+    residual: List[SearchFilter]
+
+    def __str__(self) -> str:
+        residual = ", ".join(f"{f.name}~{f.selectivity:.4f}" for f in self.residual)
+        if self.driving is None:
+            return f"[{residual}]"
+        return f"{self.driving.name}~{self.driving.selectivity:.4f} -> [{residual}]"
+
+
+def plan_search(filters: Sequence[SearchFilter], max_driving_selectivity: float) -> SearchPlan:
+    """Фильтры по возрастанию оценки доли строк.
+
+    Если фильтров несколько и самый избирательный отбирает не больше
+    ``max_driving_selectivity`` организаций, он выполняется первым по своему
+    индексу, а остальные проверяются только на отобранных строках. Иначе все
+    условия остаются в одном WHERE и порядок выбирает PostgreSQL.
+    """
+    ordered = sorted(filters, key=lambda f: f.selectivity)
+    if len(ordered) > 1 and ordered[0].selectivity <= max_driving_selectivity:
+        return SearchPlan(ordered[0], ordered[1:])
+    return SearchPlan(None, ordered)
+
+
+def activity_selectivity(activity_count: int) -> float:
+    return min(1.0, ACTIVITY_SELECTIVITY * activity_count)
+
+
+def name_selectivity(query: str, mode: NameSearchMode) -> float:
+    selectivity = max(NAME_MIN_SELECTIVITY, NAME_CHAR_SELECTIVITY ** len(query.strip()))
+    if mode is NameSearchMode.fuzzy:
+        selectivity *= FUZZY_NAME_FACTOR
+    return min(1.0, selectivity)
+
+
+def radius_selectivity(radius: float, area_km2: float) -> float:
+    return min(1.0, math.pi * (radius / 1000) ** 2 / area_km2)
+
+
+def bbox_selectivity(bbox: BoundingBox, area_km2: float) -> float:
+    middle_latitude = math.radians((bbox.min_latitude + bbox.max_latitude) / 2)
+    height = (bbox.max_latitude - bbox.min_latitude) * KM_PER_DEGREE
+    width = (bbox.max_longitude - bbox.min_longitude) * KM_PER_DEGREE * math.cos(middle_latitude)
+    return min(1.0, height * width / area_km2)
@@ -1,6 +1,7 @@
 from datetime import datetime
 
-from sqlalchemy import TIMESTAMP, Integer, func
+from sqlalchemy import TIMESTAMP, Integer, event, func
+from sqlalchemy.exc import InvalidRequestError
 from sqlalchemy.ext.asyncio import (
     AsyncAttrs,
     async_sessionmaker,
@@ -9,15 +10,91 @@ from sqlalchemy.ext.asyncio import (
 from sqlalchemy.orm import (
     DeclarativeBase,
     Mapped,
+    Session,
     declared_attr,
     mapped_column,
 )
 
-from app.config import database_url
+from app.config import database_url, settings
+from app.database.instrumentation import instrument_engine
+from app.database.pool import InstrumentedAsyncPool
+from app.database.replicas import ReplicaRouter, asyncpg_url
 
-engine = create_async_engine(database_url)
+
+def engine_options(name: str, read_only: bool = False) -> dict:
+    """Параметры пула и соединений asyncpg из настроек; ``name`` - метка пула в метриках.
+
+    Соединения ``read_only`` открываются с ``default_transaction_read_only``:
+    любая запись на них отклоняется самим сервером, в том числе в AUTOCOMMIT.
+    """
+    server_settings = {
+        "jit": "on" if settings.DB_JIT else "off",
+        "application_name": settings.DB_APPLICATION_NAME,
+    }
+    if read_only:
+        server_settings["default_transaction_read_only"] = "on"
+    return dict(
+        poolclass=InstrumentedAsyncPool,
+        pool_logging_name=name,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        connect_args={
+            "prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+            "server_settings": server_settings,
+        },
+    )
+
+
+engine = create_async_engine(database_url, **engine_options("primary"))
 async_session_maker = async_sessionmaker(engine, expire_on_commit=False)
 
+# Чтение идёт через отдельные пулы соединений только для чтения: для основного
+# сервера свой пул рядом с пулом записи, реплики используются только для чтения.
+read_router = ReplicaRouter(
+    create_async_engine(database_url, **engine_options("primary_read", read_only=True)),
+    [
+        create_async_engine(asyncpg_url(url), **engine_options(f"replica{number}", read_only=True))
+        for number, url in enumerate(settings.replica_urls, start=1)
+    ],
+    strategy=settings.DB_REPLICA_STRATEGY,
+    check_interval=settings.DB_REPLICA_CHECK_INTERVAL
+)
+all_engines = [engine, *read_router.engines]
+
+for instrumented in all_engines:
+    instrument_engine(instrumented, instrumented.pool.engine_name)
+
+# Чтение в режиме AUTOCOMMIT: asyncpg не открывает транзакцию, поэтому нет
+# BEGIN перед первым запросом и ROLLBACK при возврате соединения в пул.
+# Пул и события общие с исходным движком. Соединение берётся из пула только
+# при первом запросе сессии, ответы из кэша и отказы до запроса пул не трогают.
+# Серверному курсору потоковой выгрузки нужна транзакция, она читает через
+# исходный движок чтения.
+read_only_engines = {
+    source: source.execution_options(isolation_level="AUTOCOMMIT")
+    for source in read_router.engines
+}
+read_session_maker = async_sessionmaker(expire_on_commit=False, autoflush=False, info={"read_only": True})
+
+
+@event.listens_for(Session, "before_flush")
+def _forbid_flush_in_read_only_session(session: Session, flush_context, instances) -> None:
+    if session.info.get("read_only") and (session.new or session.dirty or session.deleted):
+        raise InvalidRequestError("Сессия только для чтения: изменения объектов не сохраняются")
+
+
+def dispose_engines_after_fork() -> None:
+    """Сбрасывает унаследованные от мастер-процесса пулы в дочернем процессе.
+
+    Соединения родителя не закрываются (``close=False``) - они остаются за ним,
+    а воркер открывает свои при первом запросе.
+    """
+    for forked in all_engines:
+        forked.sync_engine.dispose(close=False)
+
 
 class Base(AsyncAttrs, DeclarativeBase):
     __abstract__ = True
@@ -0,0 +1,156 @@
+import asyncio
+import functools
+import inspect
+import re
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable, Optional, Set
+
+from loguru import logger
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.config import settings
+from app.metrics import Histogram
+
+QUERY_DURATION = Histogram(
+    "db_query_duration_seconds",
+    "Время выполнения SQL-запроса",
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+)
+QUERY_ROWS = Histogram(
+    "db_query_rows",
+    "Число строк, возвращённых или изменённых запросом",
+    buckets=(0, 1, 5, 10, 50, 100, 500, 1000, 5000, 10000)
+)
+
+current_dao_method: ContextVar[str] = ContextVar("current_dao_method", default="-")
+
+# движки, для которых уже выполняется фоновый EXPLAIN, и ссылки на задачи
+_explaining: Set[str] = set()
+_explain_tasks: Set[asyncio.Task] = set()
+
+# строковые литералы, идентификаторы в кавычках и комментарии пропускаются целиком,
+# чтобы скобки и слова внутри них не сбивали разбор
+_SQL_TOKEN = re.compile(r"'(?:[^']|'')*'|\"(?:[^\"]|\"\")*\"|--[^\n]*|/\*.*?\*/|[()]|[A-Za-z_]+", re.S)
+_MAIN_OPERATIONS = {"select", "insert", "update", "delete", "merge", "values", "table"}
+
+
+@dataclass
+class QueryTiming:
+    """Суммарное время запросов к БД в рамках одного HTTP-запроса."""
+    seconds: float = 0.0
+    queries: int = 0
+
+
+request_query_timing: ContextVar[Optional[QueryTiming]] = ContextVar("request_query_timing", default=None)
+
+
+def track_dao_method(func: Callable) -> Callable:
+    """Помечает запросы, выполненные внутри корутины, именем метода DAO (``Класс.метод``)."""
+
+    @functools.wraps(func)
+    async def wrapper(self, *args: Any, **kwargs: Any) -> Any:
+        token = current_dao_method.set(f"{type(self).__name__}.{func.__name__}")
+        try:
+            return await func(self, *args, **kwargs)
+        finally:
+            current_dao_method.reset(token)
+
+    return wrapper
+
+
+def track_dao_methods(cls: type) -> None:
+    for name, member in list(vars(cls).items()):
+        if not name.startswith("__") and inspect.iscoroutinefunction(member):
+            setattr(cls, name, track_dao_method(member))
+
+
+def instrument_engine(engine: AsyncEngine, name: str) -> None:
+    """Замер каждого запроса движка: гистограммы, Server-Timing и журнал медленных запросов."""
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        context._query_started = time.perf_counter()
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - context._query_started
+        dao_method = current_dao_method.get()
+        operation = statement_operation(statement)
+
+        QUERY_DURATION.observe(elapsed, engine=name, dao=dao_method, operation=operation)
+        if cursor.rowcount is not None and cursor.rowcount >= 0:
+            QUERY_ROWS.observe(cursor.rowcount, engine=name, dao=dao_method, operation=operation)
+
+        timing = request_query_timing.get()
+        if timing is not None:
+            timing.seconds += elapsed
+            timing.queries += 1
+
+        if elapsed * 1000 >= settings.DB_SLOW_QUERY_MS:
+            logger.warning(
+                "Медленный запрос {:.1f} мс ({}, {}, строк: {}):\n{}",
+                elapsed * 1000, name, dao_method, cursor.rowcount, statement
+            )
+            if operation == "select" and not executemany and settings.DB_EXPLAIN_SLOW_QUERIES:
+                _schedule_explain(engine, name, statement, parameters)
+
+
+@functools.lru_cache(maxsize=2048)
+def statement_operation(statement: str) -> str:
+    """Вид запроса по его основной части: для ``WITH ... SELECT`` это ``select``."""
+    depth = 0
+    first = None
+    for token in _SQL_TOKEN.findall(statement):
+        if token == "(":
+            depth += 1
+        elif token == ")":
+            depth -= 1
+        elif token[0] in "'\"-/":
+            continue
+        elif first is None:
+            first = token.lower()
+            if first != "with":
+                return first
+        elif depth == 0 and token.lower() in _MAIN_OPERATIONS:
+            return token.lower()
+    return first or "-"
+
+
+def _schedule_explain(engine: AsyncEngine, name: str, statement: str, parameters: Any) -> None:
+    """Ставит EXPLAIN медленного запроса в фон, не больше одного на движок одновременно."""
+    if name in _explaining:
+        return
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return
+    _explaining.add(name)
+    task = loop.create_task(_explain(engine, name, statement, parameters))
+    _explain_tasks.add(task)
+    task.add_done_callback(_explain_tasks.discard)
+    task.add_done_callback(lambda _: _explaining.discard(name))
+
+
+async def _explain(engine: AsyncEngine, name: str, statement: str, parameters: Any) -> None:
+    """EXPLAIN (без выполнения) на отдельном соединении из пула.
+
+    Не на соединении запроса: ошибка EXPLAIN (таймаут, отмена) прервала бы его
+    транзакцию, а сам EXPLAIN добавил бы время к ответу. Запросы к временным
+    или ещё не закоммиченным данным на другом соединении не разбираются.
+    """
+    try:
+        async with engine.connect() as connection:
+            raw = await connection.get_raw_connection()
+            rows = await raw.driver_connection.fetch(f"EXPLAIN {statement}", *(parameters or ()))
+    except Exception as e:
+        logger.debug("Не удалось получить план медленного запроса: {}", e)
+        return
+    logger.warning("План медленного запроса ({}):\n{}\n{}", name, statement, "\n".join(row[0] for row in rows))
+
+
+def render_query_metrics() -> Iterable[str]:
+    yield from QUERY_DURATION.render()
+    yield from QUERY_ROWS.render()
@@ -0,0 +1,68 @@
+import time
+from collections import Counter
+from typing import Iterable
+
+from sqlalchemy import exc
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from app.metrics import Histogram, render_gauge
+
+POOL_WAIT = Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Время ожидания соединения из пула",
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0, 30.0)
+)
+POOL_TIMEOUTS: Counter = Counter()
+
+
+class InstrumentedAsyncPool(AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool, который считает время ожидания соединения и таймауты.
+
+    Метка ``engine`` берётся из ``pool_logging_name`` движка. Время ожидания
+    включает установку нового соединения, если свободных в пуле не было.
+    """
+
+    @property
+    def engine_name(self) -> str:
+        return self._orig_logging_name or "default"
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            POOL_TIMEOUTS[self.engine_name] += 1
+            raise
+        POOL_WAIT.observe(time.perf_counter() - started, engine=self.engine_name)
+        return connection
+
+
+def render_pool_metrics(engines: Iterable[AsyncEngine]) -> Iterable[str]:
+    pools = [
+        (engine.pool.engine_name, engine.pool)
+        for engine in engines
+        if isinstance(engine.pool, InstrumentedAsyncPool)
+    ]
+    yield from render_gauge(
+        "db_pool_size", "Размер пула",
+        [({"engine": name}, pool.size()) for name, pool in pools]
+    )
+    yield from render_gauge(
+        "db_pool_checked_out", "Выданные соединения",
+        [({"engine": name}, pool.checkedout()) for name, pool in pools]
+    )
+    yield from render_gauge(
+        "db_pool_idle", "Свободные соединения в пуле",
+        [({"engine": name}, pool.checkedin()) for name, pool in pools]
+    )
+    yield from render_gauge(
+        "db_pool_overflow", "Соединения сверх pool_size (отрицательное - ещё не открытые)",
+        [({"engine": name}, pool.overflow()) for name, pool in pools]
+    )
+    yield from render_gauge(
+        "db_pool_timeouts_total", "Таймауты ожидания соединения",
+        [({"engine": name}, POOL_TIMEOUTS[name]) for name, _ in pools],
+        kind="counter"
+    )
+    yield from POOL_WAIT.render()
@@ -0,0 +1,98 @@
+import asyncio
+import itertools
+import time
+from typing import Dict, Iterable, List, Sequence
+
+from loguru import logger
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.metrics import render_gauge
+
+
+def asyncpg_url(url: str) -> str:
+    """DSN реплики в виде URL SQLAlchemy с драйвером asyncpg."""
+    return make_url(url).set(drivername="postgresql+asyncpg").render_as_string(hide_password=False)
+
+
+class ReplicaRouter:
+    """Выбор движка для сессий только на чтение.
+
+    Реплики выбираются по кругу (``round_robin``) или по наименьшему числу
+    выданных соединений (``least_connections``). Реплика, на которой упал
+    запрос или проверка ``SELECT 1``, исключается до следующей успешной
+    проверки; проверки идут в фоне не чаще ``check_interval``. Если живых
+    реплик нет, чтение уходит на основной сервер.
+    """
+
+    def __init__(
+            self,
+            primary: AsyncEngine,
+            replicas: Sequence[AsyncEngine],
+            strategy: str = "round_robin",
+            check_interval: float = 5.0,
+            check_timeout: float = 2.0
+    ):
+        if strategy not in ("round_robin", "least_connections"):
+            raise ValueError(f"Неизвестная стратегия выбора реплики: {strategy}")
+        self.primary = primary
+        self.replicas = list(replicas)
+        self.strategy = strategy
+        self.check_interval = check_interval
+        self.check_timeout = check_timeout
+        self._healthy: Dict[AsyncEngine, bool] = {replica: True for replica in self.replicas}
+        self._checked_at: Dict[AsyncEngine, float] = {replica: 0.0 for replica in self.replicas}
+        self._checking: Dict[AsyncEngine, asyncio.Task] = {}
+        self._counter = itertools.count()
+
+    def choose(self) -> AsyncEngine:
+        self._schedule_checks()
+        healthy = [replica for replica in self.replicas if self._healthy[replica]]
+        if not healthy:
+            return self.primary
+        if self.strategy == "least_connections":
+            return min(healthy, key=lambda replica: replica.pool.checkedout())
+        return healthy[next(self._counter) % len(healthy)]
+
+    def mark_failed(self, replica: AsyncEngine) -> None:
+        if replica in self._healthy and self._healthy[replica]:
+            logger.warning("Реплика {} исключена из чтения", replica.url.host)
+            self._healthy[replica] = False
+            self._checked_at[replica] = time.monotonic()
+
+    @property
+    def engines(self) -> List[AsyncEngine]:
+        return [self.primary, *self.replicas]
+
+    def render_metrics(self) -> Iterable[str]:
+        yield from render_gauge(
+            "db_replica_healthy", "Реплика доступна для чтения",
+            [({"engine": replica.pool.logging_name or replica.url.host}, float(self._healthy[replica]))
+             for replica in self.replicas]
+        )
+
+    def _schedule_checks(self) -> None:
+        now = time.monotonic()
+        for replica in self.replicas:
+            if now - self._checked_at[replica] < self.check_interval or replica in self._checking:
+                continue
+            self._checked_at[replica] = now
+            task = asyncio.get_running_loop().create_task(self._check(replica))
+            self._checking[replica] = task
+            task.add_done_callback(lambda _, replica=replica: self._checking.pop(replica, None))
+
+    async def _check(self, replica: AsyncEngine) -> None:
+        try:
+            async with asyncio.timeout(self.check_timeout):
+                async with replica.connect() as connection:
+                    await connection.execute(text("SELECT 1"))
+        except Exception as e:
+            if self._healthy[replica]:
+                logger.warning("Реплика {} недоступна: {}", replica.url.host, e)
+            self._healthy[replica] = False
+            return
+        if not self._healthy[replica]:
+            logger.info("Реплика {} снова доступна", replica.url.host)
+        self._healthy[replica] = True
+
@@ -1,27 +1,81 @@
+import hashlib
+import hmac
+import math
+from typing import FrozenSet
+
 from fastapi import Security, HTTPException, status
 from fastapi.security import APIKeyHeader
-from starlette.requests import Request
 from loguru import logger
+from starlette.requests import Request
 from app.config import settings
+from app.logger import sampled
+from app.rate_limit import RATE_LIMITED, TokenBucketLimiter
 
 API_KEY_NAME = "X-API-Key"
 
 api_key_header = APIKeyHeader(name=API_KEY_NAME, auto_error=False)
 
 
+def hash_api_key(api_key: str) -> bytes:
+    return hashlib.sha256(api_key.encode()).digest()
+
+
+def _load_api_key_hashes() -> FrozenSet[bytes]:
+    """Хэши допустимых ключей: из API_KEY_HASHES и открытого API_KEY, один раз при старте."""
+    hashes = {bytes.fromhex(key_hash) for key_hash in settings.api_key_hashes}
+    if settings.API_KEY:
+        hashes.add(hash_api_key(settings.API_KEY))
+    if not hashes:
+        logger.error("Не задан ни один API ключ (API_KEY или API_KEY_HASHES), все запросы будут отклонены")
+    return frozenset(hashes)
+
+
+API_KEY_HASHES = _load_api_key_hashes()
+
+rate_limiter = TokenBucketLimiter(
+    rate=settings.RATE_LIMIT_PER_SECOND,
+    burst=settings.RATE_LIMIT_BURST,
+    max_clients=settings.RATE_LIMIT_MAX_CLIENTS
+)
+
+
+def _is_valid_key_hash(key_hash: bytes) -> bool:
+    # сравниваем со всеми ключами без раннего выхода, каждое сравнение - за постоянное время
+    valid = False
+    for known_hash in API_KEY_HASHES:
+        valid |= hmac.compare_digest(key_hash, known_hash)
+    return valid
+
+
 async def verify_api_key(
         request: Request,
         api_key: str = Security(api_key_header)
 ):
+    client_ip = request.client.host if request.client else "-"
+    key_hash = hash_api_key(api_key) if api_key else b""
+    valid = bool(api_key) and _is_valid_key_hash(key_hash)
+
+    if settings.RATE_LIMIT_ENABLED:
+        # запросы без ключа или с неверным ключом делят одну корзину на IP
+        retry_after = rate_limiter.acquire((key_hash if valid else b"", client_ip))
+        if retry_after:
+            RATE_LIMITED["authorized" if valid else "unauthorized"] += 1
+            sampled(settings.LOG_SAMPLE_RATE).warning("Превышен лимит запросов. IP: {}", client_ip)
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many requests",
+                headers={"Retry-After": str(math.ceil(retry_after))}
+            )
+
     if not api_key:
-        logger.warning(f"Отсутствует API ключ. IP: {request.client.host}")
+        sampled(settings.LOG_SAMPLE_RATE).warning("Отсутствует API ключ. IP: {}", client_ip)
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="API Key is missing"
         )
 
-    if api_key != settings.API_KEY:
-        logger.warning(f"Неверный API ключ: {api_key}. IP: {request.client.host}")
+    if not valid:
+        sampled(settings.LOG_SAMPLE_RATE).warning("Неверный API ключ. IP: {}", client_ip)
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Invalid API Key"
@@ -1,11 +1,19 @@
 from typing import AsyncGenerator
+from sqlalchemy.exc import InterfaceError, OperationalError
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.database.db import async_session_maker
+from app.dao.loader import attach_loaders
+from app.database.db import (
+    async_session_maker,
+    read_only_engines,
+    read_router,
+    read_session_maker,
+)
 
 
 async def get_session_with_commit() -> AsyncGenerator[AsyncSession, None]:
     """Асинхронная сессия с автоматическим коммитом."""
     async with async_session_maker() as session:
+        attach_loaders(session)
         try:
             yield session
             await session.commit()
@@ -17,12 +25,37 @@ async def get_session_with_commit() -> AsyncGenerator[AsyncSession, None]:
 
 
 async def get_session_without_commit() -> AsyncGenerator[AsyncSession, None]:
-    """Асинхронная сессия без автоматического коммита."""
-    async with async_session_maker() as session:
-        try:
-            yield session
-        except Exception:
-            await session.rollback()
-            raise
-        finally:
-            await session.close()
\ No newline at end of file
+    """Сессия только для чтения на реплике (или основном сервере) в режиме AUTOCOMMIT.
+
+    Соединение берётся из пула при первом запросе; откатывать нечего, поэтому
+    при выходе сессия только закрывается.
+    """
+    read_engine = read_router.choose()
+    session = read_session_maker(bind=read_only_engines[read_engine])
+    attach_loaders(session)
+    try:
+        yield session
+    except (OperationalError, InterfaceError, OSError):
+        read_router.mark_failed(read_engine)
+        raise
+    finally:
+        await session.close()
+
+
+async def get_streaming_session() -> AsyncGenerator[AsyncSession, None]:
+    """Сессия только для чтения для потоковой выгрузки через серверный курсор.
+
+    Курсор требует транзакции, поэтому сессия работает не в AUTOCOMMIT, а в
+    обычной транзакции на соединении только для чтения; она открывается первым
+    запросом и откатывается при закрытии сессии, уже после отправки ответа.
+    """
+    read_engine = read_router.choose()
+    session = read_session_maker(bind=read_engine)
+    attach_loaders(session)
+    try:
+        yield session
+    except (OperationalError, InterfaceError, OSError):
+        read_router.mark_failed(read_engine)
+        raise
+    finally:
+        await session.close()
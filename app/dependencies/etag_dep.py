@@ -0,0 +1,69 @@
+import hashlib
+from typing import Optional, Sequence
+from fastapi import Depends, HTTPException, Request, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.cache.response_cache import response_cache
+from app.dao.organizations_dao import ORGANIZATION_TABLES, OrganizationDAO
+from app.dependencies.dao_dep import get_session_without_commit
+
+
+def make_etag(request: Request, version: Sequence) -> str:
+    """Слабый ETag из признака версии данных и параметров запроса."""
+    raw = f"{request.url.path}?{request.url.query}|{version!r}"
+    return f'W/"{hashlib.sha1(raw.encode()).hexdigest()}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return "*" in candidates or etag.removeprefix("W/") in candidates
+
+
+# Признак версии кэшируется рядом с ответами и сбрасывается вместе с ними
+# (после коммита и по NOTIFY): при попадании в кэш запрос не берёт соединение из пула.
+
+
+def apply_etag(request: Request, response: Response, etag: str) -> str:
+    """Отвечает 304 Not Modified, если клиент прислал актуальный ETag, иначе выставляет заголовки.
+
+    ETag возвращается, чтобы эндпоинт принял его параметром: тогда он входит
+    в ключ кэша ответов, и тело из кэша всегда соответствует отданному ETag.
+    """
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        raise HTTPException(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    response.headers.update(headers)
+    return etag
+
+
+async def organization_etag(
+        organization_id: int,
+        request: Request,
+        response: Response,
+        session: AsyncSession = Depends(get_session_without_commit)
+) -> Optional[str]:
+    version = await response_cache.get_or_load(
+        f"etag:organization:{organization_id}",
+        ORGANIZATION_TABLES,
+        lambda: OrganizationDAO(session).get_organization_version(organization_id)
+    )
+    if version[0]:
+        return apply_etag(request, response, make_etag(request, version))
+    return None
+
+
+async def building_organizations_etag(
+        building_id: int,
+        request: Request,
+        response: Response,
+        session: AsyncSession = Depends(get_session_without_commit)
+) -> Optional[str]:
+    version = await response_cache.get_or_load(
+        f"etag:building:{building_id}",
+        ORGANIZATION_TABLES,
+        lambda: OrganizationDAO(session).get_building_version(building_id)
+    )
+    if version[0]:
+        return apply_etag(request, response, make_etag(request, version))
+    return None
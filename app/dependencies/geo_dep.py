@@ -0,0 +1,44 @@
+from typing import Optional
+from fastapi import HTTPException, Query, status
+from app.schemas.geo import BoundingBox
+
+
+async def get_bounding_box(
+        min_lat: float = Query(..., ge=-90, le=90, description="Южная граница"),
+        min_lon: float = Query(..., ge=-180, le=180, description="Западная граница"),
+        max_lat: float = Query(..., ge=-90, le=90, description="Северная граница"),
+        max_lon: float = Query(..., ge=-180, le=180, description="Восточная граница")
+) -> BoundingBox:
+    return _make_bounding_box(min_lat, min_lon, max_lat, max_lon)
+
+
+async def get_optional_bounding_box(
+        min_lat: Optional[float] = Query(None, ge=-90, le=90, description="Южная граница"),
+        min_lon: Optional[float] = Query(None, ge=-180, le=180, description="Западная граница"),
+        max_lat: Optional[float] = Query(None, ge=-90, le=90, description="Северная граница"),
+        max_lon: Optional[float] = Query(None, ge=-180, le=180, description="Восточная граница")
+) -> Optional[BoundingBox]:
+    """Область карты как необязательный фильтр: либо все четыре границы, либо ни одной."""
+    bounds = (min_lat, min_lon, max_lat, max_lon)
+    if all(bound is None for bound in bounds):
+        return None
+    if any(bound is None for bound in bounds):
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Bounding box requires min_lat, min_lon, max_lat and max_lon"
+        )
+    return _make_bounding_box(*bounds)
+
+
+def _make_bounding_box(min_lat: float, min_lon: float, max_lat: float, max_lon: float) -> BoundingBox:
+    if min_lat >= max_lat or min_lon >= max_lon:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Bounding box must have min_lat < max_lat and min_lon < max_lon"
+        )
+    return BoundingBox(
+        min_latitude=min_lat,
+        min_longitude=min_lon,
+        max_latitude=max_lat,
+        max_longitude=max_lon
+    )
@@ -0,0 +1,10 @@
+from typing import Optional
+from fastapi import Query
+from app.schemas.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, PageParams
+
+
+async def get_page_params(
+        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Размер страницы"),
+        after: Optional[str] = Query(None, description="Курсор next_cursor из предыдущего ответа")
+) -> PageParams:
+    return PageParams(limit=limit, after=after)
@@ -0,0 +1,64 @@
+from typing import Optional
+from fastapi import Depends, HTTPException, Query, status
+from app.dependencies.geo_dep import get_optional_bounding_box
+from app.schemas.geo import BoundingBox
+from app.schemas.organizations import NameSearchMode, OrganizationSearchFilters, OrganizationSearchSort
+
+
+async def get_search_filters(
+        query: Optional[str] = Query(None, min_length=2, max_length=100, description="Название для поиска"),
+        mode: NameSearchMode = Query(
+            NameSearchMode.substring,
+            description="prefix - по началу слов, substring - по подстроке, fuzzy - нечёткий поиск"
+        ),
+        activity_id: Optional[int] = Query(None, description="Вид деятельности"),
+        include_subactivities: bool = Query(False, description="Учитывать подкатегории вида деятельности"),
+        building_id: Optional[int] = Query(None, description="Здание"),
+        latitude: Optional[float] = Query(None, ge=-90, le=90, description="Широта точки"),
+        longitude: Optional[float] = Query(None, ge=-180, le=180, description="Долгота точки"),
+        radius: Optional[float] = Query(None, gt=0, le=50000, description="Радиус от точки в метрах (макс 50км)"),
+        bbox: Optional[BoundingBox] = Depends(get_optional_bounding_box),
+        sort: Optional[OrganizationSearchSort] = Query(
+            None,
+            description="По умолчанию relevance при поиске по названию, distance при заданной точке, иначе name"
+        )
+) -> OrganizationSearchFilters:
+    """Фильтры /organizations/search: любые сочетания, но хотя бы один фильтр."""
+    has_point = latitude is not None and longitude is not None
+    if (latitude is None) != (longitude is None):
+        _invalid("latitude and longitude must be passed together")
+    if radius is not None and not has_point:
+        _invalid("radius requires latitude and longitude")
+    if radius is not None and bbox is not None:
+        _invalid("Use either radius or bounding box, not both")
+    if all(value is None for value in (query, activity_id, building_id, radius, bbox)):
+        _invalid("At least one of query, activity_id, building_id, radius or bounding box is required")
+
+    if sort is None:
+        if query is not None:
+            sort = OrganizationSearchSort.relevance
+        elif has_point:
+            sort = OrganizationSearchSort.distance
+        else:
+            sort = OrganizationSearchSort.name
+    if sort is OrganizationSearchSort.relevance and query is None:
+        _invalid("Sorting by relevance requires query")
+    if sort is OrganizationSearchSort.distance and not has_point:
+        _invalid("Sorting by distance requires latitude and longitude")
+
+    return OrganizationSearchFilters(
+        query=query,
+        mode=mode,
+        activity_id=activity_id,
+        include_subactivities=include_subactivities,
+        building_id=building_id,
+        latitude=latitude,
+        longitude=longitude,
+        radius=radius,
+        bbox=bbox,
+        sort=sort
+    )
+
+
+def _invalid(detail: str):
+    raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=detail)
@@ -0,0 +1,44 @@
+import random
+import sys
+
+from loguru import logger
+
+from app.config import settings
+
+LOG_FORMAT = (
+    "<green>{time:YYYY-MM-DD HH:mm:ss.SSS}</green> | <level>{level: <8}</level> | "
+    "<cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> - <level>{message}</level>"
+)
+
+
+def sampled(rate: float):
+    """Логгер для частых сообщений: в лог попадает примерно доля ``rate`` из них.
+
+    Пример: ``sampled(0.01).warning("Неверный API ключ. IP: {}", ip)``.
+    """
+    return logger.bind(sample_rate=rate)
+
+
+def _sampling_filter(record) -> bool:
+    rate = record["extra"].get("sample_rate")
+    return rate is None or random.random() < rate
+
+
+def setup_logging() -> None:
+    """Настройка loguru при старте приложения.
+
+    Запись в stderr идёт через очередь (``enqueue=True``) в отдельном потоке,
+    поэтому цикл событий не блокируется на выводе. Сообщения DAO на горячих
+    путях пишутся уровнем DEBUG и при уровне INFO даже не форматируются.
+    """
+    logger.remove()
+    logger.add(
+        sys.stderr,
+        level=settings.LOG_LEVEL,
+        format=LOG_FORMAT,
+        serialize=settings.LOG_JSON,
+        filter=_sampling_filter,
+        enqueue=True,
+        backtrace=False,
+        diagnose=False,
+    )
@@ -1,9 +1,37 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
+from loguru import logger
+from app.logger import setup_logging
+from app.cache.invalidation import cache_invalidation_listener
+from app.config import settings
+from app.dao.pagination import InvalidCursorError
+from app.metrics_server import create_metrics_server
+from app.middleware import ServerTimingMiddleware
 from app.routers.organizations import router
 
+setup_logging()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    metrics_server = create_metrics_server() if settings.METRICS_ENABLED else None
+    if metrics_server is not None:
+        await metrics_server.start()
+    # NOTIFY сбрасывает и дерево деятельности, поэтому подписка нужна и без кэша ответов
+    if settings.RESPONSE_CACHE_LISTEN:
+        cache_invalidation_listener.start()
+    yield
+    await cache_invalidation_listener.stop()
+    if metrics_server is not None:
+        await metrics_server.stop()
+    # дописываем сообщения, оставшиеся в очереди логгера
+    await logger.complete()
+
 
 app = FastAPI(
+    lifespan=lifespan,
     title="TEST REST API",
     description="Справочник организаций с геопоиском и древовидным каталогом деятельности",
     version="1.0.0"
@@ -15,11 +43,21 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing", "ETag"],
 )
+app.add_middleware(ServerTimingMiddleware)
 
 app.include_router(router, prefix="/api/v1")
 
 
+@app.exception_handler(InvalidCursorError)
+async def invalid_cursor_handler(request: Request, exc: InvalidCursorError):
+    return JSONResponse(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        content={"detail": str(exc)}
+    )
+
+
 @app.get("/")
 async def root():
     return {
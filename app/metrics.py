@@ -0,0 +1,76 @@
+import bisect
+import threading
+from typing import Dict, Iterable, List, Mapping, Sequence, Tuple
+
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def format_labels(labels: Mapping[str, str]) -> str:
+    if not labels:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(str(value))}"' for name, value in labels.items())
+    return "{" + pairs + "}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class Histogram:
+    """Гистограмма в формате Prometheus (накопительные бакеты, сумма, счётчик) по наборам меток."""
+
+    def __init__(self, name: str, description: str, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.description = description
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[Labels, List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = tuple(sorted(labels.items()))
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                # счётчики по бакетам, затем +Inf, сумма и количество
+                series = self._series[key] = [0.0] * (len(self.buckets) + 3)
+            series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.description}"
+        yield f"# TYPE {self.name} histogram"
+        with self._lock:
+            series = {key: list(values) for key, values in self._series.items()}
+        for key, values in sorted(series.items()):
+            labels = dict(key)
+            cumulative = 0.0
+            for bound, count in zip((*self.buckets, "+Inf"), values):
+                cumulative += count
+                yield f"{self.name}_bucket{format_labels({**labels, 'le': str(bound)})} {cumulative:g}"
+            yield f"{self.name}_sum{format_labels(labels)} {values[-2]:.6f}"
+            yield f"{self.name}_count{format_labels(labels)} {values[-1]:g}"
+
+
+def render_gauge(name: str, description: str, samples: Iterable[Tuple[Mapping[str, str], float]],
+                 kind: str = "gauge") -> Iterable[str]:
+    yield f"# HELP {name} {description}"
+    yield f"# TYPE {name} {kind}"
+    for labels, value in samples:
+        yield f"{name}{format_labels(labels)} {value:g}"
+
+
+def with_labels(lines: Iterable[str], labels: Mapping[str, str]) -> Iterable[str]:
+    """Добавляет метки ко всем образцам уже отрисованных метрик."""
+    extra = format_labels(labels)[1:-1]
+    for line in lines:
+        if not extra or line.startswith("#"):
+            yield line
+        elif "{" in line.split(" ", 1)[0]:
+            yield line.replace("{", "{" + extra + ",", 1)
+        else:
+            name, value = line.split(" ", 1)
+            yield f"{name}{{{extra}}} {value}"
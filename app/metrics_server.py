@@ -0,0 +1,110 @@
+import asyncio
+import hmac
+import os
+from typing import Iterable, Optional
+
+from loguru import logger
+
+from app.config import settings
+from app.database.db import all_engines, read_router
+from app.database.instrumentation import render_query_metrics
+from app.database.pool import render_pool_metrics
+from app.metrics import with_labels
+from app.rate_limit import render_rate_limit_metrics
+
+# номер воркера выставляет gunicorn.conf.py (post_fork); без gunicorn воркер один
+WORKER_ENV = "METRICS_WORKER"
+
+
+def worker_slot() -> int:
+    return int(os.getenv(WORKER_ENV, 0))
+
+
+def render_metrics(worker: int) -> Iterable[str]:
+    lines = [
+        *render_pool_metrics(all_engines),
+        *read_router.render_metrics(),
+        *render_query_metrics(),
+        *render_rate_limit_metrics(),
+    ]
+    return with_labels(lines, {"worker": str(worker)})
+
+
+class MetricsServer:
+    """Метрики Prometheus одного воркера на отдельном порту.
+
+    Счётчики живут в памяти процесса, поэтому через общий порт приложения
+    каждый сбор попадал бы в случайный воркер. Воркер N слушает
+    ``METRICS_PORT + N`` (по умолчанию только на localhost) и помечает
+    свои ряды меткой ``worker``; Prometheus собирает все порты и суммирует.
+    Номера воркеров переиспользуются после перезапуска, так что порты
+    и набор рядов постоянны.
+    """
+
+    def __init__(self, host: str, port: int, token: str = "", worker: int = 0):
+        self.host = host
+        self.port = port
+        self.token = token
+        self.worker = worker
+        self._server: Optional[asyncio.Server] = None
+
+    async def start(self) -> None:
+        try:
+            self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        except OSError as e:
+            logger.error("Не удалось открыть порт метрик {}:{}: {}", self.host, self.port, e)
+            return
+        logger.debug("Метрики воркера {} на {}:{}", self.worker, self.host, self.port)
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    @property
+    def sockets(self):
+        return self._server.sockets if self._server is not None else ()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            async with asyncio.timeout(5):
+                head = await reader.readuntil(b"\r\n\r\n")
+            request_line, *header_lines = head.decode("latin-1").split("\r\n")
+            method, path, *_ = request_line.split(" ")
+            headers = {
+                name.strip().lower(): value.strip()
+                for name, _, value in (line.partition(":") for line in header_lines if line)
+            }
+
+            if method not in ("GET", "HEAD") or path.split("?", 1)[0] != "/metrics":
+                status, body = "404 Not Found", b""
+            elif not self._authorized(headers.get("authorization", "")):
+                status, body = "401 Unauthorized", b""
+            else:
+                status, body = "200 OK", ("\n".join(render_metrics(self.worker)) + "\n").encode()
+
+            writer.write(
+                f"HTTP/1.1 {status}\r\n"
+                f"Content-Type: text/plain; version=0.0.4\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                f"Connection: close\r\n\r\n".encode("latin-1")
+                + (body if method != "HEAD" else b"")
+            )
+            await writer.drain()
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, asyncio.LimitOverrunError,
+                ValueError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    def _authorized(self, authorization: str) -> bool:
+        if not self.token:
+            return True
+        return hmac.compare_digest(authorization.encode(), f"Bearer {self.token}".encode())
+
+
+def create_metrics_server() -> MetricsServer:
+    # создаётся в lifespan: при GUNICORN_PRELOAD модуль импортируется в мастере до fork
+    worker = worker_slot()
+    return MetricsServer(settings.METRICS_HOST, settings.METRICS_PORT + worker, settings.METRICS_TOKEN, worker)
@@ -0,0 +1,42 @@
+import time
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.database.instrumentation import QueryTiming, request_query_timing
+
+
+class ServerTimingMiddleware:
+    """Добавляет к ответу заголовок ``Server-Timing`` со временем запросов к БД и всего запроса.
+
+    Чистый ASGI-middleware: счётчик кладётся в contextvar до вызова приложения и
+    виден всем запросам к БД в этом HTTP-запросе. У потоковых ответов заголовки
+    уходят до конца выгрузки, поэтому в них учтено только время до первого чанка.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timing = QueryTiming()
+        token = request_query_timing.set(timing)
+        started = time.perf_counter()
+
+        async def send_with_timing(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                total = (time.perf_counter() - started) * 1000
+                headers = MutableHeaders(scope=message)
+                headers.append(
+                    "Server-Timing",
+                    f'db;dur={timing.seconds * 1000:.1f};desc="{timing.queries} queries", app;dur={total:.1f}'
+                )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            request_query_timing.reset(token)
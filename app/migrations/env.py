@@ -13,6 +13,7 @@ from app.models.secondary import organization_activity
 from app.models.organizations import Organization
 from app.models.buildings import Building
 from app.models.phones import Phone
+from app.models.organization_read import OrganizationRead
 from geoalchemy2 import Geometry, Geography, Raster
 from geoalchemy2.admin.dialects.common import _check_spatial_type
 from geoalchemy2 import alembic_helpers
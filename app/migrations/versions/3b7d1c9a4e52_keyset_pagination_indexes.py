@@ -0,0 +1,33 @@
+"""keyset pagination indexes
+
+Revision ID: 3b7d1c9a4e52
+Revises: ef4523592295
+Create Date: 2026-10-18 10:12:41.204518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import geoalchemy2
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3b7d1c9a4e52'
+down_revision: Union[str, Sequence[str], None] = 'ef4523592295'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_organizations_name_id', 'organizations', ['name', 'id'], unique=False)
+    op.create_index('ix_organizations_building_id_name_id', 'organizations', ['building_id', 'name', 'id'], unique=False)
+    op.create_index('ix_organization_activity_activity_id', 'organization_activity', ['activity_id', 'organization_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_organization_activity_activity_id', table_name='organization_activity')
+    op.drop_index('ix_organizations_building_id_name_id', table_name='organizations')
+    op.drop_index('ix_organizations_name_id', table_name='organizations')
@@ -0,0 +1,29 @@
+"""phones organization_id index
+
+Revision ID: 5d0c3f6b1a27
+Revises: c41e8b7f2a90
+Create Date: 2026-10-18 12:40:08.512733
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import geoalchemy2
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d0c3f6b1a27'
+down_revision: Union[str, Sequence[str], None] = 'c41e8b7f2a90'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(op.f('ix_phones_organization_id'), 'phones', ['organization_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_phones_organization_id'), table_name='phones')
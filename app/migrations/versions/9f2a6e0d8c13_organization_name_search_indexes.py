@@ -0,0 +1,61 @@
+"""organization name search indexes
+
+Revision ID: 9f2a6e0d8c13
+Revises: 3b7d1c9a4e52
+Create Date: 2026-10-18 11:03:17.880214
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import geoalchemy2
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9f2a6e0d8c13'
+down_revision: Union[str, Sequence[str], None] = '3b7d1c9a4e52'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.add_column(
+        'organizations',
+        sa.Column(
+            'search_vector',
+            postgresql.TSVECTOR(),
+            sa.Computed("to_tsvector('simple', name)", persisted=True),
+            nullable=False
+        )
+    )
+    op.create_index(
+        'ix_organizations_name_trgm',
+        'organizations',
+        ['name'],
+        unique=False,
+        postgresql_using='gin',
+        postgresql_ops={'name': 'gin_trgm_ops'}
+    )
+    op.create_index(
+        'ix_organizations_search_vector',
+        'organizations',
+        ['search_vector'],
+        unique=False,
+        postgresql_using='gin'
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_organizations_search_vector', table_name='organizations', postgresql_using='gin')
+    op.drop_index(
+        'ix_organizations_name_trgm',
+        table_name='organizations',
+        postgresql_using='gin',
+        postgresql_ops={'name': 'gin_trgm_ops'}
+    )
+    op.drop_column('organizations', 'search_vector')
@@ -0,0 +1,335 @@
+"""organization read model
+
+Revision ID: a8e3f1d92b64
+Revises: 5d0c3f6b1a27
+Create Date: 2026-10-18 15:02:41.207356
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import geoalchemy2
+from geoalchemy2 import Geography, Geometry
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a8e3f1d92b64'
+down_revision: Union[str, Sequence[str], None] = '5d0c3f6b1a27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Пересчёт строк organization_read для переданных id организаций: удалённые
+# организации убираются, остальные собираются заново из пяти таблиц.
+# Сначала блокируются строки самих организаций (FOR NO KEY UPDATE не мешает
+# проверкам внешних ключей): параллельный пересчёт тех же организаций ждёт
+# коммита, а следующие операторы функции берут новый снимок и видят его
+# изменения. Без блокировки транзакция, посчитавшая документ раньше, могла
+# записать его последней и затереть чужое изменение.
+REFRESH_FUNCTION = """
+CREATE FUNCTION organization_read_refresh(org_ids integer[]) RETURNS void
+LANGUAGE sql AS $$
+    SELECT 1 FROM organizations WHERE id = ANY(org_ids) ORDER BY id FOR NO KEY UPDATE;
+
+    DELETE FROM organization_read r
+    WHERE r.id = ANY(org_ids)
+      AND NOT EXISTS (SELECT 1 FROM organizations o WHERE o.id = r.id);
+
+    INSERT INTO organization_read AS r (
+        id, name, building_id, activity_ids, latitude, longitude, geometry, geog,
+        document, created_at, updated_at, refreshed_at
+    )
+    SELECT
+        o.id,
+        o.name,
+        o.building_id,
+        COALESCE(
+            (SELECT array_agg(oa.activity_id ORDER BY oa.activity_id)
+             FROM organization_activity oa
+             WHERE oa.organization_id = o.id),
+            '{}'
+        ),
+        b.latitude,
+        b.longitude,
+        b.geometry,
+        b.geog,
+        jsonb_build_object(
+            'id', o.id,
+            'name', o.name,
+            'building_id', o.building_id,
+            'building', jsonb_build_object(
+                'id', b.id, 'address', b.address, 'latitude', b.latitude, 'longitude', b.longitude
+            ),
+            'phones', COALESCE(
+                (SELECT jsonb_agg(jsonb_build_object('id', p.id, 'number', p.number) ORDER BY p.id)
+                 FROM phones p
+                 WHERE p.organization_id = o.id),
+                '[]'::jsonb
+            ),
+            'activities', COALESCE(
+                (SELECT jsonb_agg(
+                            jsonb_build_object('id', a.id, 'name', a.name, 'level', a.level, 'parent_id', a.parent_id)
+                            ORDER BY a.id
+                        )
+                 FROM organization_activity oa
+                 JOIN activities a ON a.id = oa.activity_id
+                 WHERE oa.organization_id = o.id),
+                '[]'::jsonb
+            )
+        ),
+        o.created_at,
+        o.updated_at,
+        clock_timestamp()
+    FROM organizations o
+    JOIN buildings b ON b.id = o.building_id
+    WHERE o.id = ANY(org_ids)
+    ON CONFLICT (id) DO UPDATE SET
+        name = EXCLUDED.name,
+        building_id = EXCLUDED.building_id,
+        activity_ids = EXCLUDED.activity_ids,
+        latitude = EXCLUDED.latitude,
+        longitude = EXCLUDED.longitude,
+        geometry = EXCLUDED.geometry,
+        geog = EXCLUDED.geog,
+        document = EXCLUDED.document,
+        created_at = EXCLUDED.created_at,
+        updated_at = EXCLUDED.updated_at,
+        refreshed_at = EXCLUDED.refreshed_at;
+$$
+"""
+
+# Триггеры уровня оператора с таблицами переходов: один пересчёт на оператор,
+# сколько бы строк он ни затронул (массовые INSERT и COPY тоже).
+# TG_ARGV[0] - колонка с id организации в изменённой таблице. Массовая загрузка
+# выставляет organization_read.defer_refresh = on (до конца транзакции) и сама
+# вызывает organization_read_refresh один раз на пачку.
+SYNC_FUNCTION = """
+CREATE FUNCTION organization_read_sync() RETURNS trigger
+LANGUAGE plpgsql AS $$
+DECLARE
+    org_ids integer[];
+BEGIN
+    IF current_setting('organization_read.defer_refresh', true) = 'on' THEN
+        RETURN NULL;
+    END IF;
+    IF TG_OP = 'INSERT' THEN
+        EXECUTE format('SELECT array_agg(DISTINCT %I) FROM new_rows', TG_ARGV[0]) INTO org_ids;
+    ELSIF TG_OP = 'DELETE' THEN
+        EXECUTE format('SELECT array_agg(DISTINCT %I) FROM old_rows', TG_ARGV[0]) INTO org_ids;
+    ELSE
+        EXECUTE format(
+            'SELECT array_agg(DISTINCT changed) FROM (SELECT %1$I AS changed FROM new_rows '
+            'UNION SELECT %1$I FROM old_rows) AS rows',
+            TG_ARGV[0]
+        ) INTO org_ids;
+    END IF;
+    IF org_ids IS NOT NULL THEN
+        PERFORM organization_read_refresh(org_ids);
+    END IF;
+    RETURN NULL;
+END
+$$
+"""
+
+# Здания и виды деятельности: пересчитываются организации, которые на них ссылаются.
+BUILDINGS_SYNC_FUNCTION = """
+CREATE FUNCTION organization_read_sync_buildings() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    PERFORM organization_read_refresh(ARRAY(
+        SELECT o.id
+        FROM new_rows n
+        JOIN old_rows old ON old.id = n.id
+        JOIN organizations o ON o.building_id = n.id
+        WHERE (n.address, n.latitude, n.longitude) IS DISTINCT FROM (old.address, old.latitude, old.longitude)
+           OR NOT ST_Equals(n.geometry, old.geometry)
+    ));
+    RETURN NULL;
+END
+$$
+"""
+
+ACTIVITIES_SYNC_FUNCTION = """
+CREATE FUNCTION organization_read_sync_activities() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    PERFORM organization_read_refresh(ARRAY(
+        SELECT DISTINCT oa.organization_id
+        FROM new_rows n
+        JOIN old_rows old ON old.id = n.id
+        JOIN organization_activity oa ON oa.activity_id = n.id
+        WHERE (n.name, n.level, n.parent_id) IS DISTINCT FROM (old.name, old.level, old.parent_id)
+    ));
+    RETURN NULL;
+END
+$$
+"""
+
+# (таблица, колонка с id организации)
+SYNCED_TABLES = (
+    ('organizations', 'id'),
+    ('phones', 'organization_id'),
+    ('organization_activity', 'organization_id'),
+)
+
+
+def _create_trigger(table: str, event: str, function: str, argument: str = '') -> None:
+    transition = {
+        'INSERT': 'NEW TABLE AS new_rows',
+        'UPDATE': 'OLD TABLE AS old_rows NEW TABLE AS new_rows',
+        'DELETE': 'OLD TABLE AS old_rows',
+    }[event]
+    op.execute(
+        f"CREATE TRIGGER organization_read_{table}_{event.lower()} "
+        f"AFTER {event} ON {table} REFERENCING {transition} "
+        f"FOR EACH STATEMENT EXECUTE FUNCTION {function}({argument})"
+    )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # поиск и сортировка по названию теперь идут по organization_read;
+    # на organizations остаётся индекс по building_id для триггера зданий и RESTRICT
+    op.drop_index('ix_organizations_search_vector', table_name='organizations', postgresql_using='gin')
+    op.drop_index(
+        'ix_organizations_name_trgm',
+        table_name='organizations',
+        postgresql_using='gin',
+        postgresql_ops={'name': 'gin_trgm_ops'}
+    )
+    op.drop_index('ix_organizations_building_id_name_id', table_name='organizations')
+    op.drop_index('ix_organizations_name_id', table_name='organizations')
+    op.drop_column('organizations', 'search_vector')
+    op.create_index('ix_organizations_building_id', 'organizations', ['building_id'], unique=False)
+
+    op.create_table(
+        'organization_read',
+        sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column(
+            'search_vector',
+            postgresql.TSVECTOR(),
+            sa.Computed("to_tsvector('simple', name)", persisted=True),
+            nullable=False
+        ),
+        sa.Column('building_id', sa.Integer(), nullable=False),
+        sa.Column('activity_ids', postgresql.ARRAY(sa.Integer()), server_default='{}', nullable=False),
+        sa.Column('latitude', sa.Float(), nullable=False),
+        sa.Column('longitude', sa.Float(), nullable=False),
+        sa.Column(
+            'geometry',
+            Geometry(geometry_type='POINT', srid=4326, spatial_index=False, from_text='ST_GeomFromEWKT', name='geometry'),
+            nullable=False
+        ),
+        sa.Column(
+            'geog',
+            Geography(geometry_type='POINT', srid=4326, spatial_index=False, from_text='ST_GeogFromText', name='geography'),
+            nullable=False
+        ),
+        sa.Column('document', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.Column('refreshed_at', sa.TIMESTAMP(), server_default=sa.text('now()'), nullable=False),
+        sa.Column('created_at', sa.TIMESTAMP(), server_default=sa.text('now()'), nullable=False),
+        sa.Column('updated_at', sa.TIMESTAMP(), server_default=sa.text('now()'), nullable=False),
+        sa.ForeignKeyConstraint(['id'], ['organizations.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_organization_read_name_id', 'organization_read', ['name', 'id'], unique=False)
+    op.create_index(
+        'ix_organization_read_building_id_name_id',
+        'organization_read',
+        ['building_id', 'name', 'id'],
+        unique=False
+    )
+    op.create_index(
+        'ix_organization_read_activity_ids',
+        'organization_read',
+        ['activity_ids'],
+        unique=False,
+        postgresql_using='gin'
+    )
+    op.create_index(
+        'ix_organization_read_name_trgm',
+        'organization_read',
+        ['name'],
+        unique=False,
+        postgresql_using='gin',
+        postgresql_ops={'name': 'gin_trgm_ops'}
+    )
+    op.create_index(
+        'ix_organization_read_search_vector',
+        'organization_read',
+        ['search_vector'],
+        unique=False,
+        postgresql_using='gin'
+    )
+    op.create_index('idx_organization_read_geometry', 'organization_read', ['geometry'], unique=False, postgresql_using='gist')
+    op.create_index('idx_organization_read_geog', 'organization_read', ['geog'], unique=False, postgresql_using='gist')
+
+    op.execute(REFRESH_FUNCTION)
+    op.execute(SYNC_FUNCTION)
+    op.execute(BUILDINGS_SYNC_FUNCTION)
+    op.execute(ACTIVITIES_SYNC_FUNCTION)
+    for table, column in SYNCED_TABLES:
+        for event in ('INSERT', 'UPDATE', 'DELETE'):
+            _create_trigger(table, event, 'organization_read_sync', f"'{column}'")
+    _create_trigger('buildings', 'UPDATE', 'organization_read_sync_buildings')
+    _create_trigger('activities', 'UPDATE', 'organization_read_sync_activities')
+
+    op.execute("SELECT organization_read_refresh(ARRAY(SELECT id FROM organizations))")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER IF EXISTS organization_read_activities_update ON activities")
+    op.execute("DROP TRIGGER IF EXISTS organization_read_buildings_update ON buildings")
+    for table, _ in SYNCED_TABLES:
+        for event in ('insert', 'update', 'delete'):
+            op.execute(f"DROP TRIGGER IF EXISTS organization_read_{table}_{event} ON {table}")
+    op.execute("DROP FUNCTION IF EXISTS organization_read_sync_activities()")
+    op.execute("DROP FUNCTION IF EXISTS organization_read_sync_buildings()")
+    op.execute("DROP FUNCTION IF EXISTS organization_read_sync()")
+    op.execute("DROP FUNCTION IF EXISTS organization_read_refresh(integer[])")
+
+    op.drop_index('idx_organization_read_geog', table_name='organization_read', postgresql_using='gist')
+    op.drop_index('idx_organization_read_geometry', table_name='organization_read', postgresql_using='gist')
+    op.drop_index('ix_organization_read_search_vector', table_name='organization_read', postgresql_using='gin')
+    op.drop_index(
+        'ix_organization_read_name_trgm',
+        table_name='organization_read',
+        postgresql_using='gin',
+        postgresql_ops={'name': 'gin_trgm_ops'}
+    )
+    op.drop_index('ix_organization_read_activity_ids', table_name='organization_read', postgresql_using='gin')
+    op.drop_index('ix_organization_read_building_id_name_id', table_name='organization_read')
+    op.drop_index('ix_organization_read_name_id', table_name='organization_read')
+    op.drop_table('organization_read')
+
+    op.drop_index('ix_organizations_building_id', table_name='organizations')
+    op.add_column(
+        'organizations',
+        sa.Column(
+            'search_vector',
+            postgresql.TSVECTOR(),
+            sa.Computed("to_tsvector('simple', name)", persisted=True),
+            nullable=False
+        )
+    )
+    op.create_index('ix_organizations_name_id', 'organizations', ['name', 'id'], unique=False)
+    op.create_index('ix_organizations_building_id_name_id', 'organizations', ['building_id', 'name', 'id'], unique=False)
+    op.create_index(
+        'ix_organizations_name_trgm',
+        'organizations',
+        ['name'],
+        unique=False,
+        postgresql_using='gin',
+        postgresql_ops={'name': 'gin_trgm_ops'}
+    )
+    op.create_index(
+        'ix_organizations_search_vector',
+        'organizations',
+        ['search_vector'],
+        unique=False,
+        postgresql_using='gin'
+    )
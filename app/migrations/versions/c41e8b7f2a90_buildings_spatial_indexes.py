@@ -0,0 +1,42 @@
+"""buildings spatial indexes
+
+Revision ID: c41e8b7f2a90
+Revises: 9f2a6e0d8c13
+Create Date: 2026-10-18 11:47:55.316092
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import geoalchemy2
+from geoalchemy2 import Geography
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c41e8b7f2a90'
+down_revision: Union[str, Sequence[str], None] = '9f2a6e0d8c13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        'buildings',
+        sa.Column(
+            'geog',
+            Geography(geometry_type='POINT', srid=4326, spatial_index=False, from_text='ST_GeogFromText', name='geography'),
+            sa.Computed('geography(geometry)', persisted=True),
+            nullable=False
+        )
+    )
+    op.create_index('idx_buildings_geometry', 'buildings', ['geometry'], unique=False, postgresql_using='gist')
+    op.create_index('idx_buildings_geog', 'buildings', ['geog'], unique=False, postgresql_using='gist')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('idx_buildings_geog', table_name='buildings', postgresql_using='gist')
+    op.drop_index('idx_buildings_geometry', table_name='buildings', postgresql_using='gist')
+    op.drop_column('buildings', 'geog')
@@ -0,0 +1,50 @@
+"""response cache notify
+
+Revision ID: c7f1a4d2b9e8
+Revises: a8e3f1d92b64
+Create Date: 2026-10-18 18:21:09.514832
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7f1a4d2b9e8'
+down_revision: Union[str, Sequence[str], None] = 'a8e3f1d92b64'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# NOTIFY доставляется слушателям при коммите, одинаковые уведомления одной
+# транзакции схлопываются; воркеры сбрасывают кэш ответов по имени таблицы.
+NOTIFY_FUNCTION = """
+CREATE FUNCTION response_cache_notify() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    PERFORM pg_notify('response_cache', TG_TABLE_NAME);
+    RETURN NULL;
+END
+$$
+"""
+
+TABLES = ('organizations', 'buildings', 'phones', 'activities', 'organization_activity')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute(NOTIFY_FUNCTION)
+    for table in TABLES:
+        op.execute(
+            f"CREATE TRIGGER response_cache_notify_{table} "
+            f"AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON {table} "
+            f"FOR EACH STATEMENT EXECUTE FUNCTION response_cache_notify()"
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in TABLES:
+        op.execute(f"DROP TRIGGER IF EXISTS response_cache_notify_{table} ON {table}")
+    op.execute("DROP FUNCTION IF EXISTS response_cache_notify()")
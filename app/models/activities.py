@@ -20,18 +20,18 @@ class Activity(Base):
         'Activity',
         remote_side=[id],
         back_populates='children',
-        lazy='joined'
+        lazy='raise_on_sql'
     )
     children: Mapped[List['Activity']] = relationship(
         'Activity',
         back_populates='parent',
         cascade='all, delete-orphan',
-        lazy='selectin'
+        lazy='raise_on_sql'
     )
 
     organizations: Mapped[List['Organization']] = relationship(
         'Organization',
         secondary=organization_activity,
         back_populates='activities',
-        lazy='selectin'
+        lazy='raise_on_sql'
     )
@@ -0,0 +1,62 @@
+from datetime import datetime
+from typing import Any, Dict, List
+
+from app.database.db import Base
+from sqlalchemy import TIMESTAMP, Computed, ForeignKey, Index, Integer, func
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB, TSVECTOR
+from sqlalchemy.orm import Mapped, mapped_column
+from geoalchemy2 import Geography, Geometry
+
+
+class OrganizationRead(Base):
+    """Денормализованная модель чтения: готовый документ организации и поля для фильтров.
+
+    Строки пишут только триггеры из миграции ``organization_read`` при любом
+    изменении организаций, зданий, телефонов и видов деятельности; приложение
+    таблицу только читает. ``created_at``/``updated_at`` - значения самой
+    организации, ``refreshed_at`` - время последнего пересчёта строки.
+    """
+    __tablename__ = 'organization_read'
+    __table_args__ = (
+        Index('ix_organization_read_name_id', 'name', 'id'),
+        Index('ix_organization_read_building_id_name_id', 'building_id', 'name', 'id'),
+        Index('ix_organization_read_activity_ids', 'activity_ids', postgresql_using='gin'),
+        Index(
+            'ix_organization_read_name_trgm',
+            'name',
+            postgresql_using='gin',
+            postgresql_ops={'name': 'gin_trgm_ops'}
+        ),
+        Index('ix_organization_read_search_vector', 'search_vector', postgresql_using='gin'),
+    )
+
+    id: Mapped[int] = mapped_column(
+        ForeignKey('organizations.id', ondelete='CASCADE'),
+        primary_key=True,
+        autoincrement=False
+    )
+    name: Mapped[str] = mapped_column(nullable=False)
+    search_vector: Mapped[str] = mapped_column(
+        TSVECTOR,
+        Computed("to_tsvector('simple', name)", persisted=True),
+        deferred=True
+    )
+    building_id: Mapped[int] = mapped_column(nullable=False)
+    activity_ids: Mapped[List[int]] = mapped_column(ARRAY(Integer), nullable=False, server_default='{}')
+
+    latitude: Mapped[float] = mapped_column(nullable=False)
+    longitude: Mapped[float] = mapped_column(nullable=False)
+    geometry: Mapped[Geometry] = mapped_column(
+        Geometry('POINT', srid=4326, spatial_index=True),
+        nullable=False,
+        deferred=True
+    )
+    geog: Mapped[Geography] = mapped_column(
+        Geography('POINT', srid=4326, spatial_index=True),
+        nullable=False,
+        deferred=True
+    )
+
+    # документ в форме OrganizationList
+    document: Mapped[Dict[str, Any]] = mapped_column(JSONB, nullable=False)
+    refreshed_at: Mapped[datetime] = mapped_column(TIMESTAMP, server_default=func.now(), nullable=False)
@@ -1,11 +1,16 @@
 from typing import List
 from app.database.db import Base
-from sqlalchemy import ForeignKey
+from sqlalchemy import ForeignKey, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.models.secondary import organization_activity
 
 
 class Organization(Base):
+    # поиск, фильтры и сортировки по названию обслуживает organization_read
+    __table_args__ = (
+        Index('ix_organizations_building_id', 'building_id'),
+    )
+
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     name: Mapped[str] = mapped_column(nullable=False, index=True)
 
@@ -13,19 +18,19 @@ class Organization(Base):
     building: Mapped['Building'] = relationship(
         'Building',
         back_populates='organizations',
-        lazy='joined'
+        lazy='raise_on_sql'
     )
 
     phones: Mapped[List['Phone']] = relationship(
         'Phone',
         back_populates='organization',
         cascade='all, delete-orphan',
-        lazy='selectin'
+        lazy='raise_on_sql'
     )
 
     activities: Mapped[List['Activity']] = relationship(
         'Activity',
         secondary=organization_activity,
         back_populates='organizations',
-        lazy='selectin'
+        lazy='raise_on_sql'
     )
@@ -7,9 +7,12 @@ class Phone(Base):
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     number: Mapped[str] = mapped_column(nullable=False, index=True)
 
-    organization_id: Mapped[int | None] = mapped_column(ForeignKey('organizations.id', ondelete='CASCADE'))
+    organization_id: Mapped[int | None] = mapped_column(
+        ForeignKey('organizations.id', ondelete='CASCADE'),
+        index=True
+    )
     organization: Mapped['Organization'] = relationship(
         'Organization',
         back_populates='phones',
-        lazy='joined'
+        lazy='raise_on_sql'
     )
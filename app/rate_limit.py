@@ -0,0 +1,58 @@
+import time
+from collections import Counter, OrderedDict
+from typing import Hashable, Iterable, Tuple
+
+from app.metrics import render_gauge
+
+RATE_LIMITED: Counter = Counter()
+
+
+class TokenBucketLimiter:
+    """Ограничение частоты запросов корзиной токенов на каждого клиента.
+
+    Корзина вмещает ``burst`` токенов и пополняется со скоростью ``rate`` в
+    секунду, каждый запрос забирает один токен. Корзины лежат в LRU на
+    ``max_clients`` записей: давно не приходившие клиенты вытесняются, и их
+    корзина при следующем запросе начинается полной. Лимит действует в
+    пределах процесса (воркера).
+    """
+
+    def __init__(self, rate: float, burst: int, max_clients: int = 10000):
+        self.rate = rate
+        self.burst = burst
+        self._max_clients = max_clients
+        # ключ -> (токенов, время последнего обновления)
+        self._buckets: "OrderedDict[Hashable, Tuple[float, float]]" = OrderedDict()
+
+    def acquire(self, key: Hashable) -> float:
+        """Забирает токен; 0 - запрос разрешён, иначе секунды до появления токена."""
+        now = time.monotonic()
+        entry = self._buckets.get(key)
+        if entry is None:
+            tokens = float(self.burst)
+        else:
+            tokens, updated_at = entry
+            tokens = min(float(self.burst), tokens + (now - updated_at) * self.rate)
+            self._buckets.move_to_end(key)
+
+        if tokens >= 1:
+            self._buckets[key] = (tokens - 1, now)
+            retry_after = 0.0
+        else:
+            self._buckets[key] = (tokens, now)
+            retry_after = (1 - tokens) / self.rate
+
+        while len(self._buckets) > self._max_clients:
+            self._buckets.popitem(last=False)
+        return retry_after
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+def render_rate_limit_metrics() -> Iterable[str]:
+    yield from render_gauge(
+        "http_rate_limited_total", "Запросы, отклонённые ограничением частоты",
+        [({"client": client}, count) for client, count in sorted(RATE_LIMITED.items())],
+        kind="counter"
+    )
@@ -1,18 +1,52 @@
+import csv
+import io
+import json
 from fastapi import APIRouter, Depends, HTTPException, Query, status
-from pydantic import TypeAdapter
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
-from loguru import logger
-from app.dependencies.dao_dep import get_session_without_commit
+from typing import Any, AsyncIterator, Dict, List, Optional
+from app.config import settings
+from app.logger import sampled
+from app.cache.response_cache import response_cache
+from app.dependencies.dao_dep import get_session_without_commit, get_streaming_session
 from app.dependencies.auth_dep import verify_api_key
-from app.dao.organizations_dao import OrganizationDAO
+from app.dependencies.etag_dep import building_organizations_etag, organization_etag
+from app.dependencies.geo_dep import get_bounding_box, get_optional_bounding_box
+from app.dependencies.pagination_dep import get_page_params
+from app.dependencies.search_dep import get_search_filters
+from app.dao.organizations_dao import ORGANIZATION_TABLES, OrganizationDAO
 from app.dao.activities_dao import ActivityDAO
 from app.dao.buildings_dao import BuildingDAO
-from app.schemas.organizations import OrganizationDetail, OrganizationList
+from app.schemas.organizations import (
+    ExportFormat,
+    NameSearchMode,
+    OrganizationBatchRequest,
+    OrganizationBatchResponse,
+    OrganizationCluster,
+    OrganizationDetail,
+    OrganizationNearest,
+    OrganizationPage,
+    OrganizationSearchFilters,
+    OrganizationSearchPage,
+)
 from app.schemas.activities import ActivitySearchName
+from app.schemas.geo import BoundingBox
+from app.schemas.pagination import PageParams
+from app.serialization import (
+    ORGANIZATION_BATCH,
+    ORGANIZATION_CLUSTER_LIST,
+    ORGANIZATION_DETAIL,
+    ORGANIZATION_NEAREST_LIST,
+    ORGANIZATION_PAGE,
+    ORGANIZATION_SEARCH_PAGE,
+    json_response,
+)
 
 router = APIRouter(prefix="/organizations", tags=["Organizations"])
 
+EXPORT_CHUNK_SIZE = 64 * 1024
+EXPORT_CSV_COLUMNS = ("id", "name", "building_id", "address", "latitude", "longitude", "phones", "activity_ids")
+
 
 @router.get(
     "/id/{organization_id}",
@@ -20,71 +54,124 @@ router = APIRouter(prefix="/organizations", tags=["Organizations"])
     summary="Детальная информация об организации",
     dependencies=[Depends(verify_api_key)]
 )
+@response_cache.cached(tags=ORGANIZATION_TABLES)
 async def get_organization(
         organization_id: int,
+        # ETag версии данных входит в ключ кэша: свежий ETag не отдаётся со старым телом
+        etag: Optional[str] = Depends(organization_etag),
         session: AsyncSession = Depends(get_session_without_commit)
 ):
     org_dao = OrganizationDAO(session)
-    organization = await org_dao.get_by_id_with_relations(organization_id)
+    organization = await org_dao.get_detail(organization_id)
 
     if not organization:
-        logger.warning(f"Организация с ID {organization_id} не найдена")
+        sampled(settings.LOG_SAMPLE_RATE).warning("Организация с ID {} не найдена", organization_id)
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Organization not found"
         )
 
-    return OrganizationDetail.model_validate(organization)
+    return json_response(ORGANIZATION_DETAIL, organization)
+
+
+@router.post(
+    "/batch",
+    response_model=OrganizationBatchResponse,
+    summary="Детальная информация о нескольких организациях по списку id",
+    dependencies=[Depends(verify_api_key)]
+)
+async def get_organizations_batch(
+        batch: OrganizationBatchRequest,
+        session: AsyncSession = Depends(get_session_without_commit)
+):
+    ids = list(dict.fromkeys(batch.ids))
+    org_dao = OrganizationDAO(session)
+    organizations = {
+        organization["id"]: organization
+        for organization in await org_dao.get_details(ids)
+    }
+
+    return json_response(ORGANIZATION_BATCH, {
+        "items": [organizations[org_id] for org_id in ids if org_id in organizations],
+        "missing_ids": [org_id for org_id in ids if org_id not in organizations]
+    })
+
+
+@router.get(
+    "/search",
+    response_model=OrganizationSearchPage,
+    summary="Поиск организаций по любому сочетанию фильтров",
+    dependencies=[Depends(verify_api_key)]
+)
+@response_cache.cached(tags=ORGANIZATION_TABLES)
+async def search_organizations(
+        filters: OrganizationSearchFilters = Depends(get_search_filters),
+        page: PageParams = Depends(get_page_params),
+        session: AsyncSession = Depends(get_session_without_commit)
+):
+    org_dao = OrganizationDAO(session)
+    organizations = await org_dao.search(filters, limit=page.limit, after=page.after)
+    return json_response(ORGANIZATION_SEARCH_PAGE, organizations)
 
 
 @router.get(
     "/search/by-name",
-    response_model=List[OrganizationList],
-    summary="Поиск организаций по названию",
+    response_model=OrganizationPage,
+    summary="Поиск организаций по названию (по убыванию релевантности)",
     dependencies=[Depends(verify_api_key)]
 )
+@response_cache.cached(tags=ORGANIZATION_TABLES)
 async def search_organizations_by_name(
         query: str = Query(..., min_length=2, max_length=100, description="Название для поиска"),
+        mode: NameSearchMode = Query(
+            NameSearchMode.substring,
+            description="prefix - по началу слов, substring - по подстроке, fuzzy - нечёткий поиск"
+        ),
+        page: PageParams = Depends(get_page_params),
         session: AsyncSession = Depends(get_session_without_commit)
 ):
     org_dao = OrganizationDAO(session)
-    organizations = await org_dao.search_by_name(query)
-    return TypeAdapter(list[OrganizationList]).validate_python(organizations)
+    organizations = await org_dao.search_by_name(query, mode=mode, limit=page.limit, after=page.after)
+    return json_response(ORGANIZATION_PAGE, organizations)
 
 
 @router.get(
     "/by-building/{building_id}",
-    response_model=List[OrganizationList],
+    response_model=OrganizationPage,
     summary="Организации в здании",
     dependencies=[Depends(verify_api_key)]
 )
+@response_cache.cached(tags=ORGANIZATION_TABLES)
 async def get_organizations_by_building(
         building_id: int,
+        etag: Optional[str] = Depends(building_organizations_etag),
+        page: PageParams = Depends(get_page_params),
         session: AsyncSession = Depends(get_session_without_commit)
 ):
     building_dao = BuildingDAO(session)
-    building = await building_dao.find_one_or_none_by_id(building_id)
 
-    if not building:
+    if not await building_dao.exists(building_id):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Building not found"
         )
 
     org_dao = OrganizationDAO(session)
-    organizations = await org_dao.get_by_building(building_id)
+    organizations = await org_dao.get_by_building(building_id, limit=page.limit, after=page.after)
 
-    return TypeAdapter(list[OrganizationList]).validate_python(organizations)
+    return json_response(ORGANIZATION_PAGE, organizations)
 
 
 @router.get(
     "/by-activity",
-    response_model=List[OrganizationList],
+    response_model=OrganizationPage,
     summary="Организации по виду деятельности (прямой поиск)",
     dependencies=[Depends(verify_api_key)]
 )
+@response_cache.cached(tags=ORGANIZATION_TABLES)
 async def get_organizations_by_activity(
         query: str = Query(min_length=2, max_length=50, description="Название вида деятельности"),
+        page: PageParams = Depends(get_page_params),
         session: AsyncSession = Depends(get_session_without_commit)
 ):
     activity_dao = ActivityDAO(session)
@@ -97,19 +184,21 @@ async def get_organizations_by_activity(
         )
 
     org_dao = OrganizationDAO(session)
-    organizations = await org_dao.get_by_activity_direct(activity.id)
+    organizations = await org_dao.get_by_activity_direct(activity.id, limit=page.limit, after=page.after)
 
-    return TypeAdapter(list[OrganizationList]).validate_python(organizations)
+    return json_response(ORGANIZATION_PAGE, organizations)
 
 
 @router.get(
     "/by-activity-tree",
-    response_model=List[OrganizationList],
+    response_model=OrganizationPage,
     summary="Организации по виду деятельности и всем подкатегориям",
     dependencies=[Depends(verify_api_key)]
 )
+@response_cache.cached(tags=ORGANIZATION_TABLES)
 async def get_organizations_by_activity_with_children(
         query: str = Query(min_length=2, max_length=50, description="Название вида деятельности"),
+        page: PageParams = Depends(get_page_params),
         session: AsyncSession = Depends(get_session_without_commit)
 ):
     activity_dao = ActivityDAO(session)
@@ -123,29 +212,163 @@ async def get_organizations_by_activity_with_children(
 
     org_dao = OrganizationDAO(session)
     organizations = await org_dao.get_by_activity_with_children(
-        activity.id
+        activity.id,
+        limit=page.limit,
+        after=page.after
     )
 
-    return TypeAdapter(list[OrganizationList]).validate_python(organizations)
+    return json_response(ORGANIZATION_PAGE, organizations)
 
 
 @router.get(
     "/nearby/radius",
-    response_model=List[OrganizationList],
+    response_model=OrganizationPage,
     summary="Поиск организаций в радиусе",
     dependencies=[Depends(verify_api_key)]
 )
+@response_cache.cached(tags=ORGANIZATION_TABLES)
 async def find_organizations_in_radius(
         latitude: float = Query(..., ge=-90, le=90, description="Широта центра"),
         longitude: float = Query(..., ge=-180, le=180, description="Долгота центра"),
         radius: float = Query(..., gt=0, le=50000, description="Радиус в метрах (макс 50км)"),
+        page: PageParams = Depends(get_page_params),
         session: AsyncSession = Depends(get_session_without_commit)
 ):
     org_dao = OrganizationDAO(session)
     organizations = await org_dao.get_nearby_radius(
         latitude=latitude,
         longitude=longitude,
-        radius=radius
+        radius=radius,
+        limit=page.limit,
+        after=page.after
+    )
+
+    return json_response(ORGANIZATION_PAGE, organizations)
+
+
+@router.get(
+    "/nearby/nearest",
+    response_model=List[OrganizationNearest],
+    summary="Ближайшие организации к точке",
+    dependencies=[Depends(verify_api_key)]
+)
+@response_cache.cached(tags=ORGANIZATION_TABLES)
+async def find_nearest_organizations(
+        lat: float = Query(..., ge=-90, le=90, description="Широта точки"),
+        lon: float = Query(..., ge=-180, le=180, description="Долгота точки"),
+        k: int = Query(10, ge=1, le=100, description="Количество организаций"),
+        session: AsyncSession = Depends(get_session_without_commit)
+):
+    org_dao = OrganizationDAO(session)
+    organizations = await org_dao.get_nearest(latitude=lat, longitude=lon, k=k)
+
+    return json_response(ORGANIZATION_NEAREST_LIST, organizations)
+
+
+@router.get(
+    "/in-bbox",
+    response_model=OrganizationPage,
+    summary="Организации в прямоугольной области карты",
+    dependencies=[Depends(verify_api_key)]
+)
+@response_cache.cached(tags=ORGANIZATION_TABLES)
+async def find_organizations_in_bbox(
+        bbox: BoundingBox = Depends(get_bounding_box),
+        page: PageParams = Depends(get_page_params),
+        session: AsyncSession = Depends(get_session_without_commit)
+):
+    org_dao = OrganizationDAO(session)
+    organizations = await org_dao.get_in_bbox(bbox, limit=page.limit, after=page.after)
+
+    return json_response(ORGANIZATION_PAGE, organizations)
+
+
+@router.get(
+    "/in-bbox/clusters",
+    response_model=List[OrganizationCluster],
+    summary="Количество организаций по ячейкам сетки в области карты",
+    dependencies=[Depends(verify_api_key)]
+)
+@response_cache.cached(tags=ORGANIZATION_TABLES)
+async def cluster_organizations_in_bbox(
+        bbox: BoundingBox = Depends(get_bounding_box),
+        grid_size: int = Query(16, ge=1, le=64, description="Число ячеек сетки по каждой оси"),
+        session: AsyncSession = Depends(get_session_without_commit)
+):
+    org_dao = OrganizationDAO(session)
+    clusters = await org_dao.get_clusters_in_bbox(bbox, grid_size=grid_size)
+    return json_response(ORGANIZATION_CLUSTER_LIST, clusters, validate=False)
+
+
+@router.get(
+    "/export",
+    summary="Выгрузка организаций потоком (NDJSON или CSV)",
+    dependencies=[Depends(verify_api_key)]
+)
+async def export_organizations(
+        format: ExportFormat = Query(ExportFormat.ndjson, description="Формат выгрузки"),
+        building_id: Optional[int] = Query(None, description="Только организации в здании"),
+        activity_id: Optional[int] = Query(None, description="Вид деятельности вместе с подкатегориями"),
+        bbox: Optional[BoundingBox] = Depends(get_optional_bounding_box),
+        session: AsyncSession = Depends(get_streaming_session)
+):
+    if building_id is not None and not await BuildingDAO(session).exists(building_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Building not found"
+        )
+    if activity_id is not None and not await ActivityDAO(session).exists(activity_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Activity not found"
+        )
+
+    org_dao = OrganizationDAO(session)
+    documents = org_dao.stream_export(building_id=building_id, activity_id=activity_id, bbox=bbox)
+
+    if format == ExportFormat.csv:
+        body, media_type = _csv_chunks(documents), "text/csv; charset=utf-8"
+    else:
+        body, media_type = _ndjson_chunks(documents), "application/x-ndjson"
+
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="organizations.{format.value}"'}
     )
 
-    return TypeAdapter(list[OrganizationList]).validate_python(organizations)
+
+async def _ndjson_chunks(documents: AsyncIterator[Dict[str, Any]]) -> AsyncIterator[str]:
+    buffer = io.StringIO()
+    async for document in documents:
+        buffer.write(json.dumps(document, ensure_ascii=False))
+        buffer.write("\n")
+        if buffer.tell() >= EXPORT_CHUNK_SIZE:
+            yield buffer.getvalue()
+            buffer = io.StringIO()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+async def _csv_chunks(documents: AsyncIterator[Dict[str, Any]]) -> AsyncIterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_CSV_COLUMNS)
+    async for document in documents:
+        building = document["building"]
+        writer.writerow((
+            document["id"],
+            document["name"],
+            document["building_id"],
+            building["address"],
+            building["latitude"],
+            building["longitude"],
+            ";".join(phone["number"] for phone in document["phones"]),
+            ";".join(str(activity["id"]) for activity in document["activities"])
+        ))
+        if buffer.tell() >= EXPORT_CHUNK_SIZE:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
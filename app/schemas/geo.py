@@ -0,0 +1,8 @@
+from pydantic import BaseModel
+
+
+class BoundingBox(BaseModel):
+    min_latitude: float
+    min_longitude: float
+    max_latitude: float
+    max_longitude: float
@@ -1,11 +1,31 @@
+from enum import Enum
 from pydantic import BaseModel, Field
 from typing import List, Optional
 from datetime import datetime
 from app.schemas.activities import ActivityResponse
 from app.schemas.buildings import BuildingResponse
+from app.schemas.geo import BoundingBox
+from app.schemas.pagination import Page
 from app.schemas.phones import PhoneResponse
 
 
+class NameSearchMode(str, Enum):
+    prefix = "prefix"
+    substring = "substring"
+    fuzzy = "fuzzy"
+
+
+class OrganizationSearchSort(str, Enum):
+    relevance = "relevance"
+    name = "name"
+    distance = "distance"
+
+
+class ExportFormat(str, Enum):
+    ndjson = "ndjson"
+    csv = "csv"
+
+
 class OrganizationBase(BaseModel):
     name: str
     building_id: int
@@ -26,6 +46,54 @@ class OrganizationList(OrganizationBase):
         from_attributes = True
 
 
+class OrganizationNearest(OrganizationList):
+    distance: float = Field(description="Расстояние до точки в метрах")
+
+
+class OrganizationSearchResult(OrganizationList):
+    distance: Optional[float] = Field(None, description="Расстояние до точки в метрах, если она задана")
+
+
+class OrganizationSearchFilters(BaseModel):
+    """Фильтры комбинированного поиска; пустые поля не участвуют в запросе."""
+    query: Optional[str] = None
+    mode: NameSearchMode = NameSearchMode.substring
+    activity_id: Optional[int] = None
+    include_subactivities: bool = False
+    building_id: Optional[int] = None
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
+    radius: Optional[float] = None
+    bbox: Optional[BoundingBox] = None
+    sort: OrganizationSearchSort = OrganizationSearchSort.name
+
+
+class OrganizationCluster(BaseModel):
+    latitude: float
+    longitude: float
+    count: int
+    min_latitude: float
+    min_longitude: float
+    max_latitude: float
+    max_longitude: float
+
+
 class OrganizationDetail(OrganizationList):
     created_at: datetime
     updated_at: Optional[datetime] = None
+
+
+MAX_BATCH_IDS = 500
+
+
+class OrganizationBatchRequest(BaseModel):
+    ids: List[int] = Field(min_length=1, max_length=MAX_BATCH_IDS)
+
+
+class OrganizationBatchResponse(BaseModel):
+    items: List[OrganizationDetail]
+    missing_ids: List[int] = Field(default_factory=list, description="Запрошенные id, которых нет в справочнике")
+
+
+OrganizationPage = Page[OrganizationList]
+OrganizationSearchPage = Page[OrganizationSearchResult]
@@ -0,0 +1,41 @@
+from typing import Any, List
+
+from fastapi import Response, status
+from pydantic import TypeAdapter
+
+from app.schemas.organizations import (
+    OrganizationBatchResponse,
+    OrganizationCluster,
+    OrganizationDetail,
+    OrganizationNearest,
+    OrganizationPage,
+    OrganizationSearchPage,
+)
+
+JSON_MEDIA_TYPE = "application/json"
+
+# Адаптеры создаются один раз: сборка схемы и сериализатора pydantic дорогая
+ORGANIZATION_DETAIL = TypeAdapter(OrganizationDetail)
+ORGANIZATION_PAGE = TypeAdapter(OrganizationPage)
+ORGANIZATION_SEARCH_PAGE = TypeAdapter(OrganizationSearchPage)
+ORGANIZATION_NEAREST_LIST = TypeAdapter(List[OrganizationNearest])
+ORGANIZATION_CLUSTER_LIST = TypeAdapter(List[OrganizationCluster])
+ORGANIZATION_BATCH = TypeAdapter(OrganizationBatchResponse)
+
+
+def json_response(
+        adapter: TypeAdapter,
+        value: Any,
+        validate: bool = True,
+        status_code: int = status.HTTP_200_OK
+) -> Response:
+    """JSON-ответ из значения, сериализованного адаптером сразу в байты.
+
+    Значение проверяется один раз (ORM-объекты и словари из БД читаются через
+    ``from_attributes``); FastAPI готовый Response повторно не валидирует и не
+    сериализует, ``response_model`` маршрута остаётся только для документации.
+    Уже собранные модели передаются с ``validate=False``.
+    """
+    if validate:
+        value = adapter.validate_python(value, from_attributes=True)
+    return Response(content=adapter.dump_json(value), status_code=status_code, media_type=JSON_MEDIA_TYPE)
@@ -0,0 +1,18 @@
+import importlib.util
+
+from uvicorn_worker import UvicornWorker
+
+
+class ProductionWorker(UvicornWorker):
+    """Воркер gunicorn с явным выбором uvloop и httptools.
+
+    Если C-расширения недоступны (например, на Windows), воркер работает
+    на стандартных asyncio и h11, а не падает при старте.
+    """
+
+    CONFIG_KWARGS = {
+        "loop": "uvloop" if importlib.util.find_spec("uvloop") else "asyncio",
+        "http": "httptools" if importlib.util.find_spec("httptools") else "h11",
+        "lifespan": "on",
+        "server_header": False,
+    }
@@ -1,2 +1,3 @@
 CREATE EXTENSION IF NOT EXISTS postgis;
-SELECT PostGIS_Version();
\ No newline at end of file
+SELECT PostGIS_Version();
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
@@ -0,0 +1,85 @@
+"""Конфигурация gunicorn для продакшена.
+
+    gunicorn -c gunicorn.conf.py app.main:app
+
+Каждый воркер - отдельный процесс uvicorn со своим циклом событий и своими
+пулами соединений к БД, поэтому всего соединений к каждой реплике может быть
+до ``workers * (DB_POOL_SIZE + DB_MAX_OVERFLOW)``, а к основному серверу - вдвое
+больше (отдельные пулы записи и чтения). Метрики тоже считаются
+в каждом воркере отдельно: воркер с номером N отдаёт их на ``METRICS_PORT + N``.
+"""
+import math
+import os
+import sys
+
+
+def _available_cpus() -> int:
+    """Число ядер, доступных процессу, с учётом квоты CPU контейнера (cgroup v2)."""
+    cpus = os.process_cpu_count() or 1
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            quota, period = f.read().split()
+        if quota != "max":
+            cpus = min(cpus, max(1, math.ceil(int(quota) / int(period))))
+    except (OSError, ValueError):
+        pass
+    return cpus
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    return os.getenv(name, str(default)).lower() in ("1", "true", "yes", "on")
+
+
+bind = os.getenv("BIND", "0.0.0.0:8000")
+# асинхронному воркеру хватает одного процесса на ядро
+workers = int(os.getenv("WEB_CONCURRENCY") or _available_cpus())
+worker_class = "app.worker.ProductionWorker"
+
+backlog = int(os.getenv("GUNICORN_BACKLOG", 2048))
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", 5))
+timeout = int(os.getenv("GUNICORN_TIMEOUT", 60))
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", 30))
+
+# плановый перезапуск воркеров; разброс не даёт им перезапуститься одновременно
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", 10000))
+max_requests_jitter = int(os.getenv("GUNICORN_MAX_REQUESTS_JITTER", 1000))
+
+# при preload приложение импортируется в мастере до fork, см. post_fork
+preload_app = _env_bool("GUNICORN_PRELOAD", False)
+forwarded_allow_ips = os.getenv("FORWARDED_ALLOW_IPS", "127.0.0.1")
+# heartbeat-файлы воркеров в памяти, а не на overlay-диске контейнера
+worker_tmp_dir = "/dev/shm" if os.path.isdir("/dev/shm") else None
+
+accesslog = None
+errorlog = "-"
+loglevel = os.getenv("LOG_LEVEL", "info").lower()
+
+
+# номера воркеров для портов метрик; занятые номера знает только мастер
+_metrics_slots = set()
+
+
+def pre_fork(server, worker):
+    # перезапущенный воркер получает освободившийся номер, порты не растут
+    worker.metrics_slot = min(set(range(len(_metrics_slots) + 1)) - _metrics_slots)
+    _metrics_slots.add(worker.metrics_slot)
+
+
+def child_exit(server, worker):
+    _metrics_slots.discard(getattr(worker, "metrics_slot", None))
+
+
+def post_fork(server, worker):
+    os.environ["METRICS_WORKER"] = str(worker.metrics_slot)
+
+    # без preload приложение ещё не импортировано: движки создадутся в самом воркере
+    if "app.database.db" not in sys.modules:
+        return
+
+    from app.database.db import dispose_engines_after_fork
+    from app.logger import setup_logging
+
+    dispose_engines_after_fork()
+    # поток очереди loguru не переживает fork - переподключаем вывод в воркере
+    setup_logging()
+    server.log.info("Worker %s: пулы соединений сброшены после fork", worker.pid)
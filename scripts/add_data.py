@@ -1,6 +1,10 @@
+import argparse
 import asyncio
+import random
 import sys
+import time
 from pathlib import Path
+from typing import Iterator, List
 
 scripts_dir = Path(__file__).parent
 # Поднимаемся на уровень выше (в корень проекта)
@@ -8,12 +12,16 @@ project_root = scripts_dir.parent
 # Добавляем в sys.path
 sys.path.append(str(project_root))
 
+from sqlalchemy import select
+
 from app.database.db import async_session_maker
+from app.models.buildings import Building
 from app.schemas.buildings import BuildingCreate
 from app.schemas.organizations import OrganizationCreate
 from app.dao.buildings_dao import BuildingDAO
 from app.dao.organizations_dao import OrganizationDAO
 from app.dao.activities_dao import ActivityDAO
+from dataset import AREA, NAME_WORDS, ORGANIZATION_FORMS, STREETS, activity_name
 
 
 async def seed_data():
@@ -46,11 +54,14 @@ async def seed_data():
             ),
         ]
 
-        buildings = []
-        for building_data in buildings_data:
-            building = await buildings_dao.add(building_data)
-            buildings.append(building)
-            print(f"Created building: {building.address}")
+        await buildings_dao.bulk_upsert(buildings_data, conflict_keys=['address'])
+        addresses = [building.address for building in buildings_data]
+        rows = await session.execute(
+            select(Building.address, Building.id).where(Building.address.in_(addresses))
+        )
+        building_ids = dict(rows.all())
+        buildings = [building_ids[address] for address in addresses]
+        print(f"Created buildings: {len(buildings)}")
 
         print("\nCreating activities...")
         activities_dao = ActivityDAO(session)
@@ -100,48 +111,162 @@ async def seed_data():
         organizations_data = [
             OrganizationCreate(
                 name='ООО "Рога и Копыта"',
-                building_id=buildings[0].id,
+                building_id=buildings[0],
                 phones=["2-222-222", "3-333-333"],
                 activity_ids=[meat.id, dairy.id]
             ),
             OrganizationCreate(
                 name='ИП "Молочный рай"',
-                building_id=buildings[1].id,
+                building_id=buildings[1],
                 phones=["8-923-666-13-13"],
                 activity_ids=[dairy.id]
             ),
             OrganizationCreate(
                 name='ООО "АвтоМир"',
-                building_id=buildings[2].id,
+                building_id=buildings[2],
                 phones=["8-800-555-35-35", "8-812-123-45-67"],
                 activity_ids=[cars.id, parts.id, accessories.id]
             ),
             OrganizationCreate(
                 name='ЗАО "ГрузовичкоФ"',
-                building_id=buildings[3].id,
+                building_id=buildings[3],
                 phones=["8-383-222-33-44"],
                 activity_ids=[trucks.id, parts.id]
             ),
             OrganizationCreate(
                 name='ООО "Мясокомбинат №1"',
-                building_id=buildings[0].id,
+                building_id=buildings[0],
                 phones=["8-495-111-22-33"],
                 activity_ids=[meat.id]
             ),
             OrganizationCreate(
                 name='ИП "Автозапчасти+"',
-                building_id=buildings[1].id,
+                building_id=buildings[1],
                 phones=["8-495-777-88-99"],
                 activity_ids=[parts.id]
             ),
         ]
 
-        for org_data in organizations_data:
-            org = await organizations_dao.create_organization(org_data=org_data)
-            print(f"Created organization: {org.name}")
+        result = await organizations_dao.bulk_create_organizations(organizations_data)
+        print(f"Created organizations: {result.rows}")
         await session.commit()
         print("\n✅ Database seeded successfully!")
 
 
+async def generate_activities(session, roots: int, children: int) -> List[int]:
+    """Полное трёхуровневое дерево: ``roots`` корней, у каждого узла ``children`` потомков."""
+    activities_dao = ActivityDAO(session)
+    activity_ids = []
+    for i in range(1, roots + 1):
+        root = await activities_dao.create_activity_tree(name=activity_name(i))
+        activity_ids.append(root.id)
+        for j in range(1, children + 1):
+            child = await activities_dao.create_activity_tree(name=activity_name(i, j), parent_id=root.id)
+            activity_ids.append(child.id)
+            for k in range(1, children + 1):
+                leaf = await activities_dao.create_activity_tree(name=activity_name(i, j, k), parent_id=child.id)
+                activity_ids.append(leaf.id)
+    await session.commit()
+    return activity_ids
+
+
+async def generate_buildings(session, count: int, rng: random.Random) -> List[int]:
+    buildings_data = []
+    for i in range(1, count + 1):
+        latitude = round(rng.uniform(AREA["min_latitude"], AREA["max_latitude"]), 6)
+        longitude = round(rng.uniform(AREA["min_longitude"], AREA["max_longitude"]), 6)
+        buildings_data.append(BuildingCreate(
+            address=f"г. Москва, ул. {rng.choice(STREETS)}, д. {i}",
+            latitude=latitude,
+            longitude=longitude,
+            geometry=f"POINT({longitude} {latitude})"
+        ))
+    await BuildingDAO(session).bulk_upsert(buildings_data, conflict_keys=["address"])
+    await session.commit()
+
+    addresses = [building.address for building in buildings_data]
+    rows = await session.execute(select(Building.id).where(Building.address.in_(addresses)))
+    return list(rows.scalars())
+
+
+def generate_organizations(
+        count: int,
+        building_ids: List[int],
+        activity_ids: List[int],
+        phones: int,
+        batch_size: int,
+        rng: random.Random
+) -> Iterator[List[OrganizationCreate]]:
+    batch = []
+    for i in range(1, count + 1):
+        name = f'{rng.choice(ORGANIZATION_FORMS)} "{rng.choice(NAME_WORDS)} {rng.choice(NAME_WORDS)} {i}"'
+        batch.append(OrganizationCreate(
+            name=name,
+            building_id=rng.choice(building_ids),
+            phones=[f"8-{rng.randint(900, 999)}-{rng.randint(0, 9999999):07d}" for _ in range(rng.randint(1, 2 * phones - 1))],
+            activity_ids=rng.sample(activity_ids, rng.randint(1, 3))
+        ))
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+async def generate_data(
+        buildings: int,
+        organizations: int,
+        phones: int,
+        activity_roots: int,
+        activity_children: int,
+        batch_size: int,
+        seed: int
+):
+    """Большой набор данных для нагрузочного тестирования через массовые методы DAO."""
+    rng = random.Random(seed)
+    started = time.perf_counter()
+    async with async_session_maker() as session:
+        activity_ids = await generate_activities(session, activity_roots, activity_children)
+        print(f"Created activities: {len(activity_ids)}")
+
+        building_ids = await generate_buildings(session, buildings, rng)
+        print(f"Created buildings: {len(building_ids)}")
+
+        organizations_dao = OrganizationDAO(session)
+        created = 0
+        for batch in generate_organizations(organizations, building_ids, activity_ids, phones, batch_size, rng):
+            result = await organizations_dao.bulk_create_organizations(batch, batch_size=batch_size)
+            await session.commit()
+            created += result.rows
+            print(f"Created organizations: {created}/{organizations}")
+
+    print(f"\n✅ Database generated in {time.perf_counter() - started:.0f}s")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Заполнение базы: демо-данные или большой набор для бенчмарков")
+    parser.add_argument("--generate", action="store_true", help="Сгенерировать большой набор данных")
+    parser.add_argument("--buildings", type=int, default=10_000)
+    parser.add_argument("--organizations", type=int, default=1_000_000)
+    parser.add_argument("--phones", type=int, default=3, help="Среднее число телефонов у организации")
+    parser.add_argument("--activity-roots", type=int, default=10)
+    parser.add_argument("--activity-children", type=int, default=10)
+    parser.add_argument("--batch-size", type=int, default=5_000)
+    parser.add_argument("--seed", type=int, default=42)
+    return parser.parse_args()
+
+
 if __name__ == "__main__":
-    asyncio.run(seed_data())
\ No newline at end of file
+    args = parse_args()
+    if args.generate:
+        asyncio.run(generate_data(
+            buildings=args.buildings,
+            organizations=args.organizations,
+            phones=args.phones,
+            activity_roots=args.activity_roots,
+            activity_children=args.activity_children,
+            batch_size=args.batch_size,
+            seed=args.seed
+        ))
+    else:
+        asyncio.run(seed_data())
\ No newline at end of file
@@ -0,0 +1,117 @@
+"""Микробенчмарк: CPU на подготовку горячих запросов OrganizationDAO.
+
+Сравнивает сборку запроса на каждый вызов (как было) с заранее собранными
+statement'ами из app.dao.organizations_dao. Замеряется то, что SQLAlchemy
+делает перед отправкой запроса в драйвер: сборка выражения, ключ кэша
+компиляции, поиск/компиляция в кэше и подготовка параметров. База данных не
+нужна, но переменные окружения для app.config должны быть заданы.
+
+    python scripts/bench_queries.py [число итераций]
+"""
+import sys
+import time
+from pathlib import Path
+
+scripts_dir = Path(__file__).parent
+project_root = scripts_dir.parent
+sys.path.append(str(project_root))
+
+from geoalchemy2 import functions as geo_func
+from sqlalchemy import Float, select
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import joinedload, selectinload
+
+from app.dao.organizations_dao import (
+    ORGANIZATION_NAME_SORT,
+    ORGANIZATION_WITH_RELATIONS,
+    ORGANIZATIONS_BY_ACTIVITIES,
+    ORGANIZATIONS_IN_RADIUS,
+    OrganizationDAO,
+)
+from app.dao.pagination import KeysetQuery, SortKey
+from app.models.organization_read import OrganizationRead
+from app.models.organizations import Organization
+
+dialect = postgresql.asyncpg.dialect()
+compiled_cache = {}
+
+
+def prepare(statement, params):
+    """Путь Connection.execute до драйвера: ключ кэша, компиляция из кэша, параметры."""
+    compiled, extracted_params, _ = statement._compile_w_cache(
+        dialect, compiled_cache=compiled_cache, column_keys=sorted(params)
+    )
+    return compiled.construct_params(params, extracted_parameters=extracted_params)
+
+
+def by_id_adhoc(i):
+    statement = (
+        select(Organization)
+        .options(
+            selectinload(Organization.phones),
+            selectinload(Organization.activities),
+            joinedload(Organization.building)
+        )
+        .filter(Organization.id == i)
+    )
+    return prepare(statement, {})
+
+
+def by_id_prepared(i):
+    return prepare(ORGANIZATION_WITH_RELATIONS, {"org_id": i})
+
+
+def radius_adhoc(i):
+    point = OrganizationDAO._geography_point(55.75, 37.61 + i % 10 / 100)
+    distance = geo_func.ST_Distance(OrganizationRead.geog, point, type_=Float)
+    query = KeysetQuery(
+        OrganizationDAO._lean_select(distance=distance)
+        .where(geo_func.ST_DWithin(OrganizationRead.geog, point, 1000.0)),
+        [SortKey(distance), SortKey(OrganizationRead.id)]
+    )
+    return prepare(*query.statement(50))
+
+
+def radius_prepared(i):
+    statement, params = ORGANIZATIONS_IN_RADIUS.statement(50)
+    params.update(latitude=55.75, longitude=37.61 + i % 10 / 100, radius=1000.0)
+    return prepare(statement, params)
+
+
+def activities_adhoc(i):
+    query = KeysetQuery(
+        OrganizationDAO._lean_select().where(OrganizationDAO._has_any_activity([1, 2, i % 7])),
+        ORGANIZATION_NAME_SORT
+    )
+    return prepare(*query.statement(50))
+
+
+def activities_prepared(i):
+    statement, params = ORGANIZATIONS_BY_ACTIVITIES.statement(50)
+    params["activity_ids"] = [1, 2, i % 7]
+    return prepare(statement, params)
+
+
+def measure(fn, iterations):
+    fn(0)
+    started = time.process_time()
+    for i in range(iterations):
+        fn(i)
+    return (time.process_time() - started) / iterations * 1e6
+
+
+def main(iterations: int = 2000):
+    cases = [
+        ("get_by_id_with_relations", by_id_adhoc, by_id_prepared),
+        ("get_nearby_radius", radius_adhoc, radius_prepared),
+        ("get_by_activity_with_children", activities_adhoc, activities_prepared),
+    ]
+    print(f"{'запрос':<32}{'до, мкс':>12}{'после, мкс':>14}{'ускорение':>12}")
+    for name, adhoc, prepared in cases:
+        before = measure(adhoc, iterations)
+        after = measure(prepared, iterations)
+        print(f"{name:<32}{before:>12.1f}{after:>14.1f}{before / after:>11.1f}x")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
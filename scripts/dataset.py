@@ -0,0 +1,16 @@
+"""Параметры сгенерированного набора данных, общие для add_data.py и load_test.py."""
+
+# Область генерации (Москва)
+AREA = {"min_latitude": 55.55, "min_longitude": 37.35, "max_latitude": 55.95, "max_longitude": 37.85}
+ORGANIZATION_FORMS = ["ООО", "ИП", "ЗАО", "АО", "ПАО"]
+NAME_WORDS = [
+    "Альфа", "Вектор", "Гранит", "Дельта", "Заря", "Импульс", "Кристалл", "Лидер", "Магистраль",
+    "Надежда", "Орион", "Прогресс", "Радуга", "Сириус", "Терминал", "Универсал", "Фаворит",
+    "Химпром", "Цветмет", "Эверест", "Юпитер", "Янтарь", "Мясо", "Молоко", "Автомир", "Запчасть",
+]
+STREETS = ["Ленина", "Тверская", "Арбат", "Мира", "Садовая", "Лесная", "Пушкина", "Гагарина"]
+
+
+def activity_name(*path: int) -> str:
+    """Имя сгенерированного вида деятельности по пути в дереве: 3 -> 3.7 -> 3.7.2."""
+    return "Деятельность " + ".".join(str(number) for number in path)
@@ -0,0 +1,270 @@
+"""Нагрузочный тест API: все эндпоинты /organizations по очереди.
+
+Рассчитан на базу, заполненную ``python scripts/add_data.py --generate``
+с теми же --buildings/--organizations: id берутся случайно из диапазонов
+1..N, названия и координаты - из scripts/dataset.py. Для каждого
+эндпоинта ``--concurrency`` клиентов в течение ``--duration`` секунд шлют
+запросы со случайными параметрами; в отчёт попадают RPS, доля ошибок и
+перцентили задержки. Результат сохраняется в JSON, ``--compare`` выводит
+разницу с предыдущим прогоном. На время замера на сервере нужно отключить
+ограничение частоты (RATE_LIMIT_ENABLED=false), иначе часть ответов будет 429.
+
+    python scripts/load_test.py --base-url http://localhost:8000 --api-key KEY \\
+        --output results/after.json --compare results/before.json
+"""
+import argparse
+import asyncio
+import json
+import platform
+import random
+import statistics
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import httpx
+
+from dataset import AREA, NAME_WORDS, activity_name
+
+API_PREFIX = "/api/v1/organizations"
+
+
+@dataclass
+class Request:
+    method: str
+    url: str
+    params: Optional[Dict[str, Any]] = None
+    json: Optional[Any] = None
+
+
+@dataclass
+class Scenario:
+    name: str
+    build: Callable[[random.Random], Request]
+
+
+@dataclass
+class Stats:
+    latencies: List[float] = field(default_factory=list)
+    errors: int = 0
+    statuses: Dict[int, int] = field(default_factory=dict)
+    seconds: float = 0.0
+
+    def record(self, status_code: int, latency: float) -> None:
+        self.latencies.append(latency)
+        self.statuses[status_code] = self.statuses.get(status_code, 0) + 1
+        if status_code >= 400:
+            self.errors += 1
+
+    def summary(self) -> Dict[str, Any]:
+        latencies = sorted(self.latencies)
+        if not latencies:
+            return {"requests": 0, "errors": self.errors}
+
+        def percentile(p: float) -> float:
+            return latencies[min(len(latencies) - 1, int(p / 100 * len(latencies)))] * 1000
+
+        return {
+            "requests": len(latencies),
+            "errors": self.errors,
+            "statuses": {str(code): count for code, count in sorted(self.statuses.items())},
+            "rps": round(len(latencies) / self.seconds, 1) if self.seconds else 0.0,
+            "mean_ms": round(statistics.fmean(latencies) * 1000, 2),
+            "p50_ms": round(percentile(50), 2),
+            "p95_ms": round(percentile(95), 2),
+            "p99_ms": round(percentile(99), 2),
+            "max_ms": round(latencies[-1] * 1000, 2),
+        }
+
+
+def random_point(rng: random.Random):
+    return (
+        rng.uniform(AREA["min_latitude"], AREA["max_latitude"]),
+        rng.uniform(AREA["min_longitude"], AREA["max_longitude"]),
+    )
+
+
+def random_bbox(rng: random.Random, size: float) -> Dict[str, float]:
+    latitude, longitude = random_point(rng)
+    return {"min_lat": latitude, "min_lon": longitude, "max_lat": latitude + size, "max_lon": longitude + size}
+
+
+def build_scenarios(args) -> List[Scenario]:
+    organization_id = lambda rng: rng.randint(1, args.organizations)
+    activity_path = lambda rng, depth: [rng.randint(1, args.activity_children) for _ in range(depth - 1)]
+    activity_count = args.activity_roots * (1 + args.activity_children + args.activity_children ** 2)
+
+    def search(mode: str, query: Callable[[random.Random], str]) -> Callable[[random.Random], Request]:
+        return lambda rng: Request("GET", f"{API_PREFIX}/search/by-name", {"query": query(rng), "mode": mode})
+
+    scenarios = [
+        Scenario("get_by_id", lambda rng: Request("GET", f"{API_PREFIX}/id/{organization_id(rng)}")),
+        Scenario("batch", lambda rng: Request(
+            "POST", f"{API_PREFIX}/batch",
+            json={"ids": [organization_id(rng) for _ in range(args.batch_ids)]}
+        )),
+        Scenario("search_prefix", search("prefix", lambda rng: rng.choice(NAME_WORDS)[:4])),
+        Scenario("search_substring", search("substring", lambda rng: rng.choice(NAME_WORDS)[1:5].lower())),
+        Scenario("search_fuzzy", search("fuzzy", lambda rng: f"{rng.choice(NAME_WORDS)} {rng.choice(NAME_WORDS)}")),
+        Scenario("by_building", lambda rng: Request(
+            "GET", f"{API_PREFIX}/by-building/{rng.randint(1, args.buildings)}"
+        )),
+        Scenario("by_activity", lambda rng: Request(
+            "GET", f"{API_PREFIX}/by-activity",
+            {"query": activity_name(rng.randint(1, args.activity_roots), *activity_path(rng, 3))}
+        )),
+        Scenario("by_activity_tree", lambda rng: Request(
+            "GET", f"{API_PREFIX}/by-activity-tree",
+            {"query": activity_name(rng.randint(1, args.activity_roots), *activity_path(rng, rng.randint(1, 2)))}
+        )),
+        Scenario("nearby_radius", lambda rng: Request(
+            "GET", f"{API_PREFIX}/nearby/radius",
+            dict(zip(("latitude", "longitude"), random_point(rng)), radius=args.radius)
+        )),
+        Scenario("nearby_nearest", lambda rng: Request(
+            "GET", f"{API_PREFIX}/nearby/nearest",
+            dict(zip(("lat", "lon"), random_point(rng)), k=10)
+        )),
+        Scenario("in_bbox", lambda rng: Request("GET", f"{API_PREFIX}/in-bbox", random_bbox(rng, 0.01))),
+        Scenario("in_bbox_clusters", lambda rng: Request(
+            "GET", f"{API_PREFIX}/in-bbox/clusters", dict(random_bbox(rng, 0.2), grid_size=16)
+        )),
+        Scenario("search_combined", lambda rng: Request(
+            "GET", f"{API_PREFIX}/search",
+            dict(
+                zip(("latitude", "longitude"), random_point(rng)),
+                radius=args.radius * 2,
+                query=rng.choice(NAME_WORDS)[1:5].lower(),
+                activity_id=rng.randint(1, activity_count),
+                include_subactivities=True
+            )
+        )),
+        Scenario("export_building", lambda rng: Request(
+            "GET", f"{API_PREFIX}/export", {"format": "ndjson", "building_id": rng.randint(1, args.buildings)}
+        )),
+    ]
+    if args.only:
+        scenarios = [scenario for scenario in scenarios if scenario.name in args.only]
+    return scenarios
+
+
+async def send(client: httpx.AsyncClient, request: Request) -> int:
+    # тело читается целиком: для выгрузки время ответа включает весь поток
+    response = await client.request(request.method, request.url, params=request.params, json=request.json)
+    await response.aread()
+    return response.status_code
+
+
+async def run_scenario(client: httpx.AsyncClient, scenario: Scenario, args, seed: int) -> Stats:
+    stats = Stats()
+    rng = random.Random(seed)
+
+    for _ in range(args.warmup):
+        await send(client, scenario.build(rng))
+
+    deadline = time.perf_counter() + args.duration
+
+    async def worker(worker_rng: random.Random):
+        while time.perf_counter() < deadline:
+            request = scenario.build(worker_rng)
+            started = time.perf_counter()
+            try:
+                status_code = await send(client, request)
+            except httpx.HTTPError:
+                status_code = 599
+            stats.record(status_code, time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(random.Random(rng.random())) for _ in range(args.concurrency)))
+    stats.seconds = time.perf_counter() - started
+    return stats
+
+
+def print_report(results: Dict[str, Dict[str, Any]], previous: Optional[Dict[str, Dict[str, Any]]] = None) -> None:
+    header = f"{'эндпоинт':<20}{'запросов':>10}{'ошибок':>8}{'RPS':>9}{'p50, мс':>10}{'p95, мс':>10}{'p99, мс':>10}"
+    if previous:
+        header += f"{'Δp95':>9}{'ΔRPS':>9}"
+    print(header)
+    for name, summary in results.items():
+        if not summary.get("requests"):
+            print(f"{name:<20}{'-':>10}")
+            continue
+        line = (
+            f"{name:<20}{summary['requests']:>10}{summary['errors']:>8}{summary['rps']:>9.1f}"
+            f"{summary['p50_ms']:>10.1f}{summary['p95_ms']:>10.1f}{summary['p99_ms']:>10.1f}"
+        )
+        before = (previous or {}).get(name)
+        if before and before.get("requests"):
+            line += f"{_change(before['p95_ms'], summary['p95_ms']):>9}{_change(before['rps'], summary['rps']):>9}"
+        print(line)
+
+
+def _change(before: float, after: float) -> str:
+    return f"{(after - before) / before * 100:+.0f}%" if before else "-"
+
+
+async def main(args) -> None:
+    scenarios = build_scenarios(args)
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    results = {}
+    async with httpx.AsyncClient(
+            base_url=args.base_url,
+            headers={"X-API-Key": args.api_key},
+            limits=limits,
+            timeout=args.timeout
+    ) as client:
+        for index, scenario in enumerate(scenarios):
+            stats = await run_scenario(client, scenario, args, seed=args.seed + index)
+            results[scenario.name] = stats.summary()
+            print(f"{scenario.name}: {results[scenario.name]}")
+
+    previous = None
+    if args.compare:
+        previous = json.loads(Path(args.compare).read_text(encoding="utf-8"))["results"]
+    print()
+    print_report(results, previous)
+
+    if args.output:
+        output = Path(args.output)
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(json.dumps({
+            "meta": {
+                "started_at": datetime.now(timezone.utc).isoformat(),
+                "base_url": args.base_url,
+                "concurrency": args.concurrency,
+                "duration": args.duration,
+                "organizations": args.organizations,
+                "buildings": args.buildings,
+                "seed": args.seed,
+                "python": platform.python_version(),
+            },
+            "results": results,
+        }, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"\nРезультаты сохранены в {output}")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Нагрузочный тест API справочника организаций")
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--api-key", required=True)
+    parser.add_argument("--concurrency", type=int, default=32, help="Число одновременных клиентов")
+    parser.add_argument("--duration", type=float, default=30.0, help="Секунд нагрузки на каждый эндпоинт")
+    parser.add_argument("--warmup", type=int, default=20, help="Запросов прогрева перед замером")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--organizations", type=int, default=1_000_000)
+    parser.add_argument("--buildings", type=int, default=10_000)
+    parser.add_argument("--activity-roots", type=int, default=10)
+    parser.add_argument("--activity-children", type=int, default=10)
+    parser.add_argument("--batch-ids", type=int, default=50, help="Размер списка id для /batch")
+    parser.add_argument("--radius", type=float, default=1000.0, help="Радиус для /nearby/radius, м")
+    parser.add_argument("--only", nargs="+", help="Запустить только перечисленные сценарии")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Файл JSON с результатами")
+    parser.add_argument("--compare", help="JSON предыдущего прогона для сравнения")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
@@ -0,0 +1,51 @@
+import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.cache.backends import InMemoryCacheBackend
+from app.cache.invalidation import CHANNEL, CacheInvalidationListener
+from app.cache.response_cache import ResponseCache
+from app.dao.activities_dao import ActivityDAO
+from app.dao.activity_tree import activity_tree_cache
+from app.models.activities import Activity
+from tests.conftest import requires_database
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def activities(db_engine):
+    async with db_engine.begin() as connection:
+        await connection.run_sync(Activity.__table__.drop, checkfirst=True)
+        await connection.run_sync(Activity.__table__.create)
+    try:
+        yield async_sessionmaker(db_engine, expire_on_commit=False)
+    finally:
+        activity_tree_cache.invalidate()
+        async with db_engine.begin() as connection:
+            await connection.run_sync(Activity.__table__.drop)
+
+
+async def test_notify_about_activities_resets_tree():
+    listener = CacheInvalidationListener(ResponseCache(InMemoryCacheBackend(), ttl=60), dsn="")
+    activity_tree_cache._tree = object()
+
+    listener._notified(None, 0, CHANNEL, "organizations")
+    assert activity_tree_cache._tree is not None
+
+    listener._notified(None, 0, CHANNEL, "activities")
+    assert activity_tree_cache._tree is None
+
+
+@requires_database
+async def test_commit_through_base_dao_resets_tree(activities):
+    async with activities() as session:
+        dao = ActivityDAO(session)
+        await dao.bulk_upsert([{"id": 1, "name": "Еда", "level": 1}])
+        await session.commit()
+        assert await dao.get_subtree_ids(1) == [1]
+
+        await dao.bulk_upsert([{"id": 2, "name": "Мясная продукция", "level": 2, "parent_id": 1}])
+        # до коммита другие запросы видят прежнее дерево
+        assert await dao.get_subtree_ids(1) == [1]
+        await session.commit()
+        assert sorted(await dao.get_subtree_ids(1)) == [1, 2]
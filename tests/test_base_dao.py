@@ -0,0 +1,42 @@
+import pytest
+from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.dao.activities_dao import ActivityDAO
+from app.models.activities import Activity
+from tests.conftest import requires_database
+
+pytestmark = pytest.mark.anyio
+
+
+class LevelFilter(BaseModel):
+    level: int
+
+
+@pytest.fixture
+async def session(db_engine):
+    async with db_engine.begin() as connection:
+        await connection.run_sync(Activity.__table__.drop, checkfirst=True)
+        await connection.run_sync(Activity.__table__.create)
+    try:
+        async with async_sessionmaker(db_engine, expire_on_commit=False)() as session:
+            yield session
+    finally:
+        async with db_engine.begin() as connection:
+            await connection.run_sync(Activity.__table__.drop)
+
+
+@requires_database
+async def test_find_page_walks_all_records_by_id(session):
+    dao = ActivityDAO(session)
+    await dao.bulk_upsert([{"id": i, "name": f"Вид {i}", "level": 1 + i % 2} for i in range(1, 8)])
+
+    ids, after = [], None
+    while True:
+        page = await dao.find_page(LevelFilter(level=1), limit=2, after=after)
+        ids.extend(activity.id for activity in page.items)
+        if page.next_cursor is None:
+            break
+        after = page.next_cursor
+
+    assert ids == [2, 4, 6]
@@ -0,0 +1,122 @@
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.dao.activities_dao import ActivityDAO
+from app.dao.bulk import BulkResult, BulkTimer, params_batch_size
+from app.models.activities import Activity
+from tests.conftest import requires_database
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def session(db_engine):
+    async with db_engine.begin() as connection:
+        await connection.run_sync(Activity.__table__.drop, checkfirst=True)
+        await connection.run_sync(Activity.__table__.create)
+    try:
+        async with async_sessionmaker(db_engine, expire_on_commit=False)() as session:
+            yield session
+    finally:
+        async with db_engine.begin() as connection:
+            await connection.run_sync(Activity.__table__.drop)
+
+
+async def rows(session):
+    result = await session.execute(
+        select(Activity.id, Activity.name, Activity.level, Activity.parent_id).order_by(Activity.id)
+    )
+    return [tuple(row) for row in result.all()]
+
+
+def test_bulk_result_totals():
+    total = BulkResult(rows=10, batches=2, seconds=2.0).add(BulkResult(rows=5, batches=1, seconds=1.0))
+    assert total == BulkResult(rows=15, batches=3, seconds=3.0)
+    assert total.rows_per_second == 5.0
+    assert BulkResult(rows=10).rows_per_second == 0.0
+
+
+def test_bulk_timer_counts_batches():
+    timer = BulkTimer()
+    timer.batch(100)
+    timer.batch(20)
+    result = timer.stop()
+    assert (result.rows, result.batches) == (120, 2)
+    assert result.seconds >= 0
+
+
+def test_params_batch_size_respects_asyncpg_limit():
+    assert params_batch_size(1000, 3) == 1000
+    assert params_batch_size(100000, 4) == 32767 // 4
+    assert params_batch_size(10, 0) == 10
+
+
+@requires_database
+async def test_bulk_upsert_inserts_then_updates(session):
+    dao = ActivityDAO(session)
+    inserted = await dao.bulk_upsert(
+        [{"id": i, "name": f"Вид {i}", "level": 1} for i in range(1, 6)],
+        batch_size=2
+    )
+    assert (inserted.rows, inserted.batches) == (5, 3)
+
+    await dao.bulk_upsert([{"id": 2, "name": "Еда", "level": 1}, {"id": 6, "name": "Авто", "level": 1}])
+    assert (await rows(session))[1] == (2, "Еда", 1, None)
+    assert len(await rows(session)) == 6
+
+
+@requires_database
+async def test_bulk_upsert_records_with_different_fields(session):
+    dao = ActivityDAO(session)
+    await dao.bulk_upsert([{"id": i, "name": f"Вид {i}", "level": 1} for i in range(1, 4)])
+
+    # набор полей первой записи не определяет запрос для остальных:
+    # parent_id второй записи сохраняется, а отсутствующие поля не затираются
+    await dao.bulk_upsert([
+        {"id": 2, "name": "Мясная продукция"},
+        {"id": 3, "name": "Молочная продукция", "level": 2, "parent_id": 1},
+        {"id": 4, "name": "Грузовые", "level": 2, "parent_id": 1},
+    ])
+
+    assert await rows(session) == [
+        (1, "Вид 1", 1, None),
+        (2, "Мясная продукция", 1, None),
+        (3, "Молочная продукция", 2, 1),
+        (4, "Грузовые", 2, 1),
+    ]
+
+
+@requires_database
+async def test_bulk_upsert_update_columns(session):
+    dao = ActivityDAO(session)
+    await dao.bulk_upsert([{"id": 1, "name": "Еда", "level": 1}])
+
+    await dao.bulk_upsert([{"id": 1, "name": "Не обновится", "level": 3}], update_columns=["level"])
+    assert await rows(session) == [(1, "Еда", 3, None)]
+
+    await dao.bulk_upsert([{"id": 1, "name": "Не обновится", "level": 2}], update_columns=[])
+    assert await rows(session) == [(1, "Еда", 3, None)]
+
+
+@requires_database
+async def test_bulk_update_groups_by_fields(session):
+    dao = ActivityDAO(session)
+    await dao.bulk_upsert([{"id": i, "name": f"Вид {i}", "level": 1} for i in range(1, 5)])
+
+    result = await dao.bulk_update([
+        {"id": 1, "name": "Еда"},
+        {"id": 2, "level": 2, "parent_id": 1},
+        {"id": 3, "name": "Авто"},
+        {"name": "без id пропускается"},
+        {"id": 4},
+    ], batch_size=1)
+
+    # две группы полей, по пачке на запись; записи без id или без полей пропущены
+    assert (result.rows, result.batches) == (3, 3)
+    assert await rows(session) == [
+        (1, "Еда", 1, None),
+        (2, "Вид 2", 2, 1),
+        (3, "Авто", 1, None),
+        (4, "Вид 4", 1, None),
+    ]
@@ -0,0 +1,127 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.cache.response_cache import response_cache
+from app.dao.organizations_dao import OrganizationDAO
+from app.dependencies.dao_dep import get_session_without_commit
+from app.main import app
+from tests.conftest import TEST_API_KEY, requires_database
+
+
+def organization(name: str) -> dict:
+    return {
+        "id": 1,
+        "name": name,
+        "building_id": 1,
+        "building": {"id": 1, "address": "ул. Ленина, 1", "latitude": 55.75, "longitude": 37.61},
+        "phones": [],
+        "activities": [],
+        "created_at": datetime(2026, 1, 1).isoformat(),
+    }
+
+
+@pytest.fixture
+def directory(monkeypatch):
+    """Данные организации, которые тест меняет «в другом процессе»."""
+    state = {"version": (1, datetime(2026, 1, 1)), "document": organization("Old"), "probes": 0}
+
+    async def get_organization_version(self, org_id):
+        state["probes"] += 1
+        return state["version"]
+
+    async def get_detail(self, org_id):
+        return state["document"]
+
+    async def no_session():
+        yield None
+
+    monkeypatch.setattr(OrganizationDAO, "get_organization_version", get_organization_version)
+    monkeypatch.setattr(OrganizationDAO, "get_detail", get_detail)
+    app.dependency_overrides[get_session_without_commit] = no_session
+    asyncio.run(response_cache.backend.clear())
+    yield state
+    app.dependency_overrides.clear()
+    asyncio.run(response_cache.backend.clear())
+
+
+def notify(*tables):
+    """Сброс, который в работе приходит через NOTIFY после коммита в другом процессе."""
+    asyncio.run(response_cache.backend.invalidate_tags(tables))
+
+
+def test_cached_body_matches_etag(directory):
+    client = TestClient(app, headers={"X-API-Key": TEST_API_KEY})
+    url = "/api/v1/organizations/id/1"
+
+    first = client.get(url)
+    assert first.status_code == 200 and first.json()["name"] == "Old"
+    old_etag = first.headers["etag"]
+
+    directory["version"] = (1, datetime(2026, 1, 2))
+    directory["document"] = organization("New")
+    notify("organizations")
+
+    second = client.get(url)
+    assert second.status_code == 200
+    assert second.headers["etag"] != old_etag
+    assert second.json()["name"] == "New"
+
+    assert client.get(url, headers={"If-None-Match": second.headers["etag"]}).status_code == 304
+    stale = client.get(url, headers={"If-None-Match": old_etag})
+    assert stale.status_code == 200 and stale.json()["name"] == "New"
+
+
+def test_cache_hit_does_not_probe_version(directory):
+    client = TestClient(app, headers={"X-API-Key": TEST_API_KEY})
+    url = "/api/v1/organizations/id/1"
+
+    etag = client.get(url).headers["etag"]
+    assert client.get(url).status_code == 200
+    assert client.get(url, headers={"If-None-Match": etag}).status_code == 304
+    assert directory["probes"] == 1
+
+    notify("phones")
+    assert client.get(url, headers={"If-None-Match": etag}).status_code == 304
+    assert directory["probes"] == 2
+
+
+def test_unchanged_data_is_served_from_cache(directory):
+    client = TestClient(app, headers={"X-API-Key": TEST_API_KEY})
+    url = "/api/v1/organizations/id/1"
+
+    first = client.get(url)
+    directory["document"] = organization("Changed without version bump")
+    second = client.get(url)
+
+    assert second.headers["etag"] == first.headers["etag"]
+    assert second.json()["name"] == "Old"
+
+
+@requires_database
+@pytest.mark.anyio
+async def test_building_version_sees_late_commit_with_earlier_refresh(db_engine):
+    async with db_engine.begin() as connection:
+        await connection.execute(text("DROP TABLE IF EXISTS organization_read"))
+        await connection.execute(text(
+            "CREATE TABLE organization_read (id integer PRIMARY KEY, building_id integer, refreshed_at timestamp)"
+        ))
+        await connection.execute(text(
+            "INSERT INTO organization_read VALUES (1, 1, '2026-01-01 10:00:00'), (2, 1, '2026-01-01 12:00:00')"
+        ))
+    try:
+        async with async_sessionmaker(db_engine)() as session:
+            dao = OrganizationDAO(session)
+            before = await dao.get_building_version(1)
+            # транзакция пересчитала организацию 1 в 11:00, раньше максимума, а закоммитилась позже
+            await session.execute(text("UPDATE organization_read SET refreshed_at = '2026-01-01 11:00:00' WHERE id = 1"))
+            after = await dao.get_building_version(1)
+        assert before[0] == after[0] == 2
+        assert before != after
+    finally:
+        async with db_engine.begin() as connection:
+            await connection.execute(text("DROP TABLE organization_read"))
@@ -0,0 +1,63 @@
+import asyncio
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from app.config import settings
+from app.database.db import all_engines, engine
+from app.main import app
+from tests.conftest import TEST_API_KEY, requires_database
+
+ROWS = 2500
+
+# без PostGIS: только колонки, которые читает выгрузка без фильтра по области
+CREATE_TABLE = """
+CREATE TABLE organization_read (
+    id integer PRIMARY KEY,
+    building_id integer NOT NULL,
+    activity_ids integer[] NOT NULL DEFAULT '{}',
+    document jsonb NOT NULL
+)
+"""
+
+
+async def execute(*statements):
+    async with engine.begin() as connection:
+        for statement in statements:
+            await connection.execute(text(statement))
+    # соединения asyncpg привязаны к циклу событий, который сейчас закроется
+    await engine.dispose()
+
+
+@pytest.fixture
+def organization_read():
+    asyncio.run(execute(
+        "DROP TABLE IF EXISTS organization_read",
+        CREATE_TABLE,
+        f"INSERT INTO organization_read (id, building_id, document) "
+        f"SELECT i, 1, jsonb_build_object('id', i, 'name', 'Организация ' || i) FROM generate_series(1, {ROWS}) i"
+    ))
+    yield
+    # соединения приложения остались в пуле от цикла событий TestClient:
+    # пул сбрасывается, а сами соединения (и незакрытые курсоры) закрывает сервер
+    for pooled in all_engines:
+        pooled.sync_engine.dispose(close=False)
+    asyncio.run(execute(
+        f"SELECT pg_terminate_backend(pid) FROM pg_stat_activity "
+        f"WHERE application_name = '{settings.DB_APPLICATION_NAME}' AND pid <> pg_backend_pid()",
+        "DROP TABLE organization_read"
+    ))
+
+
+@requires_database
+def test_export_streams_all_rows(organization_read):
+    client = TestClient(app, headers={"X-API-Key": TEST_API_KEY})
+
+    with client.stream("GET", "/api/v1/organizations/export") as response:
+        assert response.status_code == 200
+        lines = [json.loads(line) for line in response.iter_lines() if line]
+
+    # больше одной пачки yield_per: курсор читается внутри транзакции
+    assert [document["id"] for document in lines] == list(range(1, ROWS + 1))
@@ -0,0 +1,47 @@
+import asyncio
+
+import pytest
+from loguru import logger
+from sqlalchemy import text
+
+from app.config import settings
+from app.database.instrumentation import instrument_engine, statement_operation
+from tests.conftest import requires_database
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.mark.parametrize("statement, operation", [
+    ("SELECT 1", "select"),
+    ("  insert INTO phones (number) VALUES ($1)", "insert"),
+    ("WITH t AS (SELECT 1 AS x) SELECT x FROM t", "select"),
+    ("WITH RECURSIVE tree(id) AS (SELECT id FROM activities UNION ALL SELECT a.id FROM activities a "
+     "JOIN tree ON a.parent_id = tree.id) SELECT * FROM tree", "select"),
+    ("WITH moved AS (DELETE FROM phones RETURNING *) INSERT INTO archive SELECT * FROM moved", "insert"),
+    ("WITH \"update\" AS (SELECT ')delete(' AS s) UPDATE x SET s = 1", "update"),
+    ("(SELECT 1) UNION (SELECT 2)", "select"),
+    ("", "-"),
+])
+def test_statement_operation(statement, operation):
+    assert statement_operation(statement) == operation
+
+
+@requires_database
+async def test_slow_cte_is_explained(db_engine, monkeypatch):
+    instrument_engine(db_engine, "test")
+    monkeypatch.setattr(settings, "DB_SLOW_QUERY_MS", 0.0)
+    monkeypatch.setattr(settings, "DB_EXPLAIN_SLOW_QUERIES", True)
+    messages = []
+    sink = logger.add(messages.append, level="WARNING", format="{message}")
+    try:
+        async with db_engine.begin() as connection:
+            await connection.execute(text("WITH t AS (SELECT CAST(:x AS int) AS x) SELECT x FROM t"), {"x": 1})
+            # план строится в фоне на другом соединении, транзакция запроса не затронута
+            async with asyncio.timeout(5):
+                while not any("План медленного запроса" in message for message in messages):
+                    await asyncio.sleep(0.01)
+            assert (await connection.execute(text("SELECT 1"))).scalar() == 1
+    finally:
+        logger.remove(sink)
+
+    assert any("CTE Scan" in message or "Result" in message for message in messages)
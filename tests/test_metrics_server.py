@@ -0,0 +1,49 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.metrics import with_labels
+from app.metrics_server import MetricsServer
+
+pytestmark = pytest.mark.anyio
+
+
+async def get(port: int, path: str, headers: str = "") -> tuple:
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(f"GET {path} HTTP/1.1\r\nHost: localhost\r\n{headers}\r\n".encode())
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    head, _, body = response.partition(b"\r\n\r\n")
+    return int(head.split(b" ", 2)[1]), body.decode()
+
+
+def test_with_labels():
+    lines = ["# TYPE a counter", "a 1", 'b{engine="primary"} 2']
+    assert list(with_labels(lines, {"worker": "3"})) == [
+        "# TYPE a counter", 'a{worker="3"} 1', 'b{worker="3",engine="primary"} 2'
+    ]
+
+
+async def test_worker_serves_labelled_metrics():
+    server = MetricsServer("127.0.0.1", 0, token="secret", worker=2)
+    await server.start()
+    port = server.sockets[0].getsockname()[1]
+    try:
+        assert (await get(port, "/metrics"))[0] == 401
+        assert (await get(port, "/metrics", "Authorization: Bearer wrong\r\n"))[0] == 401
+        assert (await get(port, "/other", "Authorization: Bearer secret\r\n"))[0] == 404
+
+        status, body = await get(port, "/metrics", "Authorization: Bearer secret\r\n")
+        assert status == 200
+        assert "# TYPE db_query_duration_seconds histogram" in body
+        samples = [line for line in body.splitlines() if line and not line.startswith("#")]
+        assert samples and all('worker="2"' in line for line in samples)
+    finally:
+        await server.stop()
+
+
+def test_metrics_are_not_served_by_api():
+    assert TestClient(app).get("/metrics").status_code == 404
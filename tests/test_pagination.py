@@ -0,0 +1,68 @@
+import base64
+
+import pytest
+from sqlalchemy import Column, Integer, MetaData, String, Table, func
+
+from app.dao.pagination import InvalidCursorError, SortKey, decode_cursor, encode_cursor, keyset_condition
+
+items = Table(
+    "items", MetaData(),
+    Column("id", Integer, primary_key=True),
+    Column("name", String),
+    Column("rating", Integer),
+)
+SORT = [SortKey(items.c.name), SortKey(items.c.id)]
+
+
+def compiled(clause) -> str:
+    return str(clause.compile(compile_kwargs={"literal_binds": True}))
+
+
+def test_cursor_round_trip():
+    cursor = encode_cursor(["Рога и копыта", 42])
+
+    assert "=" not in cursor
+    assert decode_cursor(cursor, SORT) == ["Рога и копыта", 42]
+
+
+@pytest.mark.parametrize("cursor", [
+    "не base64",
+    encode_cursor(["Рога и копыта", 42])[:-3],
+    base64.urlsafe_b64encode(b"\xff\xfe").decode(),
+    base64.urlsafe_b64encode(b'{"name": 1}').decode(),
+])
+def test_tampered_cursor(cursor):
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(cursor, SORT)
+
+
+@pytest.mark.parametrize("values", [["Рога и копыта"], ["Рога и копыта", 42, 1], []])
+def test_cursor_of_wrong_length(values):
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(encode_cursor(values), SORT)
+
+
+@pytest.mark.parametrize("values", [[42, "Рога и копыта"], ["Рога и копыта", True], ["Рога и копыта", None]])
+def test_cursor_of_wrong_type(values):
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(encode_cursor(values), SORT)
+
+
+def test_cursor_for_column_without_python_type():
+    sort = [SortKey(func.ST_Distance(items.c.id, 1)), SortKey(items.c.id)]
+
+    assert decode_cursor(encode_cursor([1.5, 7]), sort) == [1.5, 7]
+
+
+def test_ascending_keyset_is_row_comparison():
+    assert compiled(keyset_condition(SORT, ["Б", 7])) == "(items.name, items.id) > ('Б', 7)"
+
+
+def test_mixed_keyset_expands_to_or():
+    sort = [SortKey(items.c.rating, descending=True), SortKey(items.c.name), SortKey(items.c.id)]
+
+    assert compiled(keyset_condition(sort, [5, "Б", 7])) == (
+        "items.rating < 5"
+        " OR items.rating = 5 AND items.name > 'Б'"
+        " OR items.rating = 5 AND items.name = 'Б' AND items.id > 7"
+    )
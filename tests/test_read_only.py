@@ -0,0 +1,34 @@
+import pytest
+from sqlalchemy import select, text
+from sqlalchemy.exc import DBAPIError
+
+from app.database.db import all_engines, read_only_engines, read_router, read_session_maker
+from tests.conftest import requires_database
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def read_session():
+    async with read_session_maker(bind=read_only_engines[read_router.primary]) as session:
+        yield session
+    # пулы приложения не должны пережить цикл событий теста
+    for pooled in all_engines:
+        await pooled.dispose()
+
+
+@requires_database
+@pytest.mark.parametrize("statement", [
+    "CREATE TEMP TABLE read_only_check (id int)",
+    "SELECT 1 AS id INTO read_only_check",
+    "CREATE SEQUENCE read_only_check",
+])
+async def test_read_session_rejects_writes(read_session, statement):
+    # сессия в AUTOCOMMIT: запись отклоняет сервер, а не разбор текста запроса
+    with pytest.raises(DBAPIError, match="read-only transaction"):
+        await read_session.execute(text(statement))
+
+
+@requires_database
+async def test_read_session_reads(read_session):
+    assert (await read_session.execute(select(text("current_setting('transaction_read_only')")))).scalar() == "on"
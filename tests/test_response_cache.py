@@ -0,0 +1,115 @@
+import asyncio
+
+import asyncpg
+import pytest
+from sqlalchemy.engine import make_url
+from starlette.responses import Response
+
+from app.cache.backends import InMemoryCacheBackend
+from app.cache.invalidation import CHANNEL, CacheInvalidationListener
+from app.cache.response_cache import CachedResponse, ResponseCache
+from tests.conftest import TEST_DATABASE_URL, requires_database
+
+pytestmark = pytest.mark.anyio
+
+
+def cached_response(size: int) -> CachedResponse:
+    return CachedResponse(body=b"x" * size, status_code=200, media_type="application/json")
+
+
+async def test_backend_is_bounded_by_bytes():
+    backend = InMemoryCacheBackend(max_entries=100, max_bytes=250, max_entry_bytes=150)
+
+    await backend.set("a", cached_response(100), ttl=60, tags=("organizations",))
+    await backend.set("b", cached_response(100), ttl=60, tags=("organizations",))
+    await backend.get("a")
+    await backend.set("c", cached_response(100), ttl=60, tags=("organizations",))
+
+    # вытесняется давно не читавшаяся запись
+    assert await backend.get("b") is None
+    assert await backend.get("a") is not None
+    assert backend.nbytes == 200
+
+    await backend.set("big", cached_response(200), ttl=60, tags=())
+    assert await backend.get("big") is None
+
+    await backend.invalidate_tags(["organizations"])
+    assert len(backend) == 0 and backend.nbytes == 0
+
+
+async def test_followers_survive_cancelled_leader():
+    cache = ResponseCache(InMemoryCacheBackend(), ttl=60)
+    release = asyncio.Event()
+    calls = []
+
+    @cache.cached(tags=("organizations",))
+    async def endpoint(organization_id: int):
+        calls.append(organization_id)
+        await release.wait()
+        return Response(content=b'{"id": 1}', media_type="application/json")
+
+    leader = asyncio.create_task(endpoint(organization_id=1, _cache_response=None))
+    await asyncio.sleep(0)
+    followers = [asyncio.create_task(endpoint(organization_id=1, _cache_response=None)) for _ in range(3)]
+    await asyncio.sleep(0)
+
+    leader.cancel()
+    await asyncio.sleep(0)
+    release.set()
+    responses = await asyncio.gather(*followers)
+
+    assert leader.cancelled()
+    assert [response.body for response in responses] == [b'{"id": 1}'] * 3
+    # ответ вычислен заново один раз, остальные ожидающие получили его же
+    assert calls == [1, 1]
+
+
+async def test_response_started_before_invalidation_is_not_cached():
+    cache = ResponseCache(InMemoryCacheBackend(), ttl=60)
+    release = asyncio.Event()
+    names = iter(["Old", "New", "New"])
+
+    @cache.cached(tags=("organizations",))
+    async def endpoint(organization_id: int):
+        name = next(names)
+        if name == "Old":
+            await release.wait()
+        return Response(content=name.encode(), media_type="application/json")
+
+    stale = asyncio.create_task(endpoint(organization_id=1, _cache_response=None))
+    await asyncio.sleep(0)
+    # запись закоммичена, пока первый запрос ещё читал старые данные
+    cache.invalidate_tables(["organizations"])
+    # запрос после сброса не присоединяется к устаревшему вычислению
+    fresh = await asyncio.wait_for(endpoint(organization_id=1, _cache_response=None), timeout=1)
+    release.set()
+
+    assert (await stale).body == b"Old"
+    assert fresh.body == b"New"
+    # старый ответ не попал в кэш
+    assert (await endpoint(organization_id=1, _cache_response=None)).body == b"New"
+
+
+@requires_database
+async def test_listener_invalidates_on_notify():
+    cache = ResponseCache(InMemoryCacheBackend(), ttl=60)
+    dsn = make_url(TEST_DATABASE_URL).set(drivername="postgresql").render_as_string(hide_password=False)
+    listener = CacheInvalidationListener(cache, dsn, heartbeat_interval=1.0, reconnect_delay=0.1)
+    listener.start()
+    try:
+        await asyncio.wait_for(listener.listening.wait(), timeout=5)
+        await cache.backend.set("organizations", cached_response(10), ttl=60, tags=("organizations",))
+        await cache.backend.set("buildings", cached_response(10), ttl=60, tags=("buildings",))
+
+        connection = await asyncpg.connect(dsn)
+        try:
+            await connection.execute(f"NOTIFY {CHANNEL}, 'organizations'")
+        finally:
+            await connection.close()
+
+        async with asyncio.timeout(5):
+            while await cache.backend.get("organizations") is not None:
+                await asyncio.sleep(0.01)
+        assert await cache.backend.get("buildings") is not None
+    finally:
+        await listener.stop()
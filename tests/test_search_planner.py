@@ -0,0 +1,70 @@
+import pytest
+
+from app.dao.search_planner import (
+    BUILDING_SELECTIVITY,
+    SearchFilter,
+    activity_selectivity,
+    bbox_selectivity,
+    name_selectivity,
+    plan_search,
+    radius_selectivity,
+)
+from app.schemas.geo import BoundingBox
+from app.schemas.organizations import NameSearchMode
+
+
+def search_filter(name: str, selectivity: float) -> SearchFilter:
+    return SearchFilter(name, selectivity, lambda source: None)
+
+
+def test_most_selective_filter_drives():
+    plan = plan_search([
+        search_filter("name", 0.03),
+        search_filter("building", BUILDING_SELECTIVITY),
+        search_filter("activity", 0.02),
+    ], 0.05)
+
+    assert plan.driving.name == "building"
+    assert [f.name for f in plan.residual] == ["activity", "name"]
+    assert str(plan) == "building~0.0010 -> [activity~0.0200, name~0.0300]"
+
+
+def test_filter_at_threshold_drives():
+    plan = plan_search([search_filter("radius", 0.5), search_filter("activity", 0.05)], 0.05)
+
+    assert plan.driving.name == "activity"
+
+
+def test_no_driving_filter_above_threshold():
+    plan = plan_search([search_filter("radius", 0.5), search_filter("activity", 0.06)], 0.05)
+
+    assert plan.driving is None
+    assert [f.name for f in plan.residual] == ["activity", "radius"]
+    assert str(plan) == "[activity~0.0600, radius~0.5000]"
+
+
+def test_single_filter_never_drives():
+    plan = plan_search([search_filter("building", BUILDING_SELECTIVITY)], 0.05)
+
+    assert plan.driving is None
+    assert [f.name for f in plan.residual] == ["building"]
+
+
+def test_no_filters():
+    assert plan_search([], 0.05).driving is None
+
+
+def test_longer_name_is_more_selective():
+    assert name_selectivity("Ро", NameSearchMode.prefix) > name_selectivity("Рога", NameSearchMode.prefix)
+    assert name_selectivity("  Ро  ", NameSearchMode.prefix) == name_selectivity("Ро", NameSearchMode.prefix)
+    assert name_selectivity("Рога и копыта", NameSearchMode.prefix) == pytest.approx(0.001)
+    assert name_selectivity("Рога и копыта", NameSearchMode.fuzzy) == pytest.approx(0.004)
+    assert name_selectivity("", NameSearchMode.fuzzy) == 1.0
+
+
+def test_selectivity_is_capped():
+    assert activity_selectivity(3) == pytest.approx(0.03)
+    assert activity_selectivity(500) == 1.0
+    assert radius_selectivity(1000, 1000) == pytest.approx(0.00314, rel=1e-2)
+    assert radius_selectivity(10 ** 6, 1000) == 1.0
+    assert bbox_selectivity(BoundingBox(min_latitude=-10, min_longitude=-10, max_latitude=10, max_longitude=10), 1000) == 1.0